@@ -0,0 +1,30 @@
+"""add indexes on tbl_session expires_at and user
+
+Revision ID: 3b7e1c9d2a4f
+Revises: 68d1f971a3c2
+Create Date: 2026-10-18 09:12:44.108233
+
+"""
+
+from collections.abc import Sequence
+
+from models._migrations import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e1c9d2a4f"
+down_revision: str | Sequence[str] | None = "68d1f971a3c2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built without blocking logins, which write to the table
+    create_index_concurrently("ix_tbl_session_expires_at", "tbl_session", ["expires_at"])
+    create_index_concurrently("ix_tbl_session_user", "tbl_session", ["user"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently("ix_tbl_session_user", "tbl_session")
+    drop_index_concurrently("ix_tbl_session_expires_at", "tbl_session")
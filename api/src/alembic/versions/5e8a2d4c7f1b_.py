@@ -0,0 +1,46 @@
+"""store hashed session tokens
+
+Revision ID: 5e8a2d4c7f1b
+Revises: 9c2f4e7a1b6d
+Create Date: 2026-10-18 13:26:09.417302
+
+Adds `tbl_session.token_hash` and makes the plaintext `token` nullable, as
+new sessions only store the hash. Existing sessions keep working: they are
+hashed when next used, and `python -m commands.hash_session_tokens` hashes
+the rest. The `token` column can be dropped once that has run.
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+from models._migrations import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "5e8a2d4c7f1b"
+down_revision: str | Sequence[str] | None = "9c2f4e7a1b6d"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Adding a nullable column without a default does not rewrite the table
+    op.add_column("tbl_session", sa.Column("token_hash", sa.LargeBinary(length=32), nullable=True))
+    op.alter_column("tbl_session", "token", existing_type=sa.String(length=255), nullable=True)
+
+    # Build the unique index without blocking writes to the table
+    create_index_concurrently(
+        "uq_tbl_session_token_hash", "tbl_session", ["token_hash"], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Sessions that only have a hashed token cannot be restored
+    op.execute("DELETE FROM tbl_session WHERE token IS NULL")
+    drop_index_concurrently("uq_tbl_session_token_hash", "tbl_session")
+    op.alter_column("tbl_session", "token", existing_type=sa.String(length=255), nullable=False)
+    op.drop_column("tbl_session", "token_hash")
@@ -0,0 +1,81 @@
+"""store uuid keys as native uuid on postgres
+
+Revision ID: 7d1f3b9e5a2c
+Revises: 5e8a2d4c7f1b
+Create Date: 2026-10-18 14:02:51.906114
+
+Converts the CHAR(32) UUID columns to Postgres's native `uuid` type in
+place, and drops the unique constraints on `id` columns that duplicate
+their primary keys. Changing a column's type rewrites the table, so run
+this during a quiet period.
+
+Other databases keep storing UUIDs as CHAR(32), so nothing changes there.
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7d1f3b9e5a2c"
+down_revision: str | Sequence[str] | None = "5e8a2d4c7f1b"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+UUID_COLUMNS = [
+    ("tbl_user", "id"),
+    ("tbl_session", "id"),
+    ("tbl_session", "user"),
+    ("tbl_email_outbox", "id"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # The unique constraints were created unnamed, so find them by their column
+    inspector = sa.inspect(op.get_bind())
+    for table in ("tbl_user", "tbl_session"):
+        for constraint in inspector.get_unique_constraints(table):
+            if constraint["column_names"] == ["id"]:
+                op.drop_constraint(constraint["name"], table, type_="unique")
+
+    op.drop_constraint("fk_tbl_session_tbl_user_id_user", "tbl_session", type_="foreignkey")
+    for table, column in UUID_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=sa.CHAR(32),
+            type_=postgresql.UUID(as_uuid=True),
+            postgresql_using=f'"{column}"::uuid',
+        )
+    op.create_foreign_key(
+        "fk_tbl_session_tbl_user_id_user", "tbl_session", "tbl_user", ["user"], ["id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.drop_constraint("fk_tbl_session_tbl_user_id_user", "tbl_session", type_="foreignkey")
+    for table, column in UUID_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            existing_type=postgresql.UUID(as_uuid=True),
+            type_=sa.CHAR(32),
+            postgresql_using=f"replace(\"{column}\"::text, '-', '')",
+        )
+    op.create_foreign_key(
+        "fk_tbl_session_tbl_user_id_user", "tbl_session", "tbl_user", ["user"], ["id"]
+    )
+    op.create_unique_constraint("tbl_user_id_key", "tbl_user", ["id"])
+    op.create_unique_constraint("tbl_session_id_key", "tbl_session", ["id"])
@@ -0,0 +1,51 @@
+"""add tbl_email_outbox
+
+Revision ID: 9c2f4e7a1b6d
+Revises: 3b7e1c9d2a4f
+Create Date: 2026-10-18 11:03:27.540119
+
+"""
+
+from collections.abc import Sequence
+
+import ormar
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c2f4e7a1b6d"
+down_revision: str | Sequence[str] | None = "3b7e1c9d2a4f"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "tbl_email_outbox",
+        sa.Column("created_date", sa.DateTime(), nullable=True),
+        sa.Column("updated_date", sa.DateTime(), nullable=True),
+        sa.Column("id", ormar.fields.sqlalchemy_uuid.CHAR(32), nullable=False),
+        sa.Column("to_address", sa.String(length=100), nullable=False),
+        sa.Column("subject", sa.String(length=255), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tbl_email_outbox_next_attempt_at",
+        "tbl_email_outbox",
+        ["next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tbl_email_outbox_next_attempt_at", table_name="tbl_email_outbox")
+    op.drop_table("tbl_email_outbox")
@@ -0,0 +1,33 @@
+"""add indexes on tbl_session and tbl_user updated_date
+
+Revision ID: b4e6d2a8c1f3
+Revises: 7d1f3b9e5a2c
+Create Date: 2026-10-18 16:41:27.530218
+
+Every worker reads the sessions and users updated in the last few seconds
+to keep its session cache in step with the others, see
+`authentication.invalidation`.
+
+"""
+
+from collections.abc import Sequence
+
+from models._migrations import create_index_concurrently, drop_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e6d2a8c1f3"
+down_revision: str | Sequence[str] | None = "7d1f3b9e5a2c"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    create_index_concurrently("ix_tbl_session_updated_date", "tbl_session", ["updated_date"])
+    create_index_concurrently("ix_tbl_user_updated_date", "tbl_user", ["updated_date"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    drop_index_concurrently("ix_tbl_user_updated_date", "tbl_user")
+    drop_index_concurrently("ix_tbl_session_updated_date", "tbl_session")
@@ -1,22 +1,40 @@
+import hmac
 from contextlib import asynccontextmanager
 
-import ormar
 import sqlalchemy
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.authentication import AuthenticationMiddleware
-from starlette.middleware.sessions import SessionMiddleware
 
+from authentication.invalidation import invalidation_feed
 from authentication.middleware import TurvaAuthenticationBackend
+from authentication.password_hasher import password_hasher
+from authentication.public_routes import public, public_routes
+from authentication.revocation import revocation_set
+from authentication.session_cache import session_cache
+from authentication.session_middleware import TurvaSessionMiddleware
+from common.compression import CompressionMiddleware
+from common.email_deliverability import deliverability_checker
+from common.email_outbox import email_outbox
+from common.loop_monitor import loop_monitor
+from common.metrics import metrics, metrics_writer, render
+from common.query_timing import QueryTimingMiddleware
+from common.request_metrics import RequestMetricsMiddleware
+from common.responses import FastJSONResponse
 from config import Config
 from endpoints import endpoints_base
 from models._database import DATABASE_URL, database
+from models._migrations import migrate
+from models._pool import pool_metrics
+from models._replicas import RoutingDatabaseConnection
+from models.session import session_expiry_writer, session_reaper
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Connect to the database
-    database_: ormar.DatabaseConnection = app.state.database
+    database_: RoutingDatabaseConnection = app.state.database
     if not database_.is_connected:
         await database_.connect()
 
@@ -29,18 +47,105 @@ async def lifespan(app: FastAPI):
                 )
                 await conn.commit()
 
+    # Bring the schema up to date before serving any requests
+    if Config.Migrations.on_startup:
+        await migrate(
+            database_,
+            wait_timeout=Config.Migrations.wait_timeout,
+            lock_timeout=Config.Migrations.lock_timeout,
+        )
+
+    # Check replication lag before reading from any replicas, then keep checking it
+    await database_.replicas.check()
+    database_.replicas.start()
+
+    # Start writing buffered session expiry extensions in the background
+    session_expiry_writer.start()
+
+    # Periodically delete expired sessions
+    if Config.Application.session_reaper_enabled:
+        session_reaper.start()
+
+    # Apply logouts and deactivations made by other workers to the session cache
+    invalidation_feed.start()
+
+    # Load revoked sessions and users, for checking signed session claims
+    if Config.Application.session_token_mode == "signed":
+        await revocation_set.load()
+        revocation_set.start()
+
+    # Send queued emails in the background
+    email_outbox.start()
+
+    # Share this worker's metrics with the others
+    if Config.Metrics.enabled:
+        metrics_writer.start()
+
+    # Watch for anything blocking the event loop
+    if Config.LoopMonitor.enabled:
+        loop_monitor.start()
+
     try:
         yield
     finally:
+        await loop_monitor.stop()
+        await metrics_writer.stop()
+        await email_outbox.stop()
+        await database_.replicas.stop()
+        await revocation_set.stop()
+        await invalidation_feed.stop()
+        await session_reaper.stop()
+        password_hasher.shutdown()
+
+        # Write any remaining session expiry extensions
+        await session_expiry_writer.stop()
+
         # Disconnect from the database
         if database_.is_connected:
             await database_.disconnect()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 app.state.database = database
 
+app.add_middleware(AuthenticationMiddleware, backend=TurvaAuthenticationBackend())
+app.add_middleware(
+    TurvaSessionMiddleware,
+    secret_key=Config.Application.secret_key,
+    session_cookie=Config.Application.session_cookie_name,
+    max_age=Config.Application.session_cookie_lifetime,
+    refresh_threshold=Config.Application.session_refresh_threshold,
+)
+
+# Added after the session and authentication middleware so their queries are counted too
+if Config.Database.query_timing:
+    app.add_middleware(
+        QueryTimingMiddleware,
+        server_timing=Config.Database.server_timing,
+        repeated_query_threshold=(
+            Config.Database.repeated_query_threshold
+            if Config.Application.is_debug_environment
+            else None
+        ),
+    )
+
+# Compress responses, other than preflight responses, which CORS answers first
+if Config.Compression.enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=Config.Compression.minimum_size,
+        gzip_level=Config.Compression.gzip_level,
+        brotli_quality=Config.Compression.brotli_quality,
+    )
+
+# Record every request other than preflight requests, including the time
+# spent compressing the response
+if Config.Metrics.enabled:
+    app.add_middleware(RequestMetricsMiddleware)
+
 # CORS configuration
+# Added last so it runs first, answering preflight requests before the
+# session is decoded or the user authenticated
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -52,23 +157,55 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
-
-app.add_middleware(AuthenticationMiddleware, backend=TurvaAuthenticationBackend())
-app.add_middleware(
-    SessionMiddleware,
-    secret_key=Config.Application.secret_key,
-    session_cookie=Config.Application.session_cookie_name,
-    max_age=Config.Application.session_cookie_lifetime,
+    max_age=Config.Application.cors_max_age,
 )
 
 app.include_router(endpoints_base, prefix=Config.Application.api_path)
 
 
 @app.get("/")
+@public
 async def read_root():
     return {
         "author": "https://www.turva.org",
         "description": "Turva API",
         "github": "https://github.com/digital-clinical-safety-alliance/turva/",
     }
+
+
+if Config.Metrics.enabled:
+    # Stats that components keep themselves, read when /metrics is requested
+    metrics.collect(
+        "turva_db_pool",
+        "Database connection pool",
+        pool_metrics.stats,
+        gauges={"size", "capacity", "checked_out", "idle", "overflow"},
+    )
+    metrics.collect("turva_session_cache", "Session cache", session_cache.stats, gauges={"size"})
+    metrics.collect(
+        "turva_email_deliverability_cache",
+        "Email domain deliverability cache",
+        deliverability_checker.stats,
+        gauges={"size"},
+    )
+    metrics.collect(
+        "turva_password_hash", "Password hashing", password_hasher.stats, gauges={"queue_depth"}
+    )
+    metrics.collect("turva_email", "Outbox emails", email_outbox.stats)
+    metrics.collect("turva_event_loop", "Event loop", loop_monitor.stats)
+
+    @app.get("/metrics", include_in_schema=False)
+    @public
+    async def read_metrics(request: Request):
+        if not Config.Metrics.token or not hmac.compare_digest(
+            request.headers.get("authorization", "").encode(),
+            f"Bearer {Config.Metrics.token}".encode(),
+        ):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+        return PlainTextResponse(
+            render(await metrics_writer.read()), media_type="text/plain; version=0.0.4"
+        )
+
+
+public_routes.add_routes(app.router.routes)
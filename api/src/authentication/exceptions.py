@@ -19,3 +19,31 @@ class UserNotValidatedException(HTTPException):
 
     def __init__(self):
         super().__init__(status_code=403, detail="User not validated")
+
+
+class PasswordHashingUnavailableException(HTTPException):
+    """
+    Raised when too many password hashing operations are already queued,
+    so the request is turned away straight away rather than left waiting
+    """
+
+    def __init__(self):
+        super().__init__(
+            status_code=503,
+            detail="The service is busy, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+class RateLimitExceededException(HTTPException):
+    """
+    Raised when a client or account has made too many attempts at a
+    rate limited action, such as logging in
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=429,
+            detail="Too many attempts, please try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+from uuid import UUID
+
+import sqlalchemy
+
+from authentication.revocation import revocation_set
+from authentication.session_cache import session_cache
+from common.periodic import PeriodicTask
+from config import Config
+from models import Session, User
+from models._database import database
+
+# How long an update can take to commit after setting `updated_date`, so
+# each check looks this far back past the previous one
+COMMIT_MARGIN = timedelta(seconds=2)
+
+
+class InvalidationFeed(PeriodicTask):
+    """
+    Applies logouts, revocations and user changes made by other worker
+    processes to this process's session cache and, with signed session
+    claims, its revocation set.
+
+    Changes made by this process are applied straight away by the model
+    signals in `authentication.session_cache`, but other workers only see
+    them through the database. Every change that matters is an update
+    through the models, which sets `updated_date` (see `models`), so every
+    `interval` seconds the sessions and users updated since the last check
+    are read from the primary, using the indexes on `updated_date`.
+    """
+
+    error_message = "[sessions] failed to check for session changes"
+
+    def __init__(self, interval: float):
+        super().__init__(interval)
+        self._checked_at = datetime.now()
+        # The rows applied by the last check, which the next one sees again
+        self._applied: set[tuple[UUID, datetime]] = set()
+
+    async def check(self):
+        # `updated_date` is naive local time
+        checked_at = datetime.now()
+        since = self._checked_at - COMMIT_MARGIN
+        session_table = Session.ormar_config.table
+        user_table = User.ormar_config.table
+
+        async with database.connection() as conn:
+            sessions = await conn.execute(
+                sqlalchemy.select(
+                    session_table.c.id,
+                    session_table.c.token_hash,
+                    session_table.c.is_active,
+                    session_table.c.updated_date,
+                ).where(session_table.c.updated_date > since)
+            )
+            users = await conn.execute(
+                sqlalchemy.select(
+                    user_table.c.id, user_table.c.is_active, user_table.c.updated_date
+                ).where(user_table.c.updated_date > since)
+            )
+            session_rows = sessions.all()
+            user_rows = users.all()
+
+        # The revocation set is only loaded, and pruned, with signed session claims
+        signed_mode = Config.Application.session_token_mode == "signed"
+        applied = set()
+        for row in session_rows:
+            applied.add((row.id, row.updated_date))
+            if (row.id, row.updated_date) in self._applied:
+                continue
+            if row.token_hash is not None:
+                session_cache.invalidate_token(row.token_hash)
+            if signed_mode and row.is_active is False:
+                revocation_set.revoke_session(row.id)
+        for row in user_rows:
+            applied.add((row.id, row.updated_date))
+            if (row.id, row.updated_date) in self._applied:
+                continue
+            session_cache.invalidate_user(row.id)
+            if signed_mode and row.is_active is False:
+                revocation_set.revoke_user(row.id)
+            elif signed_mode:
+                revocation_set.restore_user(row.id)
+
+        self._applied = applied
+        self._checked_at = checked_at
+
+    async def tick(self):
+        await self.check()
+
+    def start(self):
+        if self._task is None:
+            self._checked_at = datetime.now()
+        super().start()
+
+
+invalidation_feed = InvalidationFeed(interval=Config.Application.session_sync_interval)
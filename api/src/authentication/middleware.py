@@ -1,11 +1,21 @@
-import datetime
-
 from fastapi.requests import HTTPConnection
 from starlette.authentication import AuthCredentials, AuthenticationBackend, BaseUser
 
+from authentication.public_routes import public_routes
+from authentication.revocation import revocation_set
 from authentication.scope import Scope
+from authentication.session_cache import session_cache
+from authentication.session_claims import SessionClaims, SessionUser
+from common.metrics import metrics
 from config import Config
 from models import Session
+from models.fast_queries import SessionRecord, session_by_token_hash
+
+session_auth_outcomes = metrics.counter(
+    "turva_session_auth_total",
+    "Requests to non-public routes by how their session was resolved",
+    ["outcome"],
+)
 
 
 class TurvaAuthenticationBackend(AuthenticationBackend):
@@ -17,8 +27,27 @@ class TurvaAuthenticationBackend(AuthenticationBackend):
     is active. If the session is invalid or the user is not active,
     the user's session is deleted, logging them out.
 
-    This also handles updating the user's session expiry on each
-    request.
+    This also handles sliding the user's session expiry forward once
+    less than `SESSION_REFRESH_THRESHOLD` of its lifetime remains.
+    Extensions are written to the database in batches in the background
+    (see `models.session_expiry`), so most requests do not write at all.
+
+    Resolved sessions are kept in an in-process cache so that most
+    requests do not need to query the database to find the session
+    and its user. See `authentication.session_cache`. On a cache miss they
+    are looked up with a prepared query that returns plain records (see
+    `models.fast_queries`), so `request.user` is a `UserRecord`.
+
+    When `SESSION_TOKEN_MODE` is "signed", the session cookie also carries
+    signed session claims (see `authentication.session_claims`). While those
+    are fresh, requests are authenticated from the claims alone, checked
+    against the in-memory revocation set, with no database round trip.
+
+    Requests to routes marked with `@public` are not authenticated at all,
+    so they never look up the session. See `authentication.public_routes`.
+
+    How each session was resolved (from claims, the cache or the database,
+    or not at all) is counted in `turva_session_auth_total`.
     """
 
     async def authenticate(self, conn: HTTPConnection) -> tuple[AuthCredentials, BaseUser] | None:
@@ -27,33 +56,73 @@ class TurvaAuthenticationBackend(AuthenticationBackend):
         # request, which is not ideal, but possible.
         # Need to investigate.
 
-        # Get the session token from the signed session cookie (managed by SessionMiddleware)
+        if public_routes.matches(conn):
+            return None
+
+        signed_mode = Config.Application.session_token_mode == "signed"
+        if signed_mode:
+            claims = SessionClaims.from_dict(conn.session.get("session_claims"))
+            if claims is not None and not claims.is_stale():
+                if revocation_set.is_revoked(claims):
+                    session_auth_outcomes.inc("revoked")
+                    return None
+                session_auth_outcomes.inc("claims")
+                return AuthCredentials(claims.scopes), SessionUser(claims.user_id)
+
+        # Get the session token from the signed session cookie (managed by TurvaSessionMiddleware)
         session_token = conn.session.get("session_token")
         if not session_token:
+            session_auth_outcomes.inc("missing")
             return None
 
-        # Look up the session in the database
-        session = await Session.objects.select_related("user").get_or_none(token=session_token)
-
+        # Look up the session, falling back to the database on a cache miss
+        token_hash = Session.hash_token(session_token)
+        session = session_cache.get(token_hash)
+        outcome = "hit"
         if session is None:
-            # The session does not exist
+            outcome = "miss"
+            # Read from the primary, never a replica: a lagging replica could
+            # return a session that has just been revoked, which would then be cached
+            session = await session_by_token_hash(token_hash)
+            if session is None and Config.Application.legacy_session_tokens:
+                # Sessions from before tokens were hashed are hashed on first use
+                legacy_session = await Session.hash_legacy_token(session_token)
+                if legacy_session is not None:
+                    session = SessionRecord.from_session(legacy_session)
+
+            if session is None:
+                # The session does not exist
+                session_auth_outcomes.inc("missing")
+                return None
+
+            session_cache.set(token_hash, session)
+
+        if session.is_active is False:
+            # The session has been revoked
+            session_auth_outcomes.inc("revoked")
             return None
 
         # If the user is not active, remove their session
         # Or if the user's session has expired
         if session.user.is_active is False or session.is_expired():
-            await session.delete()
+            await Session.objects.delete(id=session.id)
+            session_cache.invalidate_token(token_hash)
+            session_auth_outcomes.inc("expired")
             return None
 
-        # Update the session expiry
-        await session.update(
-            expires_at=datetime.datetime.now(tz=datetime.UTC)
-            + datetime.timedelta(seconds=Config.Application.session_cookie_lifetime)
-        )
+        # Extend the session expiry if it is getting close
+        if session.needs_extension():
+            await session.extend_session()
 
         scopes = [Scope.AUTHENTICATED.value]
         if session.user.is_verified:
             scopes.append(Scope.VERIFIED.value)
 
+        if signed_mode:
+            # Issue fresh claims so the next requests can skip the database
+            conn.session["session_claims"] = SessionClaims.for_session(session, scopes).to_dict()
+
+        session_auth_outcomes.inc(outcome)
+
         # Return the user + their scopes
         return AuthCredentials(scopes), session.user
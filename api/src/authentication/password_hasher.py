@@ -0,0 +1,132 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError
+
+from authentication.exceptions import PasswordHashingUnavailableException
+from common.metrics import metrics
+from config import Config
+
+# Built once per process (including each worker process) from the configured parameters
+_hasher = PasswordHasher(
+    time_cost=Config.PasswordHashing.time_cost,
+    memory_cost=Config.PasswordHashing.memory_cost,
+    parallelism=Config.PasswordHashing.parallelism,
+)
+
+operation_duration = metrics.histogram(
+    "turva_password_hash_duration_seconds",
+    "Time taken by Argon2 operations, including waiting for a worker, in seconds",
+    ["operation"],
+)
+
+
+def _hash(password: str) -> str:
+    return _hasher.hash(password)
+
+
+def _verify(password_hash: str, password: str) -> bool:
+    try:
+        return _hasher.verify(password_hash, password)
+    except VerifyMismatchError:
+        return False
+
+
+class PasswordHashingService:
+    """
+    Runs Argon2 hashing and verification in a pool of worker processes,
+    so that the memory-hard work does not block the event loop.
+
+    At most `max_pending` operations can be queued or running at once.
+    Beyond that, `PasswordHashingUnavailableException` (503) is raised
+    straight away, so a burst of logins is turned away quickly instead of
+    every login waiting longer and longer.
+
+    The pool is started on first use and shut down with the app.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.operations = 0
+        self.rejections = 0
+        self.seconds_total = 0.0
+        self.seconds_max = 0.0
+        self._pool: ProcessPoolExecutor | None = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, password)
+
+    async def verify(self, password_hash: str, password: str) -> bool:
+        return await self._run("verify", _verify, password_hash, password)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """
+        Whether the hash was made with different parameters than those
+        currently configured. This only parses the hash, so is cheap enough
+        to run on the event loop.
+        """
+        return _hasher.check_needs_rehash(password_hash)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "queue_depth": self.pending,
+            "operations": self.operations,
+            "rejections": self.rejections,
+            "seconds_total": self.seconds_total,
+            "seconds_max": self.seconds_max,
+        }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, operation: str, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejections += 1
+            raise PasswordHashingUnavailableException()
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # Forking a process that has running threads is not safe
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        job = self._pool.submit(func, *args)
+        self.pending += 1
+
+        # If the caller is cancelled, a job that has already started keeps its
+        # worker busy, so it is only counted as finished once it has finished.
+        # This is added before `wrap_future` adds its own callback, so the
+        # stats are up to date by the time the caller gets the result.
+        def on_done(_):
+            try:
+                loop.call_soon_threadsafe(self._finished, operation, start)
+            except RuntimeError:
+                # The event loop has already been closed
+                pass
+
+        job.add_done_callback(on_done)
+        return await asyncio.wrap_future(job)
+
+    def _finished(self, operation: str, start: float):
+        self.pending -= 1
+        elapsed = time.perf_counter() - start
+        self.operations += 1
+        self.seconds_total += elapsed
+        self.seconds_max = max(self.seconds_max, elapsed)
+        operation_duration.observe(elapsed, operation)
+
+
+password_hasher = PasswordHashingService(
+    workers=Config.PasswordHashing.workers,
+    max_pending=Config.PasswordHashing.max_pending,
+)
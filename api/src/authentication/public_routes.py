@@ -0,0 +1,60 @@
+import re
+from collections.abc import Callable, Iterable
+
+from fastapi.requests import HTTPConnection
+from fastapi.routing import APIRoute
+from starlette.routing import compile_path, get_route_path
+
+from common.endpoint_flags import Endpoint, has_flag, set_flag
+
+
+def public(endpoint: Endpoint) -> Endpoint:
+    """
+    Marks an endpoint as not needing authentication, so requests to it skip
+    the session lookup. `request.user` is always unauthenticated in public
+    endpoints.
+
+    Apply it beneath the route decorator:
+
+        @router.post("/login/")
+        @public
+        async def login(...): ...
+    """
+    return set_flag(endpoint, "is_public")
+
+
+def is_public(endpoint: Callable) -> bool:
+    return has_flag(endpoint, "is_public")
+
+
+class PublicRoutes:
+    """
+    The paths of the routes marked with `@public`.
+
+    Authentication runs as middleware, before the request is routed, so
+    these are matched against the request path up front.
+    """
+
+    def __init__(self):
+        self._routes: dict[str, tuple[re.Pattern, frozenset[str]]] = {}
+
+    def add(self, path: str, methods: Iterable[str]):
+        path_regex, _, _ = compile_path(path)
+        _, existing_methods = self._routes.get(path, (path_regex, frozenset()))
+        self._routes[path] = (path_regex, existing_methods | frozenset(methods))
+
+    def add_routes(self, routes: Iterable[object], prefix: str = ""):
+        for route in routes:
+            if isinstance(route, APIRoute) and is_public(route.endpoint):
+                self.add(f"{prefix}{route.path}", route.methods or ())
+
+    def matches(self, conn: HTTPConnection) -> bool:
+        method = conn.scope.get("method")
+        path = get_route_path(conn.scope)
+        return any(
+            method in methods and path_regex.match(path)
+            for path_regex, methods in self._routes.values()
+        )
+
+
+public_routes = PublicRoutes()
@@ -0,0 +1,138 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Sequence
+
+from fastapi.requests import HTTPConnection
+
+from authentication.exceptions import RateLimitExceededException
+from config import Config
+
+
+class RateLimitStore(ABC):
+    """
+    Storage for rate limit token buckets.
+
+    `InMemoryRateLimitStore` keeps buckets per worker process, so each
+    worker enforces its own limits. To share limits between workers,
+    implement this against shared storage (e.g. Redis) and pass it to
+    `RateLimiter`.
+    """
+
+    @abstractmethod
+    async def consume(self, buckets: Sequence[tuple[str, int]], period: float) -> float:
+        """
+        Takes a token from each of the `(key, capacity)` buckets, which hold
+        up to `capacity` tokens and refill completely over `period` seconds.
+        Tokens are only taken if every bucket has one, so a request turned
+        away by one limit does not use up the others.
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise the number of
+            seconds until every bucket will have one.
+        """
+
+    @abstractmethod
+    async def clear(self):
+        """Empties the store, resetting every limit."""
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Token buckets held in memory, spread over a number of shards.
+
+    A bucket that has been idle long enough to refill completely is the
+    same as a missing one, so buckets expire after `period`. Expired
+    buckets are swept one shard at a time every `sweep_every` operations,
+    which keeps memory bounded without ever scanning every bucket at once.
+    """
+
+    def __init__(self, shards: int = 64, sweep_every: int = 256):
+        self._shards: list[dict[str, tuple[float, float, float]]] = [{} for _ in range(shards)]
+        self._sweep_every = sweep_every
+        self._operations = 0
+        self._next_sweep = 0
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    async def consume(self, buckets: Sequence[tuple[str, int]], period: float) -> float:
+        now = time.monotonic()
+        refilled = []
+        retry_after = 0.0
+        for key, capacity in buckets:
+            shard = self._shards[hash(key) % len(self._shards)]
+            refill_rate = capacity / period
+
+            tokens = float(capacity)
+            bucket = shard.get(key)
+            if bucket is not None:
+                stored_tokens, updated_at, _ = bucket
+                tokens = min(tokens, stored_tokens + (now - updated_at) * refill_rate)
+
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / refill_rate)
+            refilled.append((shard, key, tokens))
+
+        self._operations += 1
+        if self._operations % self._sweep_every == 0:
+            self._sweep(now)
+
+        taken = 0 if retry_after > 0 else 1
+        for shard, key, tokens in refilled:
+            shard[key] = (tokens - taken, now, now + period)
+        return retry_after
+
+    async def clear(self):
+        for shard in self._shards:
+            shard.clear()
+
+    def _sweep(self, now: float):
+        shard = self._shards[self._next_sweep]
+        for key in [key for key, (_, _, expires_at) in shard.items() if expires_at <= now]:
+            del shard[key]
+        self._next_sweep = (self._next_sweep + 1) % len(self._shards)
+
+
+class RateLimiter:
+    """
+    Limits attempts at expensive actions (logging in and registering cost
+    a full Argon2 operation each) per client IP address and per email
+    address.
+
+    Call `check` before doing any database or hashing work; it raises
+    `RateLimitExceededException` (429) when a limit has been reached.
+
+    The client IP is taken from the connection. Behind a reverse proxy,
+    `SERVER_FORWARDED_ALLOW_IPS` must include the proxy's address so that
+    this is the real client address, rather than the proxy's for everyone.
+    """
+
+    def __init__(self, store: RateLimitStore):
+        self.store = store
+        self.rejections = 0
+
+    async def check(self, action: str, conn: HTTPConnection, email_address: str | None = None):
+        if not Config.RateLimit.enabled:
+            return
+
+        limits = {
+            "login": (Config.RateLimit.login_per_ip, Config.RateLimit.login_per_email),
+            "register": (Config.RateLimit.register_per_ip, None),
+        }
+        per_ip, per_email = limits[action]
+        period = Config.RateLimit.period
+
+        client_ip = conn.client.host if conn.client else "unknown"
+        buckets = [(f"{action}:ip:{client_ip}", per_ip)]
+        if per_email is not None and email_address:
+            normalized_email = email_address.strip().lower()
+            buckets.append((f"{action}:email:{normalized_email}", per_email))
+
+        retry_after = await self.store.consume(buckets, period)
+        if retry_after > 0:
+            self.rejections += 1
+            raise RateLimitExceededException(retry_after=math.ceil(retry_after))
+
+
+rate_limiter = RateLimiter(InMemoryRateLimitStore())
@@ -0,0 +1,82 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+import ormar
+import sqlalchemy
+
+from authentication.session_claims import SessionClaims
+from common.periodic import PeriodicTask
+from config import Config
+from models import Session, User
+from models._database import database
+
+
+class RevocationSet(PeriodicTask):
+    """
+    The sessions and users whose session claims must no longer be accepted,
+    held in memory so that checking them does not need the database.
+
+    Revoked sessions are the inactive (logged out) sessions that have not
+    expired yet; revoked users are the deactivated users. Both are loaded
+    from the database at startup. Revocations made by this process are
+    applied immediately, and those made by other worker processes within
+    `SESSION_SYNC_INTERVAL` seconds by `authentication.invalidation`. The
+    full reload every `interval` seconds drops sessions that have since
+    expired, and catches any changes made without going through the models.
+    """
+
+    error_message = "[sessions] failed to reload the revocation set"
+
+    def __init__(self, interval: float):
+        super().__init__(interval)
+        self.sessions: set[UUID] = set()
+        self.users: set[UUID] = set()
+
+    def is_revoked(self, claims: SessionClaims) -> bool:
+        return claims.session_id in self.sessions or claims.user_id in self.users
+
+    def revoke_session(self, session_id: UUID):
+        self.sessions.add(session_id)
+
+    def revoke_user(self, user_id: UUID):
+        self.users.add(user_id)
+
+    def restore_user(self, user_id: UUID):
+        self.users.discard(user_id)
+
+    async def load(self):
+        session_table = Session.ormar_config.table
+        user_table = User.ormar_config.table
+
+        async with database.connection() as conn:
+            sessions = await conn.execute(
+                sqlalchemy.select(session_table.c.id).where(
+                    session_table.c.is_active.is_(False),
+                    session_table.c.expires_at > datetime.now(UTC),
+                )
+            )
+            users = await conn.execute(
+                sqlalchemy.select(user_table.c.id).where(user_table.c.is_active.is_(False))
+            )
+            self.sessions = set(sessions.scalars())
+            self.users = set(users.scalars())
+
+    async def tick(self):
+        await self.load()
+
+
+revocation_set = RevocationSet(interval=Config.Application.revocation_sync_interval)
+
+
+@ormar.post_update(Session)
+async def _revoke_updated_session(sender, instance: Session, **kwargs):
+    if instance.is_active is False:
+        revocation_set.revoke_session(instance.id)
+
+
+@ormar.post_update(User)
+async def _revoke_updated_user(sender, instance: User, **kwargs):
+    if instance.is_active is False:
+        revocation_set.revoke_user(instance.id)
+    else:
+        revocation_set.restore_user(instance.id)
@@ -0,0 +1,117 @@
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+import ormar
+
+from config import Config
+from models import Session, User
+from models.fast_queries import SessionRecord
+
+
+class SessionCache:
+    """
+    An in-process LRU cache of resolved sessions (with their user),
+    keyed by the hash of the session token.
+
+    Entries are dropped once the cache holds more than `max_size` entries
+    (least recently used first) or once they are older than `ttl` seconds.
+    Revocations made by this process are applied immediately through the
+    `invalidate_*` methods, and those made by other worker processes within
+    `SESSION_SYNC_INTERVAL` seconds by `authentication.invalidation`. The
+    TTL is the backstop for changes made without going through the models.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[bytes, tuple[float, SessionRecord]] = OrderedDict()
+        self._tokens_by_user: dict[UUID, set[bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token_hash: bytes) -> SessionRecord | None:
+        entry = self._entries.get(token_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, session = entry
+        if time.monotonic() - stored_at > self.ttl:
+            self._remove(token_hash)
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token_hash)
+        self.hits += 1
+        return session
+
+    def set(self, token_hash: bytes, session: SessionRecord):
+        if self.max_size <= 0:
+            return
+
+        self._remove(token_hash)
+        self._entries[token_hash] = (time.monotonic(), session)
+        self._tokens_by_user.setdefault(session.user.id, set()).add(token_hash)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate_token(self, token_hash: bytes):
+        self._remove(token_hash)
+
+    def invalidate_user(self, user_id: UUID):
+        for token_hash in self._tokens_by_user.pop(user_id, set()):
+            self._entries.pop(token_hash, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_user.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, token_hash: bytes):
+        entry = self._entries.pop(token_hash, None)
+        if entry is None:
+            return
+
+        user_id = entry[1].user.id
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is not None:
+            tokens.discard(token_hash)
+            if not tokens:
+                del self._tokens_by_user[user_id]
+
+
+session_cache = SessionCache(
+    max_size=Config.Application.session_cache_size,
+    ttl=Config.Application.session_cache_ttl,
+)
+
+
+@ormar.post_delete(Session)
+async def _invalidate_deleted_session(sender, instance: Session, **kwargs):
+    session_cache.invalidate_token(instance.token_hash)
+
+
+@ormar.post_update(Session)
+async def _invalidate_updated_session(sender, instance: Session, **kwargs):
+    session_cache.invalidate_token(instance.token_hash)
+
+
+@ormar.post_update(User)
+async def _invalidate_updated_user(sender, instance: User, **kwargs):
+    # Covers deactivation as well as changes to the fields scopes are built from
+    session_cache.invalidate_user(instance.id)
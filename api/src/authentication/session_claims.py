@@ -0,0 +1,93 @@
+import time
+from dataclasses import dataclass
+from datetime import UTC
+from typing import Any
+from uuid import UUID
+
+from starlette.authentication import BaseUser
+
+from config import Config
+from models.fast_queries import SessionRecord
+
+
+@dataclass(frozen=True)
+class SessionClaims:
+    """
+    The claims carried in the session cookie when `SESSION_TOKEN_MODE` is
+    "signed", so that requests can be authenticated without a database
+    round trip.
+
+    The claims are stored in the session, which `TurvaSessionMiddleware` already
+    serialises into an HMAC-signed cookie (keyed on `SECRET_KEY`), so they
+    cannot be forged or altered by the client.
+
+    Claims only stay fresh for `SIGNED_SESSION_TTL` seconds (or until the
+    session expires, if that is sooner). Once stale, the session is looked
+    up in the database again, which picks up changes to the user's scopes,
+    extends the session and issues fresh claims.
+    """
+
+    session_id: UUID
+    user_id: UUID
+    scopes: list[str]
+    expires_at: float
+
+    @classmethod
+    def for_session(cls, session: SessionRecord, scopes: list[str]) -> "SessionClaims":
+        session_expires_at = session.expires_at.replace(tzinfo=UTC).timestamp()
+        return cls(
+            session_id=session.id,
+            user_id=session.user.id,
+            scopes=scopes,
+            expires_at=min(session_expires_at, time.time() + Config.Application.signed_session_ttl),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "SessionClaims | None":
+        if not isinstance(data, dict):
+            return None
+
+        try:
+            return cls(
+                session_id=UUID(data["sid"]),
+                user_id=UUID(data["uid"]),
+                scopes=list(data["scp"]),
+                expires_at=float(data["exp"]),
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "sid": self.session_id.hex,
+            "uid": self.user_id.hex,
+            "scp": self.scopes,
+            "exp": self.expires_at,
+        }
+
+    def is_stale(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+class SessionUser(BaseUser):
+    """
+    The user attached to requests authenticated from session claims.
+
+    Only the user's ID is known without a database lookup; endpoints that
+    need anything else should load the `User` by `id`.
+    """
+
+    def __init__(self, user_id: UUID):
+        self.id = user_id
+
+    @property
+    def is_authenticated(self) -> bool:
+        return True
+
+    @property
+    def display_name(self) -> str:
+        return str(self.id)
+
+    @property
+    def identity(self) -> str:
+        return str(self.id)
@@ -0,0 +1,140 @@
+import json
+import time
+from base64 import b64decode, b64encode
+from typing import Any
+
+import itsdangerous
+from itsdangerous.exc import BadSignature
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class TrackedSession(dict):
+    """
+    The session data, recording whether it has been changed.
+
+    Only changes made through the session itself are tracked, so replace
+    nested values rather than changing them in place.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.modified = False
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self or self[key] != value:
+            self.modified = True
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: str):
+        self.modified = True
+        super().__delitem__(key)
+
+    def clear(self):
+        if self:
+            self.modified = True
+        super().clear()
+
+    def pop(self, key: str, *default: Any) -> Any:
+        if key in self:
+            self.modified = True
+        return super().pop(key, *default)
+
+    def popitem(self) -> tuple[str, Any]:
+        self.modified = True
+        return super().popitem()
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self.modified = True
+        return super().setdefault(key, default)
+
+    def update(self, *args: Any, **kwargs: Any):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+class TurvaSessionMiddleware:
+    """
+    A drop-in replacement for Starlette's `SessionMiddleware`, storing the
+    session in the same signed cookie format.
+
+    Starlette's middleware re-signs the session and sends a new cookie on
+    every response with a non-empty session. This one only sends the cookie
+    when the session has changed, or when less than `refresh_threshold` of
+    the cookie's `max_age` remains, so the cookie does not expire while the
+    session is in use. Every other response skips the HMAC signing and the
+    `Set-Cookie` header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        secret_key: str,
+        session_cookie: str = "session",
+        max_age: int = 14 * 24 * 60 * 60,
+        refresh_threshold: float = 0.5,
+        path: str = "/",
+        same_site: str = "lax",
+        https_only: bool = False,
+    ):
+        self.app = app
+        self.signer = itsdangerous.TimestampSigner(str(secret_key))
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.refresh_after = max_age * (1 - refresh_threshold)
+        self.path = path
+        self.security_flags = f"httponly; samesite={same_site}"
+        if https_only:
+            self.security_flags += "; secure"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        session, signed_at = self._load(HTTPConnection(scope))
+        scope["session"] = session
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                header_value = self._cookie_header(scope["session"], signed_at)
+                if header_value is not None:
+                    MutableHeaders(scope=message).append("Set-Cookie", header_value)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _load(self, conn: HTTPConnection) -> tuple[TrackedSession, float | None]:
+        cookie = conn.cookies.get(self.session_cookie)
+        if cookie is None:
+            return TrackedSession(), None
+
+        try:
+            data, signed_at = self.signer.unsign(
+                cookie.encode("utf-8"), max_age=self.max_age, return_timestamp=True
+            )
+            return TrackedSession(json.loads(b64decode(data))), signed_at.timestamp()
+        except (BadSignature, ValueError):
+            return TrackedSession(), None
+
+    def _cookie_header(self, session: TrackedSession, signed_at: float | None) -> str | None:
+        if not session:
+            if signed_at is None or not session.modified:
+                return None
+            # The session has been cleared, so remove the cookie
+            return (
+                f"{self.session_cookie}=null; path={self.path}; "
+                f"expires=Thu, 01 Jan 1970 00:00:00 GMT; {self.security_flags}"
+            )
+
+        needs_refresh = signed_at is None or time.time() - signed_at >= self.refresh_after
+        if not session.modified and not needs_refresh:
+            return None
+
+        data = self.signer.sign(b64encode(json.dumps(session).encode("utf-8")))
+        return (
+            f"{self.session_cookie}={data.decode('utf-8')}; path={self.path}; "
+            f"Max-Age={self.max_age}; {self.security_flags}"
+        )
@@ -0,0 +1,18 @@
+"""
+Micro-benchmarks for the API, run from `src/` with `python -m benchmarks.<name>`.
+
+Benchmarks run against the database configured in the environment. Without
+one (no `DB_HOST` set), they load `.env.test` and use a throwaway SQLite
+database, like the test suite. To benchmark Postgres, point the `DB_*`
+settings at an empty scratch database: the benchmark creates the tables it
+needs and drops them afterwards, and refuses to run if they already exist.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+# This runs before any benchmark module imports `config`
+if "DB_HOST" not in os.environ:
+    os.environ["TESTING"] = "true"
+    load_dotenv(os.path.join(os.path.dirname(__file__), "..", "..", ".env.test"))
@@ -0,0 +1,55 @@
+"""
+Shared helpers for the benchmarks.
+"""
+
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+
+import sqlalchemy
+
+from async_database_utils import drop_database
+from models._database import DATABASE_URL, database, metadata
+
+
+@asynccontextmanager
+async def scratch_database():
+    await database.connect()
+    async with database.engine.begin() as conn:
+        existing = await conn.run_sync(lambda sync: sqlalchemy.inspect(sync).get_table_names())
+        if set(existing) & set(metadata.tables):
+            raise RuntimeError("Refusing to benchmark against a database that has Turva tables")
+        await conn.run_sync(metadata.create_all)
+
+    try:
+        yield
+    finally:
+        async with database.engine.begin() as conn:
+            await conn.run_sync(metadata.drop_all)
+        await database.disconnect()
+        if DATABASE_URL.startswith("sqlite"):
+            await drop_database(DATABASE_URL)
+
+
+async def timed(func: Callable[[], Awaitable[object]], iterations: int) -> list[float]:
+    """Runs `func` `iterations` times and returns each call's duration, in microseconds."""
+    # Warm up caches, connection pools and so on first
+    for _ in range(min(iterations, 50)):
+        await func()
+
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await func()
+        durations.append((time.perf_counter() - start) * 1_000_000)
+    return durations
+
+
+def report(name: str, durations: list[float]):
+    durations = sorted(durations)
+    p99 = durations[int(len(durations) * 0.99) - 1]
+    print(
+        f"{name:<40} mean {statistics.mean(durations):>9.1f}us"
+        f"   p50 {statistics.median(durations):>9.1f}us   p99 {p99:>9.1f}us"
+    )
@@ -0,0 +1,81 @@
+"""
+Shows the trade-off between CPU time and response size at each gzip level
+and brotli quality, compressing a JSON list of `--rows` users as rendered by
+`FastJSONResponse`. Brotli is skipped when it is not installed.
+
+Does not need a database.
+
+Usage:
+    python -m benchmarks.compression [--iterations N] [--rows N]
+"""
+
+import argparse
+import asyncio
+import statistics
+from collections.abc import Callable
+from datetime import UTC, datetime
+from functools import partial
+from uuid import uuid4
+
+from benchmarks._setup import timed
+from common.compression import BrotliEncoder, Encoder, GzipEncoder, brotli
+from common.responses import FastJSONResponse
+
+
+def payload(rows: int) -> bytes:
+    now = datetime.now(UTC)
+    return bytes(
+        FastJSONResponse(
+            [
+                {
+                    "id": uuid4(),
+                    "first_name": "Bench",
+                    "last_name": f"Mark {i}",
+                    "email_address": f"bench.mark.{i}@example.com",
+                    "is_verified": i % 3 != 0,
+                    "created_at": now,
+                }
+                for i in range(rows)
+            ]
+        ).body
+    )
+
+
+async def measure(name: str, make_encoder: Callable[[], Encoder], body: bytes, iterations: int):
+    compressed_size = len(make_encoder().compress(body, finish=True))
+
+    async def compress():
+        make_encoder().compress(body, finish=True)
+
+    mean = statistics.mean(await timed(compress, iterations))
+    print(
+        f"{name:<12} {compressed_size / 1024:>9.1f}KiB {len(body) / compressed_size:>6.1f}x"
+        f" {mean / 1000:>9.2f}ms {len(body) / mean:>8.1f}MB/s"
+    )
+
+
+async def main(iterations: int, rows: int):
+    body = payload(rows)
+    print(f"{rows} rows, {len(body) / 1024:.1f}KiB uncompressed")
+
+    encoders: list[tuple[str, Callable[[int], Encoder], range]] = [
+        ("gzip", GzipEncoder, range(1, 10))
+    ]
+    if brotli is not None:
+        encoders.append(("brotli", BrotliEncoder, range(0, 12)))
+    else:
+        print("brotli is not installed, so only gzip is shown")
+
+    print(f"\n{'':<12} {'size':>12} {'ratio':>7} {'time':>11} {'throughput':>10}")
+    for name, encoder, levels in encoders:
+        for level in levels:
+            await measure(f"{name} {level}", partial(encoder, level), body, iterations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations, args.rows))
@@ -0,0 +1,81 @@
+"""
+Compares the per-call cost of the prepared queries in `models.fast_queries`
+with the ORM queries they replace: looking up a session with its user,
+looking up a user by email, and writing a batch of session expiry
+extensions.
+
+Runs against SQLite with `TESTING=true`, and the configured Postgres
+database otherwise.
+
+Usage:
+    python -m benchmarks.fast_queries [--iterations N] [--batch-size N]
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+from benchmarks._setup import report, scratch_database, timed
+from models import Session, User
+from models.fast_queries import session_by_token_hash, user_by_email
+from models.session import session_expiry_writer
+
+
+async def main(iterations: int, batch_size: int):
+    async with scratch_database():
+        user = await User.objects.create(
+            id=uuid4(),
+            first_name="Bench",
+            last_name="Mark",
+            email_address="bench.mark@example.com",
+            password="not-a-real-hash",
+            is_verified=True,
+        )
+        sessions = [(await Session.create_session(user))[0] for _ in range(batch_size)]
+        token_hash = sessions[0].token_hash
+
+        async def orm_session():
+            assert await Session.objects.select_related("user").get_or_none(token_hash=token_hash)
+
+        async def fast_session():
+            assert await session_by_token_hash(token_hash)
+
+        report("session by token (ORM)", await timed(orm_session, iterations))
+        report("session by token (prepared)", await timed(fast_session, iterations))
+
+        async def orm_user():
+            assert await User.objects.get_or_none(email_address=user.email_address)
+
+        async def fast_user():
+            assert await user_by_email(user.email_address)
+
+        report("user by email (ORM)", await timed(orm_user, iterations))
+        report("user by email (prepared)", await timed(fast_user, iterations))
+
+        expires_at = datetime.now(UTC) + timedelta(hours=1)
+
+        async def orm_extend():
+            for session in sessions:
+                await Session.objects.filter(id=session.id).update(expires_at=expires_at)
+
+        async def batched_extend():
+            for session in sessions:
+                session_expiry_writer.schedule(session.id, expires_at)
+            await session_expiry_writer.flush()
+
+        batch_iterations = max(iterations // batch_size, 10)
+        report(f"extend {batch_size} sessions (ORM)", await timed(orm_extend, batch_iterations))
+        report(
+            f"extend {batch_size} sessions (prepared)",
+            await timed(batched_extend, batch_iterations),
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations, args.batch_size))
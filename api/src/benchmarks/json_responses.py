@@ -0,0 +1,76 @@
+"""
+Compares the cost of returning a large list of rows: loading ORM models and
+rendering them with FastAPI's default encoder and `JSONResponse`, against
+fetching plain dicts with `QuerySet.values()` and rendering them with
+`common.responses.FastJSONResponse`. Each is timed for rendering alone, and
+for fetching and rendering together.
+
+Runs against SQLite with `TESTING=true`, and the configured Postgres
+database otherwise.
+
+Usage:
+    python -m benchmarks.json_responses [--iterations N] [--rows N]
+"""
+
+import argparse
+import asyncio
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks._setup import report, scratch_database, timed
+from common.responses import FastJSONResponse
+from models import User
+
+FIELDS = ["id", "first_name", "last_name", "email_address", "is_verified", "created_at"]
+
+
+async def main(iterations: int, rows: int):
+    async with scratch_database():
+        await User.objects.bulk_create(
+            [
+                User(
+                    id=uuid4(),
+                    first_name="Bench",
+                    last_name=f"Mark {i}",
+                    email_address=f"bench.mark.{i}@example.com",
+                    password="not-a-real-hash",
+                    is_verified=True,
+                )
+                for i in range(rows)
+            ]
+        )
+
+        models = await User.objects.all()
+        dicts = await User.objects.values(FIELDS)
+
+        async def render_models():
+            JSONResponse(
+                jsonable_encoder([user.model_dump(include=set(FIELDS)) for user in models])
+            )
+
+        async def render_dicts():
+            FastJSONResponse(dicts)
+
+        report(f"render {rows} rows (ORM)", await timed(render_models, iterations))
+        report(f"render {rows} rows (values)", await timed(render_dicts, iterations))
+
+        async def fetch_models():
+            users = await User.objects.all()
+            JSONResponse(jsonable_encoder([user.model_dump(include=set(FIELDS)) for user in users]))
+
+        async def fetch_dicts():
+            FastJSONResponse(await User.objects.values(FIELDS))
+
+        report(f"fetch + render {rows} rows (ORM)", await timed(fetch_models, iterations))
+        report(f"fetch + render {rows} rows (values)", await timed(fetch_dicts, iterations))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations, args.rows))
@@ -0,0 +1,71 @@
+"""
+Compares the cost of authenticating a request in each session token mode:
+database lookups with and without the session cache, and signed session
+claims.
+
+Usage:
+    python -m benchmarks.session_auth [--iterations N]
+"""
+
+import argparse
+import asyncio
+from uuid import uuid4
+
+from starlette.requests import HTTPConnection
+
+from authentication.middleware import TurvaAuthenticationBackend
+from authentication.session_cache import session_cache
+from benchmarks._setup import report, scratch_database, timed
+from config import Config
+from models import Session, User
+
+
+def make_connection(session_data: dict) -> HTTPConnection:
+    return HTTPConnection({"type": "http", "session": session_data, "headers": []})
+
+
+async def main(iterations: int):
+    async with scratch_database():
+        user = await User.objects.create(
+            id=uuid4(),
+            first_name="Bench",
+            last_name="Mark",
+            email_address="bench.mark@example.com",
+            password="not-a-real-hash",
+            is_verified=True,
+        )
+        _, session_token = await Session.create_session(user)
+        backend = TurvaAuthenticationBackend()
+
+        async def authenticate(session_data: dict):
+            assert await backend.authenticate(make_connection(session_data)) is not None
+
+        Config.Application.session_token_mode = "database"
+        max_size = session_cache.max_size
+
+        session_cache.max_size = 0
+        session_data = {"session_token": session_token}
+        report(
+            "database (no session cache)",
+            await timed(lambda: authenticate(session_data), iterations),
+        )
+
+        session_cache.max_size = max_size
+        report(
+            "database (session cache)",
+            await timed(lambda: authenticate(session_data), iterations),
+        )
+
+        Config.Application.session_token_mode = "signed"
+        session_data = {"session_token": session_token}
+        # The first request issues the claims
+        await authenticate(session_data)
+        report("signed claims", await timed(lambda: authenticate(session_data), iterations))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,57 @@
+"""
+Compares how long it takes to load the routes in each route loading mode:
+walking the endpoints folder, importing the modules in the route manifest,
+and registering the manifest's routes lazily.
+
+Each run is a fresh interpreter, so the timings include importing the
+endpoint modules and their dependencies. FastAPI and the models are imported
+in every mode, so they are imported before the timing starts; otherwise they
+take most of the time, and the differences are lost in the noise.
+
+Usage:
+    python -m benchmarks.startup [--iterations N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prints how long importing the endpoints took, in seconds
+IMPORT_ENDPOINTS = (
+    "import fastapi, models, time; start = time.perf_counter(); import endpoints; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def time_import(mode: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_ENDPOINTS],
+        cwd=SRC_DIR,
+        env={**os.environ, "ROUTE_LOADING": mode},
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main(iterations: int):
+    for mode in ("discover", "manifest", "lazy"):
+        # The first run also compiles bytecode, so is left out
+        time_import(mode)
+        durations = [time_import(mode) * 1000 for _ in range(iterations)]
+        print(
+            f"{mode:<40} mean {statistics.mean(durations):>9.1f}ms"
+            f"   p50 {statistics.median(durations):>9.1f}ms   max {max(durations):>9.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,127 @@
+"""
+Compares the session and user join that authenticates a request, with UUID
+keys stored as CHAR(32) (with the duplicate unique constraints on `id` that
+the original migrations created) and as native `uuid` columns, and on
+Postgres the size of each layout's indexes.
+
+On SQLite both layouts store CHAR(32), so only Postgres shows a difference.
+
+Usage:
+    python -m benchmarks.uuid_join [--iterations N] [--rows N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import sqlalchemy
+from ormar.fields import sqlalchemy_uuid
+
+from benchmarks._setup import report, scratch_database, timed
+from models._database import DATABASE_URL, database
+from models._fields import NativeUUIDType
+
+
+def make_tables(metadata: sqlalchemy.MetaData, name: str, uuid_type, duplicate_unique: bool):
+    extra_user, extra_session = [], []
+    if duplicate_unique:
+        extra_user.append(sqlalchemy.UniqueConstraint("id"))
+        extra_session.append(sqlalchemy.UniqueConstraint("id"))
+
+    users = sqlalchemy.Table(
+        f"bench_{name}_user",
+        metadata,
+        sqlalchemy.Column("id", uuid_type, primary_key=True),
+        sqlalchemy.Column("email_address", sqlalchemy.String(100)),
+        *extra_user,
+    )
+    sessions = sqlalchemy.Table(
+        f"bench_{name}_session",
+        metadata,
+        sqlalchemy.Column("id", uuid_type, primary_key=True),
+        sqlalchemy.Column("user", uuid_type, sqlalchemy.ForeignKey(users.c.id), index=True),
+        sqlalchemy.Column("token_hash", sqlalchemy.LargeBinary(32), unique=True),
+        sqlalchemy.Column("expires_at", sqlalchemy.DateTime(timezone=True)),
+        *extra_session,
+    )
+    return users, sessions
+
+
+async def populate(users, sessions, rows: int) -> list[bytes]:
+    expires_at = datetime.now(UTC) + timedelta(hours=1)
+    user_rows: list[dict[str, Any]] = [
+        {"id": uuid.uuid4(), "email_address": f"{i}@example.com"} for i in range(rows)
+    ]
+    session_rows: list[dict[str, Any]] = [
+        {
+            "id": uuid.uuid4(),
+            "user": user["id"],
+            "token_hash": os.urandom(32),
+            "expires_at": expires_at,
+        }
+        for user in user_rows
+    ]
+    async with database.transaction():
+        async with database.connection() as conn:
+            await conn.execute(users.insert().values(user_rows))
+            await conn.execute(sessions.insert().values(session_rows))
+    return [row["token_hash"] for row in session_rows]
+
+
+async def index_size(table_name: str) -> int:
+    async with database.connection() as conn:
+        result = await conn.execute(
+            sqlalchemy.text(f"SELECT pg_indexes_size('{table_name}')"),
+        )
+        return result.scalar_one()
+
+
+async def main(iterations: int, rows: int):
+    metadata = sqlalchemy.MetaData()
+    layouts = {
+        # ormar's own UUID type, stored as CHAR(32) on every database
+        "char(32)": make_tables(metadata, "char", sqlalchemy_uuid.UUID(), duplicate_unique=True),
+        "native uuid": make_tables(metadata, "uuid", NativeUUIDType(), duplicate_unique=False),
+    }
+
+    async with scratch_database():
+        async with database.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+        try:
+            for name, (users, sessions) in layouts.items():
+                token_hashes = await populate(users, sessions, rows)
+                query = (
+                    sqlalchemy.select(sessions, users)
+                    .join(users, sessions.c.user == users.c.id)
+                    .where(sessions.c.token_hash == sqlalchemy.bindparam("token_hash"))
+                )
+
+                async def authenticate(query=query, token_hashes=token_hashes):
+                    async with database.connection() as conn:
+                        result = await conn.execute(
+                            query, {"token_hash": random.choice(token_hashes)}
+                        )
+                        assert result.first() is not None
+
+                report(f"auth join ({name})", await timed(authenticate, iterations))
+
+                if DATABASE_URL.startswith("postgresql"):
+                    size = await index_size(users.name) + await index_size(sessions.name)
+                    print(f"{'':<40} indexes {size / 1024:>9.0f}KiB")
+        finally:
+            async with database.engine.begin() as conn:
+                await conn.run_sync(metadata.drop_all)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.iterations, args.rows))
@@ -0,0 +1,3 @@
+"""
+Management commands for the API, run from `src/` with `python -m commands.<name>`.
+"""
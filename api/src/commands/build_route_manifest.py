@@ -0,0 +1,61 @@
+"""
+Generates `endpoints/_manifest.py`, the list of routes the API registers on
+startup without walking the endpoints folder.
+
+Run this after adding, moving or removing an endpoint. With `--check`, the
+manifest is left alone and the command fails if it is out of date.
+
+Usage:
+    python -m commands.build_route_manifest [--check]
+"""
+
+import argparse
+import os
+import sys
+
+from endpoints import ENDPOINTS_DIR, ManifestEntry, build_manifest, load_manifest
+
+MANIFEST_PATH = os.path.join(ENDPOINTS_DIR, "_manifest.py")
+
+
+def render_entry(entry: ManifestEntry) -> str:
+    module_path, prefix, path, methods, public = entry
+    methods_tuple = ", ".join(f'"{method}"' for method in methods)
+    if len(methods) == 1:
+        methods_tuple += ","
+    return f'    ("{module_path}", "{prefix}", "{path}", ({methods_tuple}), {public}),'
+
+
+def render(entries: list[ManifestEntry]) -> str:
+    lines = [
+        '"""',
+        "The routes registered by `endpoints`.",
+        "",
+        "Generated by `python -m commands.build_route_manifest`, do not edit by hand.",
+        '"""',
+        "",
+        "ROUTES: list[tuple[str, str, str, tuple[str, ...], bool]] = [",
+        *(render_entry(entry) for entry in entries),
+        "]",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    entries = build_manifest()
+
+    if args.check:
+        if load_manifest() != entries:
+            sys.exit(
+                "The route manifest is out of date, run `python -m commands.build_route_manifest`"
+            )
+        print("The route manifest is up to date")
+    else:
+        with open(MANIFEST_PATH, "w") as manifest:
+            manifest.write(render(entries))
+        print(f"Wrote {len(entries)} routes to {MANIFEST_PATH}")
@@ -0,0 +1,82 @@
+"""
+Picks Argon2 parameters that fit a latency budget on this machine.
+
+Memory cost is preferred over time cost, as memory is what makes Argon2
+expensive to attack with GPUs. Starting from `--max-memory`, the memory cost
+is halved until a single pass fits the budget, then passes are added while
+they still fit. Run this on the deployment hardware and set the printed
+values in the environment. Stored hashes are upgraded to the new parameters
+as users log in.
+
+Usage:
+    python -m commands.calibrate_argon2 [--budget-ms N] [--max-memory KIB] [--parallelism N]
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+from argon2 import PasswordHasher
+
+from config import Config
+
+# OWASP's minimum recommended Argon2id memory cost (19 MiB)
+MIN_MEMORY_COST = 19 * 1024
+
+
+def measure(time_cost: int, memory_cost: int, parallelism: int, samples: int = 5) -> float:
+    """Returns the median time taken to hash a password with the given parameters, in seconds."""
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    durations = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def calibrate(
+    budget: float,
+    max_memory_cost: int,
+    parallelism: int,
+    measure: Callable[[int, int, int], float] = measure,
+) -> tuple[int, int]:
+    """
+    Finds the Argon2 parameters to use for the given latency budget.
+
+    Params:
+        - budget: float - The longest a hash should take, in seconds.
+        - max_memory_cost: int - The most memory a hash may use, in KiB.
+        - parallelism: int - The number of lanes to use.
+        - measure: Callable - Times a hash with (time_cost, memory_cost, parallelism).
+
+    Returns:
+        - A tuple of (time_cost, memory_cost).
+    """
+
+    memory_cost = max_memory_cost
+    while memory_cost > MIN_MEMORY_COST and measure(1, memory_cost, parallelism) > budget:
+        memory_cost = max(memory_cost // 2, MIN_MEMORY_COST)
+
+    time_cost = 1
+    while measure(time_cost + 1, memory_cost, parallelism) <= budget:
+        time_cost += 1
+
+    return time_cost, memory_cost
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--budget-ms", type=int, default=Config.PasswordHashing.latency_budget_ms)
+    parser.add_argument("--max-memory", type=int, default=256 * 1024)
+    parser.add_argument("--parallelism", type=int, default=Config.PasswordHashing.parallelism)
+    args = parser.parse_args()
+
+    time_cost, memory_cost = calibrate(args.budget_ms / 1000, args.max_memory, args.parallelism)
+    elapsed = measure(time_cost, memory_cost, args.parallelism)
+
+    print(f"# A hash takes {elapsed * 1000:.0f}ms with these parameters")
+    print(f'ARGON2_TIME_COST="{time_cost}"')
+    print(f'ARGON2_MEMORY_COST="{memory_cost}"')
+    print(f'ARGON2_PARALLELISM="{args.parallelism}"')
@@ -0,0 +1,70 @@
+"""
+Hashes the plaintext tokens of sessions created before session tokens were
+stored hashed, in batches.
+
+Sessions are also hashed as they are used, so this only needs to run once,
+after upgrading, to clear the plaintext tokens of the remaining sessions.
+Then set `LEGACY_SESSION_TOKENS=false`, so that unknown tokens are not
+looked up a second time by their plaintext.
+Each batch is its own short transaction, so it can run while the API is
+serving requests.
+
+Usage:
+    python -m commands.hash_session_tokens [--batch-size N]
+"""
+
+import argparse
+import asyncio
+
+import sqlalchemy
+
+from models import Session
+from models._database import database
+
+
+async def hash_tokens(batch_size: int = 1000) -> int:
+    """
+    Moves every plaintext session token into `token_hash`.
+
+    Returns:
+        int: The number of sessions hashed.
+    """
+
+    table = Session.ormar_config.table
+    hashed = 0
+    while True:
+        async with database.transaction():
+            async with database.connection() as conn:
+                result = await conn.execute(
+                    sqlalchemy.select(table.c.id, table.c.token)
+                    .where(table.c.token.is_not(None))
+                    .limit(batch_size)
+                )
+                rows = result.all()
+                for row in rows:
+                    await conn.execute(
+                        table.update()
+                        .where(table.c.id == row.id)
+                        .values(token_hash=Session.hash_token(row.token), token=None)
+                    )
+
+        hashed += len(rows)
+        if len(rows) < batch_size:
+            return hashed
+
+
+async def main(batch_size: int) -> int:
+    await database.connect()
+    try:
+        return await hash_tokens(batch_size)
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    hashed = asyncio.run(main(args.batch_size))
+    print(f"Hashed {hashed} session tokens, LEGACY_SESSION_TOKENS can now be set to false")
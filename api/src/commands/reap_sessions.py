@@ -0,0 +1,36 @@
+"""
+Deletes expired sessions, in batches.
+
+The API already does this periodically from its lifespan (unless
+`SESSION_REAPER_ENABLED` is false); this command is for running it
+out of band, for example from cron.
+
+Usage:
+    python -m commands.reap_sessions [--batch-size N]
+"""
+
+import argparse
+import asyncio
+
+from models._database import database
+from models.session import session_reaper
+
+
+async def main(batch_size: int | None = None) -> int:
+    if batch_size is not None:
+        session_reaper.batch_size = batch_size
+
+    await database.connect()
+    try:
+        return await session_reaper.reap()
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    deleted = asyncio.run(main(args.batch_size))
+    print(f"Deleted {deleted} expired sessions")
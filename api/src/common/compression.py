@@ -0,0 +1,242 @@
+"""
+Compresses responses with brotli or gzip, whichever the client prefers.
+
+Brotli is only offered when the `brotli` package is installed. Responses
+smaller than `minimum_size` are sent as they are, as are responses that are
+already compressed or whose content is (images, archives), and those of
+endpoints marked with `@uncompressed`.
+
+Streamed responses are compressed a chunk at a time, each flushed as it is
+compressed, so the client receives data as soon as the endpoint sends it
+rather than when the stream ends. Large bodies are compressed in a thread so
+the event loop keeps serving other requests.
+
+Compare the size and CPU cost of each level with
+`python -m benchmarks.compression`.
+"""
+
+import asyncio
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from functools import partial
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common.endpoint_flags import Endpoint, has_flag, set_flag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies at least this large are compressed in a thread
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+# Content that is already compressed, or is sent as it is read
+UNCOMPRESSED_MEDIA_TYPES = (
+    "application/gzip",
+    "application/zip",
+    "audio/",
+    "font/woff",
+    "image/",
+    "text/event-stream",
+    "video/",
+)
+
+
+def uncompressed(endpoint: Endpoint) -> Endpoint:
+    """
+    Marks an endpoint whose responses are never compressed, such as a stream
+    the client reads line by line as it arrives.
+
+    Apply it beneath the route decorator:
+
+        @router.get("/export/")
+        @uncompressed
+        async def export(...): ...
+    """
+    return set_flag(endpoint, "is_uncompressed")
+
+
+class Encoder(ABC):
+    """Compresses one response body, a chunk at a time."""
+
+    @abstractmethod
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        """
+        Compresses `data`, returning everything compressed so far, so the
+        client can decompress it without waiting for the next chunk.
+        """
+
+
+class GzipEncoder(Encoder):
+    def __init__(self, level: int):
+        # wbits of 16 + 15 writes a gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        mode = zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(mode)
+
+
+class BrotliEncoder(Encoder):
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        compressed = self._compressor.process(data)
+        if finish:
+            return compressed + self._compressor.finish()
+        return compressed + self._compressor.flush()
+
+
+def negotiate(accept_encoding: str, available: list[str]) -> str | None:
+    """
+    Chooses the encoding to use from the `Accept-Encoding` header, preferring
+    encodings the client rates higher, then those earlier in `available`.
+    """
+    ratings: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip()
+        if not coding:
+            continue
+        rating = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                rating = float(value)
+            except ValueError:
+                rating = 0.0
+        ratings[coding] = rating
+
+    best, best_rating = None, 0.0
+    for coding in available:
+        rating = ratings.get(coding, ratings.get("*", 0.0))
+        if rating > best_rating:
+            best, best_rating = coding, rating
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 3,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoders: dict[str, Callable[[], Encoder]] = {}
+        if brotli is not None:
+            self.encoders["br"] = partial(BrotliEncoder, brotli_quality)
+        self.encoders["gzip"] = partial(GzipEncoder, gzip_level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate(accept_encoding, list(self.encoders))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(
+            scope, send, encoding, self.encoders[encoding], self.minimum_size
+        )
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    def __init__(
+        self,
+        scope: Scope,
+        send: Send,
+        encoding: str,
+        encoder: Callable[[], Encoder],
+        minimum_size: int,
+    ):
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.make_encoder = encoder
+        self.minimum_size = minimum_size
+        self.start: Message | None = None
+        self.encoder: Encoder | None = None
+        self.passthrough = False
+
+    async def send(self, message: Message):
+        if self.passthrough:
+            await self._send(message)
+        elif message["type"] == "http.response.start":
+            # Held back until the first body shows whether to compress
+            self.start = message
+            self.passthrough = not self._compressible(message)
+            if self.passthrough:
+                await self._send(message)
+        elif message["type"] != "http.response.body":
+            await self._flush_start()
+            self.passthrough = True
+            await self._send(message)
+        elif self.encoder is not None:
+            await self._next_body(self.encoder, message)
+        elif self.start is not None:
+            await self._first_body(self.start, message)
+        else:
+            # A body without a response start is not valid ASGI, so leave it alone
+            self.passthrough = True
+            await self._send(message)
+
+    def _compressible(self, start: Message) -> bool:
+        if start["status"] in (204, 206, 304):
+            return False
+        endpoint = self.scope.get("endpoint")
+        if has_flag(endpoint, "is_uncompressed"):
+            return False
+        headers = Headers(raw=start["headers"])
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").lower()
+        return not media_type.startswith(UNCOMPRESSED_MEDIA_TYPES)
+
+    async def _first_body(self, start: Message, message: Message):
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not more_body and len(body) < self.minimum_size:
+            self.passthrough = True
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        encoder = self.encoder = self.make_encoder()
+        headers = MutableHeaders(raw=start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        del headers["Content-Length"]
+
+        compressed = await self._compress(encoder, body, finish=not more_body)
+        if not more_body:
+            headers["Content-Length"] = str(len(compressed))
+        await self._flush_start()
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    async def _next_body(self, encoder: Encoder, message: Message):
+        more_body = message.get("more_body", False)
+        compressed = await self._compress(encoder, message.get("body", b""), finish=not more_body)
+        await self._send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+
+    @staticmethod
+    async def _compress(encoder: Encoder, data: bytes, finish: bool) -> bytes:
+        if len(data) >= THREAD_MINIMUM_SIZE:
+            return await asyncio.to_thread(encoder.compress, data, finish)
+        return encoder.compress(data, finish)
+
+    async def _flush_start(self):
+        if self.start is not None:
+            await self._send(self.start)
+            self.start = None
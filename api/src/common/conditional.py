@@ -0,0 +1,131 @@
+"""
+Conditional GETs for read endpoints, so a client polling for changes gets an
+empty 304 Not Modified response when nothing has changed.
+
+The `ETag` and `Last-Modified` validators come from `updated_date`, which
+is set whenever a row is updated through the models (see `models`):
+
+- `row_validators` reads one row's `updated_date`, by primary key.
+- `collection_validators` reads the latest `updated_date` and the row count
+  of a filtered table in one aggregate query, so rows being deleted change
+  the validators too.
+
+Either query is much cheaper than loading and serializing the content, which
+`conditional_response` only does when the client's copy is out of date:
+
+    @router.get("/hazards/")
+    async def hazards(request: Request):
+        validators = await collection_validators(Hazard, hazards.c.project == project_id)
+        return await conditional_response(
+            request, validators, lambda: Hazard.objects.filter(project=project_id).values()
+        )
+
+The validators are read from the primary, so a lagging replica cannot make a
+client keep a stale copy.
+"""
+
+import hashlib
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+import ormar
+import sqlalchemy
+from fastapi import Request, Response
+from sqlalchemy.sql import ColumnElement
+
+from common.responses import FastJSONResponse
+from models._database import database
+
+# Clients must check with the API before using their copy, and shared caches
+# must not store it, as the content belongs to the logged in user
+CACHE_CONTROL = "private, no-cache"
+
+
+@dataclass(frozen=True, slots=True)
+class Validators:
+    etag: str
+    last_modified: datetime | None
+
+    @classmethod
+    def of(cls, *parts: object, last_modified: datetime | None) -> "Validators":
+        """Builds validators that change whenever any of `parts` does."""
+        digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+        if last_modified is not None and last_modified.tzinfo is None:
+            # `updated_date` is stored in the server's local time
+            last_modified = last_modified.astimezone(UTC)
+        # Weak, as the body may be compressed differently each time
+        return cls(etag=f'W/"{digest}"', last_modified=last_modified)
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+
+async def row_validators(model: type[ormar.Model], pk: Any) -> Validators | None:
+    """The validators of one row, or None if it does not exist."""
+    table = model.ormar_config.table
+    query = sqlalchemy.select(table.c.updated_date).where(table.c[model.ormar_config.pkname] == pk)
+    async with database.get_query_executor() as executor:
+        row = await executor.fetch_one(query)
+    if row is None:
+        return None
+
+    updated_date = row["updated_date"]
+    return Validators.of(model.ormar_config.tablename, pk, updated_date, last_modified=updated_date)
+
+
+async def collection_validators(model: type[ormar.Model], *where: ColumnElement) -> Validators:
+    """The validators of the rows matching `where`, from their count and latest update."""
+    table = model.ormar_config.table
+    query = sqlalchemy.select(
+        sqlalchemy.func.count().label("count"),
+        sqlalchemy.func.max(table.c.updated_date).label("updated_date"),
+    ).where(*where)
+    async with database.get_query_executor() as executor:
+        row = await executor.fetch_one(query)
+
+    updated_date = row["updated_date"]
+    return Validators.of(
+        model.ormar_config.tablename, row["count"], updated_date, last_modified=updated_date
+    )
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    """
+    Whether the client's copy is still current. `If-None-Match` takes
+    precedence over `If-Modified-Since`, as HTTP requires.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or validators.etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or validators.last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # HTTP dates are only precise to the second
+    return validators.last_modified.replace(microsecond=0) <= since
+
+
+async def conditional_response(
+    request: Request, validators: Validators, content: Callable[[], Awaitable[Any]]
+) -> Response:
+    """
+    Answers with 304 Not Modified if the client's copy is current, and only
+    otherwise awaits `content` and sends it.
+    """
+    if request.method in ("GET", "HEAD") and is_not_modified(request, validators):
+        return Response(status_code=304, headers=validators.headers)
+    return FastJSONResponse(await content(), headers=validators.headers)
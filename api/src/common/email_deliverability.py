@@ -0,0 +1,154 @@
+import asyncio
+import ipaddress
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import dns.asyncresolver
+import dns.exception
+import dns.resolver
+
+from config import Config
+
+
+class DomainResolver(ABC):
+    """
+    Looks up whether a domain can receive email.
+
+    `DNSResolver` asks DNS. Tests use an offline stand-in instead, set on
+    `DeliverabilityChecker.resolver`.
+    """
+
+    @abstractmethod
+    async def lookup(self, domain: str) -> tuple[bool, float]:
+        """
+        Looks up the mail servers for `domain`.
+
+        Returns:
+            tuple[bool, float]: Whether the domain can receive email, and
+            how many seconds that answer can be cached for.
+
+        Raises:
+            dns.exception.DNSException: If the answer is not known, e.g. on
+            a timeout.
+        """
+
+
+class DNSResolver(DomainResolver):
+    """
+    Checks for MX records, falling back to A and AAAA records when there
+    are none (RFC 5321 section 5), without blocking the event loop.
+    """
+
+    def __init__(self):
+        self._resolver = dns.asyncresolver.Resolver()
+
+    async def lookup(self, domain: str) -> tuple[bool, float]:
+        negative_ttl = Config.EmailDeliverability.negative_ttl
+        try:
+            answer = await self._resolver.resolve(domain, "MX")
+            # A null MX record (RFC 7505) means the domain does not accept email
+            deliverable = any(str(record.exchange) != "." for record in answer)
+            return deliverable, answer.ttl if deliverable else negative_ttl
+        except dns.resolver.NXDOMAIN:
+            return False, negative_ttl
+        except dns.resolver.NoAnswer:
+            pass
+
+        for rdtype in ("A", "AAAA"):
+            try:
+                answer = await self._resolver.resolve(domain, rdtype)
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                continue
+            if any(ipaddress.ip_address(record.address).is_global for record in answer):
+                return True, answer.ttl
+
+        return False, negative_ttl
+
+
+class DeliverabilityChecker:
+    """
+    Checks whether email domains can receive email, caching the answer
+    for each domain.
+
+    Most sign-ups share a handful of domains, so most checks are answered
+    from the cache. Answers are kept for their DNS TTL (capped at
+    `EMAIL_DELIVERABILITY_MAX_TTL`), and domains that cannot receive email
+    for `EMAIL_DELIVERABILITY_NEGATIVE_TTL`. Once an answer expires it is
+    still used while it is refreshed in the background, so only the first
+    sign-up from a domain waits on DNS. Concurrent lookups for the same
+    domain share one query.
+
+    If DNS cannot answer within `EMAIL_DELIVERABILITY_TIMEOUT` seconds,
+    the domain is treated as deliverable rather than turning users away.
+    """
+
+    def __init__(self, resolver: DomainResolver, max_size: int):
+        self.resolver = resolver
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+        self._lookups: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    async def is_deliverable(self, domain: str) -> bool:
+        domain = domain.lower()
+        entry = self._entries.get(domain)
+        if entry is None:
+            self.misses += 1
+            # Shielded so that a cancelled request does not cancel a lookup others are waiting on
+            return await asyncio.shield(self._lookup(domain))
+
+        expires_at, deliverable = entry
+        self._entries.move_to_end(domain)
+        self.hits += 1
+        if time.monotonic() >= expires_at:
+            self._lookup(domain)
+        return deliverable
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
+
+    def _lookup(self, domain: str) -> asyncio.Task:
+        task = self._lookups.get(domain)
+        if task is None:
+            task = asyncio.create_task(self._resolve(domain))
+            task.add_done_callback(lambda _: self._lookups.pop(domain, None))
+            self._lookups[domain] = task
+        return task
+
+    async def _resolve(self, domain: str) -> bool:
+        try:
+            deliverable, ttl = await asyncio.wait_for(
+                self.resolver.lookup(domain),
+                timeout=Config.EmailDeliverability.timeout,
+            )
+        except (dns.exception.DNSException, TimeoutError) as err:
+            self.failures += 1
+            logging.warning(f"[email] could not check whether {domain} receives email: {err!r}")
+            return True
+
+        if self.max_size > 0:
+            ttl = min(ttl, Config.EmailDeliverability.max_ttl)
+            self._entries[domain] = (time.monotonic() + ttl, deliverable)
+            self._entries.move_to_end(domain)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return deliverable
+
+
+deliverability_checker = DeliverabilityChecker(
+    DNSResolver(),
+    max_size=Config.EmailDeliverability.cache_size,
+)
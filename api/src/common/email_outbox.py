@@ -0,0 +1,311 @@
+import asyncio
+import email.message
+import logging
+import smtplib
+import time
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from typing import cast
+from uuid import UUID, uuid4
+
+import sqlalchemy
+from sqlalchemy.engine import CursorResult, Row
+
+from common.periodic import PeriodicTask
+from config import Config
+from models import OutboxEmail
+from models._database import database
+
+# How often finished emails are purged, and how many are deleted at a time
+PURGE_INTERVAL = 3600
+PURGE_BATCH_SIZE = 1000
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` logged-in SMTP connections open and reuses them,
+    rather than connecting, negotiating TLS and logging in for every email.
+
+    smtplib is blocking, so all of its calls run in a thread. Connections
+    that have been idle for longer than `idle_timeout` seconds are closed
+    rather than reused, as servers drop idle connections.
+    """
+
+    def __init__(self, size: int, idle_timeout: float):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: list[tuple[float, smtplib.SMTP]] = []
+
+    @asynccontextmanager
+    async def connection(self):
+        async with self._semaphore:
+            server = await self._take_idle()
+            if server is None:
+                server = await asyncio.to_thread(self._connect)
+
+            try:
+                yield server
+            except BaseException:
+                # The connection may be in an unknown state, so do not reuse it
+                await asyncio.to_thread(self._quit, server)
+                raise
+
+            self._idle.append((time.monotonic(), server))
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, server in idle:
+            await asyncio.to_thread(self._quit, server)
+        # Replaced so the pool can be used again from a new event loop
+        self._semaphore = asyncio.Semaphore(self.size)
+
+    async def _take_idle(self) -> smtplib.SMTP | None:
+        while self._idle:
+            last_used, server = self._idle.pop()
+            if time.monotonic() - last_used < self.idle_timeout:
+                return server
+            await asyncio.to_thread(self._quit, server)
+        return None
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(Config.SMTP.host, Config.SMTP.port, timeout=30)
+        if Config.SMTP.use_tls:
+            server.starttls()
+        if Config.SMTP.user and Config.SMTP.password:
+            server.login(Config.SMTP.user, Config.SMTP.password)
+        return server
+
+    @staticmethod
+    def _quit(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+
+class EmailOutboxWorker(PeriodicTask):
+    """
+    Sends the emails queued in `tbl_email_outbox`.
+
+    Endpoints call `enqueue`, which only inserts a row, so they never wait
+    on the SMTP server. A background task claims due emails in batches,
+    sends them over pooled SMTP connections and retries failures with
+    exponential backoff, giving up after `EMAIL_OUTBOX_MAX_ATTEMPTS`.
+
+    Claiming an email pushes its `next_attempt_at` out by
+    `EMAIL_OUTBOX_SEND_TIMEOUT`, so several workers can share the outbox
+    without sending an email twice, and emails claimed by a worker that
+    died are retried once the timeout passes.
+
+    Sent emails, and those it gave up on, are deleted once they are older
+    than `EMAIL_OUTBOX_RETENTION_DAYS`, checked every `PURGE_INTERVAL`
+    seconds.
+    """
+
+    error_message = "[email] failed to process the email outbox"
+
+    def __init__(self, pool: SMTPConnectionPool):
+        super().__init__(Config.EmailOutbox.poll_interval)
+        self.pool = pool
+        self.sent = 0
+        self.failed = 0
+        # Emails that failed for the last time
+        self.gave_up = 0
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._next_purge = 0.0
+
+    async def enqueue(self, to_address: str, subject: str, body: str) -> OutboxEmail:
+        outbox_email = await OutboxEmail.objects.create(
+            id=uuid4(),
+            to_address=to_address,
+            subject=subject,
+            body=body,
+            next_attempt_at=datetime.now(UTC),
+        )
+        # Send straight away rather than waiting for the next poll
+        self._wake.set()
+        return outbox_email
+
+    async def drain(self) -> int:
+        """
+        Sends due emails until there are none left.
+
+        Returns:
+            int: The number of emails processed (sent or failed).
+        """
+        processed = 0
+        while count := await self.process_batch():
+            processed += count
+        return processed
+
+    async def process_batch(self) -> int:
+        async with self._lock:
+            batch = await self._claim_batch()
+            if batch:
+                results = await asyncio.gather(*(self._send(row) for row in batch))
+                await self._record_results(batch, results)
+            return len(batch)
+
+    async def purge(self) -> int:
+        """
+        Deletes sent and given up emails older than `EMAIL_OUTBOX_RETENTION_DAYS`,
+        one batch at a time.
+
+        Returns:
+            int: The number of emails deleted.
+        """
+        table = OutboxEmail.ormar_config.table
+        deleted = 0
+        while True:
+            # Finished emails keep the `next_attempt_at` of their last attempt, which
+            # dates them to within the send timeout or the retry backoff
+            finished_before = datetime.now(UTC) - timedelta(days=Config.EmailOutbox.retention_days)
+            finished_ids = (
+                sqlalchemy.select(table.c.id)
+                .where(
+                    table.c.status.in_(("sent", "failed")),
+                    table.c.next_attempt_at <= finished_before,
+                )
+                .limit(PURGE_BATCH_SIZE)
+                .scalar_subquery()
+            )
+            query = table.delete().where(table.c.id.in_(finished_ids))
+
+            async with database.transaction():
+                async with database.connection() as conn:
+                    result = cast(CursorResult, await conn.execute(query))
+
+            deleted += result.rowcount
+            if result.rowcount < PURGE_BATCH_SIZE:
+                return deleted
+
+            # Give other tasks a chance to run between batches
+            await asyncio.sleep(0)
+
+    def stats(self) -> dict[str, int]:
+        return {"sent": self.sent, "failed": self.failed, "gave_up": self.gave_up}
+
+    async def tick(self):
+        await self.drain()
+
+        if time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + PURGE_INTERVAL
+            try:
+                purged = await self.purge()
+                if purged:
+                    logging.info(f"[email] purged {purged} finished emails from the outbox")
+            except Exception:
+                logging.exception("[email] failed to purge the email outbox")
+
+    async def wait(self):
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+        except TimeoutError:
+            pass
+        self._wake.clear()
+
+    def start(self):
+        # Send anything already due without waiting for the first poll
+        self._wake.set()
+        super().start()
+
+    async def stop(self):
+        await super().stop()
+        await self.pool.close()
+        # Replaced so the worker can be started again from a new event loop
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    async def _claim_batch(self) -> list[Row]:
+        table = OutboxEmail.ormar_config.table
+        now = datetime.now(UTC)
+        due = (
+            sqlalchemy.select(table.c.id)
+            .where(table.c.status == "pending", table.c.next_attempt_at <= now)
+            .order_by(table.c.next_attempt_at)
+            .limit(Config.EmailOutbox.batch_size)
+            .scalar_subquery()
+        )
+        query = (
+            table.update()
+            # Re-checking the due condition means only one worker can claim each email
+            .where(
+                table.c.id.in_(due),
+                table.c.status == "pending",
+                table.c.next_attempt_at <= now,
+            )
+            .values(
+                next_attempt_at=now + timedelta(seconds=Config.EmailOutbox.send_timeout),
+                attempts=table.c.attempts + 1,
+            )
+            .returning(
+                table.c.id, table.c.to_address, table.c.subject, table.c.body, table.c.attempts
+            )
+        )
+        async with database.transaction():
+            async with database.connection() as conn:
+                result = await conn.execute(query)
+                return list(result.all())
+
+    async def _send(self, row: Row) -> str | None:
+        message = email.message.EmailMessage()
+        message["From"] = f"Turva <{Config.SMTP.from_address}>"
+        message["To"] = row.to_address
+        message["Subject"] = row.subject
+        message.set_content(row.body)
+        message.set_type("text/html")
+
+        for retry in (True, False):
+            try:
+                async with self.pool.connection() as server:
+                    await asyncio.to_thread(server.send_message, message)
+                return None
+            except (smtplib.SMTPException, OSError) as err:
+                # The server may have dropped a pooled connection, so retry once on another
+                if retry and isinstance(err, smtplib.SMTPServerDisconnected):
+                    continue
+                logging.warning(f"[email] failed to send email {row.id}: {err!r}")
+                return repr(err)
+        return None
+
+    async def _record_results(self, batch: list[Row], errors: list[str | None]):
+        table = OutboxEmail.ormar_config.table
+        now = datetime.now(UTC)
+        sent_ids: list[UUID] = []
+
+        async with database.transaction():
+            async with database.connection() as conn:
+                for row, error in zip(batch, errors, strict=True):
+                    if error is None:
+                        sent_ids.append(row.id)
+                        continue
+
+                    self.failed += 1
+                    gave_up = row.attempts >= Config.EmailOutbox.max_attempts
+                    if gave_up:
+                        self.gave_up += 1
+                    backoff = Config.EmailOutbox.retry_backoff * 2 ** (row.attempts - 1)
+                    await conn.execute(
+                        table.update()
+                        .where(table.c.id == row.id)
+                        .values(
+                            status="failed" if gave_up else "pending",
+                            next_attempt_at=now + timedelta(seconds=backoff),
+                            last_error=error,
+                        )
+                    )
+
+                if sent_ids:
+                    self.sent += len(sent_ids)
+                    await conn.execute(
+                        table.update()
+                        .where(table.c.id.in_(sent_ids))
+                        .values(status="sent", sent_at=now)
+                    )
+
+
+email_outbox = EmailOutboxWorker(
+    SMTPConnectionPool(size=Config.SMTP.pool_size, idle_timeout=Config.SMTP.idle_timeout)
+)
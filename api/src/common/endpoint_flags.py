@@ -0,0 +1,20 @@
+"""
+Flags that decorators such as `@public` and `@uncompressed` set on endpoint
+functions, for the middleware that acts on them to read back from the route
+or from `scope["endpoint"]`.
+"""
+
+from collections.abc import Callable
+from typing import TypeVar
+
+Endpoint = TypeVar("Endpoint", bound=Callable)
+
+
+def set_flag(endpoint: Endpoint, name: str) -> Endpoint:
+    # `setattr`, as `Callable` does not say that functions can take any attribute
+    setattr(endpoint, name, True)
+    return endpoint
+
+
+def has_flag(endpoint: object, name: str) -> bool:
+    return getattr(endpoint, name, False) is True
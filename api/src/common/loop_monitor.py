@@ -0,0 +1,133 @@
+"""
+Watches for anything holding up the event loop.
+
+Each worker runs a single event loop, so a blocking call (synchronous I/O,
+a DNS lookup, hashing a password) delays every request that worker is
+handling. `LoopMonitor` sleeps for `LOOP_MONITOR_INTERVAL` seconds at a
+time and records how much later than asked for it was woken, as
+`turva_event_loop_lag_seconds`.
+
+With `LOOP_DETECT_BLOCKING`, a thread also checks that the loop keeps
+waking the monitor, and when it has not for `LOOP_BLOCKING_THRESHOLD`
+seconds, logs the stack of whatever the loop is running, so a blocking call
+can be found without a profiler.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from common.metrics import metrics
+from common.periodic import PeriodicTask
+from config import Config
+
+lag_seconds = metrics.histogram(
+    "turva_event_loop_lag_seconds",
+    "How much later than scheduled the event loop ran a timer, in seconds",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+class LoopMonitor(PeriodicTask):
+    """
+    Samples the event loop's scheduling delay in the background and,
+    if `detect_blocking` is set, logs the stack of calls that block it.
+    """
+
+    error_message = "[loop monitor] failed to record the event loop lag"
+
+    def __init__(self, interval: float, detect_blocking: bool, blocking_threshold: float):
+        super().__init__(interval)
+        self.detect_blocking = detect_blocking
+        self.blocking_threshold = blocking_threshold
+        self.lag_seconds_max = 0.0
+        self.blocking_calls = 0
+        self._watchdog: threading.Thread | None = None
+        self._stopping = threading.Event()
+        # When the monitor last asked the loop to wake it, by time.monotonic()
+        self._scheduled_at = time.monotonic()
+        # When the loop should wake the monitor next, by the loop's clock
+        self._expected = 0.0
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "lag_seconds_max": self.lag_seconds_max,
+            "blocking_calls": self.blocking_calls,
+        }
+
+    def record(self, lag: float):
+        self.lag_seconds_max = max(self.lag_seconds_max, lag)
+        lag_seconds.observe(lag)
+
+    async def wait(self):
+        self._scheduled_at = time.monotonic()
+        self._expected = asyncio.get_running_loop().time() + self.interval
+        await super().wait()
+
+    async def tick(self):
+        self.record(max(asyncio.get_running_loop().time() - self._expected, 0.0))
+
+    def start(self):
+        if self._task is not None:
+            return
+
+        self._scheduled_at = time.monotonic()
+        super().start()
+        if self.detect_blocking:
+            self._stopping.clear()
+            self._watchdog = threading.Thread(
+                target=self._watch,
+                args=(threading.get_ident(),),
+                name="loop-monitor",
+                daemon=True,
+            )
+            self._watchdog.start()
+
+    async def stop(self):
+        if self._watchdog is not None:
+            self._stopping.set()
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+        await super().stop()
+
+    def _watch(self, loop_thread_id: int):
+        # Runs in its own thread, so it keeps running while the loop is blocked
+        check_interval = min(self.interval, self.blocking_threshold) / 2
+        reported = None
+        while not self._stopping.wait(check_interval):
+            scheduled_at = self._scheduled_at
+            blocked_for = time.monotonic() - scheduled_at - self.interval
+            if blocked_for < self.blocking_threshold or reported == scheduled_at:
+                continue
+
+            # Report each stall once, with the stack at the time it was noticed
+            reported = scheduled_at
+            frame = sys._current_frames().get(loop_thread_id)
+            if frame is None:
+                continue
+            self.blocking_calls += 1
+            stack = "".join(traceback.format_list(_callback_stack(frame)))
+            logging.warning(
+                f"[loop monitor] the event loop has been blocked for at least "
+                f"{blocked_for:.3f}s, in:\n{stack}"
+            )
+
+
+def _callback_stack(frame) -> traceback.StackSummary:
+    """The frames below the event loop itself, from the callback it is running"""
+    stack = traceback.extract_stack(frame)
+    for index in range(len(stack) - 1, -1, -1):
+        if stack[index].filename == asyncio.events.__file__:
+            return traceback.StackSummary.from_list(stack[index + 1 :])
+    return stack
+
+
+loop_monitor = LoopMonitor(
+    interval=Config.LoopMonitor.interval,
+    detect_blocking=Config.LoopMonitor.detect_blocking,
+    blocking_threshold=Config.LoopMonitor.blocking_threshold,
+)
@@ -0,0 +1,315 @@
+"""
+Runtime metrics, served at `/metrics` in Prometheus' text format.
+
+Counters, gauges and histograms are kept in plain dicts in each worker
+process. A worker runs a single event loop, so recording is a dict lookup
+and an addition, with no locks. Stats that components already keep for
+themselves (the database pool, caches, the password hasher and the email
+outbox) are read through their `stats()` methods when metrics are collected,
+so they cost nothing on the hot path.
+
+Each uvicorn worker has its own metrics. With `METRICS_DIR` set, every
+worker writes a snapshot of its metrics there every `METRICS_WRITE_INTERVAL`
+seconds and when it stops, and `/metrics` adds up the snapshots of all the
+workers. Counters and histograms include workers that have since exited, so
+totals never go backwards; gauges only include workers that are running.
+`python -m server` empties the directory when it starts.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+from common.periodic import PeriodicTask
+from config import Config
+
+Labels = tuple[str, ...]
+
+# Seconds, suited to request latencies and Argon2 operations
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metric:
+    kind: str
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: dict[Labels, Any] = {}
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "help": self.help,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(labels), value] for labels, value in self.values.items()],
+        }
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels: str):
+        self.values[labels] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str):
+        # The count in each bucket (not cumulative), then +Inf, then the sum
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self._collectors: list[
+            tuple[str, str, Callable[[], Mapping[str, float]], frozenset[str]]
+        ] = []
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def collect(
+        self,
+        prefix: str,
+        help: str,
+        stats: Callable[[], Mapping[str, float]],
+        gauges: Iterable[str] = (),
+    ):
+        """
+        Reports the numbers returned by `stats` as `<prefix>_<key>` when
+        metrics are collected. Keys listed in `gauges` are gauges, the rest
+        are counters, and maxima (`*_max`) are left out.
+        """
+        self._collectors.append((prefix, help, stats, frozenset(gauges)))
+
+    def snapshot(self) -> dict[str, Any]:
+        """This process's metrics, in a form that can be written as JSON and merged."""
+        metrics = [metric.snapshot() for metric in self.metrics.values()]
+        for prefix, help, stats, gauges in self._collectors:
+            for key, value in stats().items():
+                if key.endswith("_max"):
+                    # Maxima cannot be added up across workers
+                    continue
+                kind = "gauge" if key in gauges else "counter"
+                name = f"{prefix}_{key}"
+                if kind == "counter" and not name.endswith("_total"):
+                    name += "_total"
+                metrics.append(
+                    {
+                        "name": name,
+                        "kind": kind,
+                        "help": f"{help}: {key.replace('_', ' ')}",
+                        "labelnames": [],
+                        "samples": [[[], value]],
+                    }
+                )
+        return {"pid": os.getpid(), "written_at": time.time(), "metrics": metrics}
+
+    def _add(self, metric: Metric) -> Any:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+
+def merge(snapshots: Iterable[dict[str, Any]], running: Callable[[int], bool]) -> list[dict]:
+    """
+    Adds up the snapshots of several processes. Gauges are only taken from
+    processes for which `running(pid)` is true.
+    """
+    merged: dict[str, dict[str, Any]] = {}
+    for snapshot in snapshots:
+        is_running = running(snapshot["pid"])
+        for metric in snapshot["metrics"]:
+            if metric["kind"] == "gauge" and not is_running:
+                continue
+
+            into = merged.setdefault(metric["name"], {**metric, "samples": {}})
+            samples = into["samples"]
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if key not in samples:
+                    samples[key] = value
+                elif isinstance(value, list):
+                    samples[key] = [a + b for a, b in zip(samples[key], value, strict=True)]
+                else:
+                    samples[key] += value
+    return list(merged.values())
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def render(metrics: list[dict[str, Any]]) -> str:
+    """Renders merged metrics in Prometheus' text exposition format."""
+    lines = []
+    for metric in sorted(metrics, key=lambda metric: metric["name"]):
+        name, names = metric["name"], metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for labels, value in sorted(metric["samples"].items()):
+            if metric["kind"] != "histogram":
+                lines.append(f"{name}{_labels(names, labels)} {value}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip([*metric["buckets"], "+Inf"], value[:-1], strict=True):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{_labels(names, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(names, labels)} {value[-1]}")
+            lines.append(f"{name}_count{_labels(names, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsWriter(PeriodicTask):
+    """
+    Writes this process's metrics to `directory` in the background, so that
+    whichever worker serves `/metrics` can include them.
+    """
+
+    error_message = "[metrics] failed to write metrics"
+
+    def __init__(self, registry: MetricsRegistry, directory: str | None, interval: float):
+        super().__init__(interval)
+        self.registry = registry
+        self.directory = directory
+
+    async def write(self):
+        if self.directory is not None:
+            content = json.dumps(self.registry.snapshot())
+            await asyncio.to_thread(_write_snapshot, self.directory, content)
+
+    async def read(self) -> list[dict[str, Any]]:
+        """The metrics of every worker, with this process's taken live."""
+        snapshots = [self.registry.snapshot()]
+        if self.directory is not None:
+            snapshots += await asyncio.to_thread(_read_other_snapshots, self.directory)
+        return merge(snapshots, _is_running)
+
+    async def tick(self):
+        await self.write()
+
+    def start(self):
+        if self.directory is not None:
+            super().start()
+
+    async def stop(self):
+        await super().stop()
+        # Keep this process's counters after it exits
+        await self.write()
+
+
+def _snapshot_path(directory: str) -> str:
+    return os.path.join(directory, f"{os.getpid()}.json")
+
+
+def _write_snapshot(directory: str, content: str):
+    os.makedirs(directory, exist_ok=True)
+    # Written to a temporary file first, so readers never see half a file
+    own_path = _snapshot_path(directory)
+    temporary_path = f"{own_path}.tmp"
+    with open(temporary_path, "w") as file:
+        file.write(content)
+    os.replace(temporary_path, own_path)
+
+
+def _read_other_snapshots(directory: str) -> list[dict[str, Any]]:
+    snapshots = []
+    own_path = _snapshot_path(directory)
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if not name.endswith(".json") or path == own_path:
+            continue
+        try:
+            with open(path) as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):
+            # Written by a worker that died part way through
+            logging.warning(f"[metrics] could not read {path}")
+    return snapshots
+
+
+def clear_directory(directory: str):
+    """Removes the snapshots of a previous run of the server."""
+    if not os.path.isdir(directory):
+        return
+    for name in os.listdir(directory):
+        if name.endswith((".json", ".json.tmp")):
+            os.remove(os.path.join(directory, name))
+
+
+metrics = MetricsRegistry()
+metrics_writer = MetricsWriter(
+    metrics, directory=Config.Metrics.directory, interval=Config.Metrics.write_interval
+)
@@ -0,0 +1,52 @@
+"""
+The background loop shared by the services that do something every few
+seconds, such as flushing session expiry extensions or checking replication
+lag. They are started in the app's lifespan and stopped when it ends.
+"""
+
+import asyncio
+import logging
+
+
+class PeriodicTask:
+    """
+    Calls `tick` every `interval` seconds in a background task, from `start`
+    until `stop`. If `tick` raises, the error is logged with `error_message`
+    and the next tick happens as usual.
+
+    Subclasses implement `tick`, and can override `wait` to be woken early.
+    """
+
+    # Logged with the traceback when `tick` raises
+    error_message = "[periodic] task failed"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def tick(self):
+        raise NotImplementedError
+
+    async def wait(self):
+        await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.wait()
+            try:
+                await self.tick()
+            except Exception:
+                logging.exception(self.error_message)
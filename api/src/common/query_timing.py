@@ -0,0 +1,88 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from models._query_stats import QueryStats, track_queries
+
+# Statements are cut short in logs
+MAX_STATEMENT_LENGTH = 200
+
+
+def _shorten(statement: str | None) -> str:
+    statement = " ".join((statement or "").split())
+    if len(statement) > MAX_STATEMENT_LENGTH:
+        return statement[: MAX_STATEMENT_LENGTH - 3] + "..."
+    return statement
+
+
+class QueryTimingMiddleware:
+    """
+    Records the database queries each request makes, logging their count,
+    total time and slowest statement. With `server_timing`, the count and
+    times are also sent to the client in a `Server-Timing` header.
+
+    When `repeated_query_threshold` is set, statements that ran at least that
+    many times in one request are logged as a warning, as they usually mean
+    a query is being made once per row of an earlier result (N+1 queries).
+
+    Queries made after the response has started, such as by background
+    tasks, are logged but cannot be included in the header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        server_timing: bool = False,
+        repeated_query_threshold: int | None = None,
+    ):
+        self.app = app
+        self.server_timing = server_timing
+        self.repeated_query_threshold = repeated_query_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message):
+                if self.server_timing and message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", self._header(stats))
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                self._log(scope, stats)
+
+    def _header(self, stats: QueryStats) -> str:
+        value = f'db;dur={stats.total * 1000:.1f};desc="{stats.count} queries"'
+        if stats.count:
+            value += f", db-slowest;dur={stats.slowest * 1000:.1f}"
+        return value
+
+    def _log(self, scope: Scope, stats: QueryStats):
+        if not stats.count:
+            return
+
+        request = f"{scope['method']} {scope['path']}"
+        logging.info(
+            f"[db] {request}: {stats.count} queries in {stats.total * 1000:.1f}ms, "
+            f"slowest {stats.slowest * 1000:.1f}ms: {_shorten(stats.slowest_statement)}",
+            extra={
+                "db_queries": stats.count,
+                "db_time_ms": round(stats.total * 1000, 3),
+                "db_slowest_ms": round(stats.slowest * 1000, 3),
+                "db_slowest_statement": stats.slowest_statement,
+            },
+        )
+
+        if self.repeated_query_threshold is None:
+            return
+        for statement, count in stats.repeated(self.repeated_query_threshold):
+            logging.warning(
+                f"[db] possible N+1 queries in {request}: the same statement ran "
+                f"{count} times: {_shorten(statement)}"
+            )
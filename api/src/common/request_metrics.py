@@ -0,0 +1,76 @@
+import re
+import time
+
+from starlette.routing import get_route_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from common.metrics import metrics
+
+requests_in_flight = metrics.gauge(
+    "turva_http_requests_in_flight", "Requests currently being handled"
+)
+requests_total = metrics.counter(
+    "turva_http_requests_total", "Requests handled", ["method", "route", "status"]
+)
+request_duration = metrics.histogram(
+    "turva_http_request_duration_seconds",
+    "Time taken to send each response, in seconds",
+    ["method", "route"],
+)
+
+# Route patterns, allowing for the prefix of the router the route was included in
+_route_patterns: dict[str, re.Pattern] = {}
+
+
+def route_template(scope: Scope) -> str:
+    """The path of the route the request matched, such as `/auth/verify/{user_id}/`."""
+    # Set on the scope by the router once the request is routed
+    route = scope.get("route")
+    path_regex = getattr(route, "path_regex", None)
+    if route is None or path_regex is None:
+        return "unmatched"
+
+    pattern = _route_patterns.get(path_regex.pattern)
+    if pattern is None:
+        pattern = _route_patterns[path_regex.pattern] = re.compile(
+            "(.*?)" + path_regex.pattern.removeprefix("^")
+        )
+    match = pattern.match(get_route_path(scope))
+    return (match.group(1) if match else "") + route.path
+
+
+class RequestMetricsMiddleware:
+    """
+    Records the number, status and duration of requests to each route, and
+    how many are in flight, in `common.metrics`.
+
+    Requests are labelled with the path of the route they matched, such as
+    `/auth/verify/{user_id}/`, so the number of series stays small; requests
+    that matched no route are labelled `unmatched`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_flight.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requests_in_flight.dec()
+            route = route_template(scope)
+            request_duration.observe(time.perf_counter() - started_at, scope["method"], route)
+            requests_total.inc(scope["method"], route, str(status))
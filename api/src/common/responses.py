@@ -0,0 +1,30 @@
+"""
+The app's default response class, which serializes JSON with orjson.
+
+orjson encodes UUIDs, datetimes and dataclasses (such as the records from
+`models.fast_queries`) natively, and is several times faster than the
+standard library's `json`. Anything else falls back to FastAPI's
+`jsonable_encoder`.
+
+FastAPI still runs `jsonable_encoder` over whatever an endpoint returns
+before rendering it, unless the endpoint returns a response itself, so hot
+endpoints should return `FastJSONResponse(content)`. List endpoints should
+fetch plain dicts with ormar's `QuerySet.values()`, which skips building and
+validating a model for every row:
+
+    rows = await Hazard.objects.filter(project=project_id).values(["id", "title"])
+    return FastJSONResponse(rows)
+
+Compare with the ORM models with `python -m benchmarks.json_responses`.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
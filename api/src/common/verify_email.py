@@ -1,6 +1,4 @@
-import email.message
-import smtplib
-
+from common.email_outbox import email_outbox
 from config import Config
 from models import User
 
@@ -20,16 +18,5 @@ Hi, {user.first_name}!
 Best regards,<br/>
 The Turva Team"""
 
-    with smtplib.SMTP(Config.SMTP.host, Config.SMTP.port) as server:
-        if Config.SMTP.use_tls:
-            server.starttls()
-        if Config.SMTP.user and Config.SMTP.password:
-            server.login(Config.SMTP.user, Config.SMTP.password)
-        msg = email.message.EmailMessage()
-        # msg["From"] = Config.SMTP.from_address
-        msg["From"] = f"Turva <{Config.SMTP.from_address}>"
-        msg["To"] = user.email_address
-        msg["Subject"] = "Verify your email"
-        msg.set_content(email_body)
-        msg.set_type("text/html")
-        server.send_message(msg)
+    # Queued rather than sent here, so registering never waits on the SMTP server
+    await email_outbox.enqueue(user.email_address, "Verify your email", email_body)
@@ -1,5 +1,7 @@
 import os
-from typing import Literal, overload
+from typing import Literal, TypeVar, overload
+
+T = TypeVar("T")
 
 
 class ConfigurationError(Exception):
@@ -28,6 +30,28 @@ def parseInteger(env_var: str, required: bool) -> int | None:
         raise ConfigurationError(f"Invalid integer value: {value} for key {env_var}") from err
 
 
+@overload
+def parseFloat(env_var: str, required: Literal[True]) -> float: ...
+
+
+@overload
+def parseFloat(env_var: str, required: Literal[False]) -> float | None: ...
+
+
+def parseFloat(env_var: str, required: bool) -> float | None:
+    value = os.getenv(env_var)
+    if value is None:
+        if required is True:
+            raise ConfigurationError(f"Missing required float value for key {env_var}")
+        else:
+            return None
+
+    try:
+        return float(value)
+    except ValueError as err:
+        raise ConfigurationError(f"Invalid float value: {value} for key {env_var}") from err
+
+
 @overload
 def parseString(env_var: str, required: Literal[True]) -> str: ...
 
@@ -70,6 +94,11 @@ def parseBoolean(env_var: str, required: bool) -> bool | None:
         raise ConfigurationError(f"Invalid boolean value: {value} for key {env_var}")
 
 
+def defaultIfMissing(value: T | None, default: T) -> T:
+    """For settings where 0 is a valid value, so they cannot default with `or`"""
+    return default if value is None else value
+
+
 class Config:
     class Database:
         host: str = parseString("DB_HOST", True)
@@ -78,6 +107,36 @@ class Config:
         password: str | None = parseString("DB_PASSWORD", False)
         database: str = parseString("DB_DATABASE", True)
         schema: str | None = parseString("DB_SCHEMA", True)
+        # Connection pool, per worker process
+        pool_size: int = parseInteger("DB_POOL_SIZE", False) or 5
+        max_overflow: int = defaultIfMissing(parseInteger("DB_MAX_OVERFLOW", False), 10)
+        pool_timeout: float = parseFloat("DB_POOL_TIMEOUT", False) or 30.0
+        # Connections older than this many seconds are replaced, -1 never replaces them
+        pool_recycle: int = parseInteger("DB_POOL_RECYCLE", False) or 1800
+        pool_pre_ping: bool = parseBoolean("DB_POOL_PRE_PING", False) is not False
+        # Prepared statements cached per connection, set to 0 behind PgBouncer in
+        # transaction pooling mode
+        statement_cache_size: int = defaultIfMissing(
+            parseInteger("DB_STATEMENT_CACHE_SIZE", False), 100
+        )
+        # Comma separated URLs of read replicas, which use the same schema as the primary
+        replica_urls: list[str] = [
+            url.strip()
+            for url in (parseString("DB_REPLICA_URLS", False) or "").split(",")
+            if url.strip()
+        ]
+        # Replicas further behind the primary than this many seconds are not read from
+        replica_max_lag: float = parseFloat("DB_REPLICA_MAX_LAG", False) or 5.0
+        replica_check_interval: int = parseInteger("DB_REPLICA_CHECK_INTERVAL", False) or 5
+        # Log the queries each request makes
+        query_timing: bool = parseBoolean("DB_QUERY_TIMING", False) is not False
+        # Also report them to clients in a Server-Timing header. On by default in debug only,
+        # as it tells anyone how long the database takes to answer each request.
+        server_timing: bool = defaultIfMissing(
+            parseBoolean("DB_SERVER_TIMING", False), bool(parseBoolean("DEBUG", False))
+        )
+        # In debug mode, warn when a statement runs this many times in one request
+        repeated_query_threshold: int = parseInteger("DB_REPEATED_QUERY_THRESHOLD", False) or 5
 
     class Application:
         secret_key: str = parseString("SECRET_KEY", True)
@@ -87,6 +146,123 @@ class Config:
         session_cookie_lifetime: int = parseInteger("SESSION_COOKIE_LIFETIME", True)
         frontend_base_url: str = parseString("FRONTEND_BASE_URL", True)
         api_path: str = parseString("API_PATH", True)
+        # 0 turns the session cache off
+        session_cache_size: int = defaultIfMissing(
+            parseInteger("SESSION_CACHE_SIZE", False), 10_000
+        )
+        session_cache_ttl: int = parseInteger("SESSION_CACHE_TTL", False) or 30
+        # How often changes made by other workers are applied to the session cache, in seconds
+        session_sync_interval: float = parseFloat("SESSION_SYNC_INTERVAL", False) or 1.0
+        # 0 never extends sessions, so they expire SESSION_COOKIE_LIFETIME after login
+        session_refresh_threshold: float = defaultIfMissing(
+            parseFloat("SESSION_REFRESH_THRESHOLD", False), 0.5
+        )
+        session_expiry_flush_interval: int = (
+            parseInteger("SESSION_EXPIRY_FLUSH_INTERVAL", False) or 5
+        )
+        session_reaper_enabled: bool = parseBoolean("SESSION_REAPER_ENABLED", False) is not False
+        session_reap_interval: int = parseInteger("SESSION_REAP_INTERVAL", False) or 3600
+        session_reap_batch_size: int = parseInteger("SESSION_REAP_BATCH_SIZE", False) or 1000
+        # Look sessions up by their plaintext token when their hash is not found. Turn off
+        # once `python -m commands.hash_session_tokens` has run
+        legacy_session_tokens: bool = parseBoolean("LEGACY_SESSION_TOKENS", False) is not False
+        session_token_mode: str = parseString("SESSION_TOKEN_MODE", False) or "database"
+        signed_session_ttl: int = parseInteger("SIGNED_SESSION_TTL", False) or 300
+        revocation_sync_interval: int = parseInteger("REVOCATION_SYNC_INTERVAL", False) or 30
+        route_loading: str = parseString("ROUTE_LOADING", False) or "manifest"
+        # How long browsers may cache CORS preflight responses for, in seconds
+        cors_max_age: int = parseInteger("CORS_MAX_AGE", False) or 86400
+
+    class Migrations:
+        # Run `alembic upgrade head` in the app's lifespan, see `models._migrations`
+        on_startup: bool = parseBoolean("MIGRATE_ON_STARTUP", False) or False
+        # How long a process waits for another to finish migrating, in seconds
+        wait_timeout: int = parseInteger("MIGRATION_WAIT_TIMEOUT", False) or 600
+        # How long each migration statement waits for table locks, in seconds
+        lock_timeout: float = parseFloat("MIGRATION_LOCK_TIMEOUT", False) or 5.0
+
+    class Server:
+        # Used by `python -m server`, the production entry point
+        host: str = parseString("SERVER_HOST", False) or "0.0.0.0"
+        port: int = parseInteger("SERVER_PORT", False) or 8000
+        # Worker processes, each with its own event loop and database pool
+        workers: int = parseInteger("SERVER_WORKERS", False) or os.cpu_count() or 1
+        backlog: int = parseInteger("SERVER_BACKLOG", False) or 2048
+        # Idle connections are kept open for this many seconds, longer than the
+        # reverse proxy keeps its idle connections to the API (two minutes in Caddy)
+        keep_alive: int = parseInteger("SERVER_KEEP_ALIVE", False) or 130
+        # On SIGTERM, in-flight requests get this many seconds to finish
+        graceful_shutdown_timeout: int = (
+            parseInteger("SERVER_GRACEFUL_SHUTDOWN_TIMEOUT", False) or 30
+        )
+        # Comma separated addresses or networks trusted to set X-Forwarded-For, or "*".
+        # Must include the reverse proxy when it runs on another host or container,
+        # or every client appears to come from the proxy and shares its rate limits.
+        forwarded_allow_ips: str = parseString("SERVER_FORWARDED_ALLOW_IPS", False) or "127.0.0.1"
+        access_log: bool = parseBoolean("SERVER_ACCESS_LOG", False) is not False
+
+    class Compression:
+        enabled: bool = parseBoolean("COMPRESSION_ENABLED", False) is not False
+        # Responses smaller than this many bytes are not worth compressing
+        minimum_size: int = parseInteger("COMPRESSION_MINIMUM_SIZE", False) or 1024
+        # 1 to 9, and brotli 0 to 11, see `python -m benchmarks.compression`
+        gzip_level: int = parseInteger("COMPRESSION_GZIP_LEVEL", False) or 3
+        brotli_quality: int = defaultIfMissing(parseInteger("COMPRESSION_BROTLI_QUALITY", False), 4)
+
+    class Metrics:
+        enabled: bool = parseBoolean("METRICS_ENABLED", False) is not False
+        # Where each worker writes its metrics, so /metrics can add them up.
+        # Without it, /metrics only reports the worker that serves it.
+        directory: str | None = parseString("METRICS_DIR", False)
+        write_interval: int = parseInteger("METRICS_WRITE_INTERVAL", False) or 5
+        # /metrics requires an `Authorization: Bearer <token>` header, so the token
+        # must be set while metrics are enabled
+        token: str | None = parseString("METRICS_TOKEN", True) if enabled else None
+
+    class LoopMonitor:
+        # Samples how late the event loop runs a timer, see `common.loop_monitor`
+        enabled: bool = parseBoolean("LOOP_MONITOR_ENABLED", False) is not False
+        interval: float = parseFloat("LOOP_MONITOR_INTERVAL", False) or 0.25
+        # Log the stack of anything holding the event loop for longer than
+        # `blocking_threshold` seconds. On by default in debug and tests.
+        detect_blocking: bool = defaultIfMissing(
+            parseBoolean("LOOP_DETECT_BLOCKING", False),
+            bool(parseBoolean("DEBUG", False) or parseBoolean("TESTING", False)),
+        )
+        blocking_threshold: float = parseFloat("LOOP_BLOCKING_THRESHOLD", False) or 0.1
+
+    class PasswordHashing:
+        # Hashing processes per server worker. Each server worker has its own pool,
+        # so by default the cores are split between them rather than each taking all
+        workers: int = parseInteger("PASSWORD_HASH_WORKERS", False) or max(
+            (os.cpu_count() or 1) // (parseInteger("SERVER_WORKERS", False) or os.cpu_count() or 1),
+            1,
+        )
+        max_pending: int = parseInteger("PASSWORD_HASH_MAX_PENDING", False) or 64
+        # Argon2 parameters, see `python -m commands.calibrate_argon2`.
+        # The defaults are argon2-cffi's own defaults.
+        time_cost: int = parseInteger("ARGON2_TIME_COST", False) or 3
+        memory_cost: int = parseInteger("ARGON2_MEMORY_COST", False) or 65536
+        parallelism: int = parseInteger("ARGON2_PARALLELISM", False) or 4
+        latency_budget_ms: int = parseInteger("ARGON2_LATENCY_BUDGET_MS", False) or 250
+
+    class RateLimit:
+        # Each limit allows that many attempts per period, refilling steadily
+        enabled: bool = parseBoolean("RATE_LIMIT_ENABLED", False) is not False
+        period: int = parseInteger("RATE_LIMIT_PERIOD", False) or 60
+        login_per_ip: int = parseInteger("RATE_LIMIT_LOGIN_PER_IP", False) or 20
+        login_per_email: int = parseInteger("RATE_LIMIT_LOGIN_PER_EMAIL", False) or 5
+        register_per_ip: int = parseInteger("RATE_LIMIT_REGISTER_PER_IP", False) or 5
+
+    class EmailDeliverability:
+        # Whether registration checks that the email domain can receive email
+        enabled: bool = parseBoolean("EMAIL_DELIVERABILITY_ENABLED", False) is not False
+        timeout: float = parseFloat("EMAIL_DELIVERABILITY_TIMEOUT", False) or 2.0
+        cache_size: int = parseInteger("EMAIL_DELIVERABILITY_CACHE_SIZE", False) or 10000
+        # DNS TTLs are capped at this many seconds
+        max_ttl: int = parseInteger("EMAIL_DELIVERABILITY_MAX_TTL", False) or 86400
+        # How long domains that cannot receive email are remembered for
+        negative_ttl: int = parseInteger("EMAIL_DELIVERABILITY_NEGATIVE_TTL", False) or 300
 
     class SMTP:
         host: str = parseString("SMTP_HOST", True)
@@ -96,7 +272,32 @@ class Config:
         use_tls: bool = parseBoolean("SMTP_USE_TLS", True)
         from_address: str = parseString("SMTP_FROM_ADDRESS", True)
         from_name: str | None = parseString("SMTP_FROM_NAME", False)
+        pool_size: int = parseInteger("SMTP_POOL_SIZE", False) or 2
+        idle_timeout: int = parseInteger("SMTP_IDLE_TIMEOUT", False) or 60
+
+    class EmailOutbox:
+        batch_size: int = parseInteger("EMAIL_OUTBOX_BATCH_SIZE", False) or 20
+        poll_interval: int = parseInteger("EMAIL_OUTBOX_POLL_INTERVAL", False) or 5
+        max_attempts: int = parseInteger("EMAIL_OUTBOX_MAX_ATTEMPTS", False) or 8
+        retry_backoff: int = parseInteger("EMAIL_OUTBOX_RETRY_BACKOFF", False) or 30
+        send_timeout: int = parseInteger("EMAIL_OUTBOX_SEND_TIMEOUT", False) or 300
+        # Sent and given up emails are deleted after this many days, or straight away if 0
+        retention_days: int = defaultIfMissing(
+            parseInteger("EMAIL_OUTBOX_RETENTION_DAYS", False), 7
+        )
+
+
+if Config.Application.session_token_mode not in ("database", "signed"):
+    raise ConfigurationError(
+        f"Invalid session token mode: {Config.Application.session_token_mode} "
+        "for key SESSION_TOKEN_MODE (expected 'database' or 'signed')"
+    )
 
+if Config.Application.route_loading not in ("manifest", "lazy", "discover"):
+    raise ConfigurationError(
+        f"Invalid route loading mode: {Config.Application.route_loading} "
+        "for key ROUTE_LOADING (expected 'manifest', 'lazy' or 'discover')"
+    )
 
 # Ensure api_path starts with a slash but does not end with a slash
 if Config.Application.api_path == "/":
@@ -21,38 +21,195 @@ You will have the following endpoints:
 /auth/register
 /auth/test/dothing
 
+Walking the folders and importing every file on startup is slow, so the routes
+are listed in `_manifest.py`, generated with `python -m commands.build_route_manifest`.
+How the routes are loaded is set by `ROUTE_LOADING`:
+- "manifest" (the default) imports the modules listed in the manifest.
+    The manifest is trusted as it is, except in DEBUG, where it is compared with
+    the endpoints and they are discovered instead if it is out of date.
+- "lazy" registers the routes in the manifest, but only imports a module when
+    one of its routes is first requested. Lazy routes are left out of the
+    OpenAPI schema.
+- "discover" walks the folders, as does any mode if there is no manifest.
 """
 
+import copy
 import importlib
 import logging
 import os
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.routing import APIRoute, request_response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-endpoints_base = APIRouter()
+from authentication.public_routes import is_public, public_routes
+from config import Config
+
+ENDPOINTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (module path, prefix, route path, methods, whether the route is public)
+ManifestEntry = tuple[str, str, str, tuple[str, ...], bool]
+
+
+def discover_modules() -> list[tuple[str, str]]:
+    """
+    Walks the endpoints folder for endpoint modules.
 
-for root, _dirs, files in os.walk("endpoints"):
-    files.sort()
-    for file in files:
-        if not file.endswith(".py") or file == "__init__.py":
-            continue
-        # Get the module path by removing ".py" extension and replacing slashes
-        module_path = os.path.join(root, file)[:-3].replace(os.path.sep, ".")
+    Returns:
+        - A list of (module path, prefix) tuples, in a stable order.
+    """
 
-        # Import the module dynamically
+    modules = []
+    for root, dirs, files in os.walk(ENDPOINTS_DIR):
+        dirs.sort()
+        files.sort()
+        for file in files:
+            if not file.endswith(".py") or file.startswith("_"):
+                continue
+            relative_path = os.path.relpath(os.path.join(root, file[:-3]), ENDPOINTS_DIR)
+            # Get the module path by replacing slashes, and the prefix from the folders
+            module_path = f"{__name__}.{relative_path.replace(os.path.sep, '.')}"
+            prefix = os.path.dirname(relative_path).replace(os.path.sep, "/")
+            modules.append((module_path, f"/{prefix}" if prefix else ""))
+    return modules
+
+
+def build_manifest() -> list[ManifestEntry]:
+    """Imports every endpoint module and lists the routes on its router."""
+
+    entries = []
+    for module_path, prefix in discover_modules():
         module = importlib.import_module(module_path)
+        for route in getattr(module, "router", APIRouter()).routes:
+            if isinstance(route, APIRoute):
+                methods = tuple(sorted(route.methods or ()))
+                entries.append(
+                    (module_path, prefix, route.path, methods, is_public(route.endpoint))
+                )
+    return entries
+
+
+def load_manifest() -> list[ManifestEntry] | None:
+    try:
+        from endpoints._manifest import ROUTES
+    except ImportError:
+        return None
+    return ROUTES
+
+
+def is_stale(manifest: list[ManifestEntry]) -> bool:
+    """
+    Whether the routes have changed since the manifest was generated.
+
+    Every endpoint module is imported to compare the routes themselves, which
+    costs as much as not having a manifest, so this is only checked in DEBUG.
+    Elsewhere an out of date manifest is caught by the tests (and
+    `python -m commands.build_route_manifest --check`) before it is deployed.
+    """
+    return manifest != build_manifest()
+
+
+class _DelegatedResponse(Response):
+    """Hands the request over to another ASGI app, rather than sending a response itself."""
+
+    def __init__(self, app: ASGIApp):
+        super().__init__()
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await self.app(scope, receive, send)
 
-        # Check if the module has a 'router' attribute
-        if hasattr(module, "router"):
-            logging.info(f"[endpoints] adding router from {module_path} to {root}")
-            # Add the router to the FastAPI app
-            endpoints_base.include_router(
-                module.router, prefix=f"/{os.path.relpath(root, 'endpoints')}"
+
+class LazyRoute:
+    """
+    Stands in for a route from the manifest, importing the module that
+    defines it the first time it is requested.
+    """
+
+    def __init__(self, module_path: str, path: str, methods: tuple[str, ...]):
+        self.module_path = module_path
+        self.path = path
+        self.methods = methods
+        self._route: APIRoute | None = None
+
+    def route(self, default_response_class: type[Response]) -> APIRoute:
+        if self._route is None:
+            logging.info(f"[endpoints] importing {self.module_path} for {self.path}")
+            module = importlib.import_module(self.module_path)
+            route = next(
+                route
+                for route in module.router.routes
+                if isinstance(route, APIRoute)
+                and route.path == self.path
+                and tuple(sorted(route.methods or ())) == self.methods
+            )
+            # Use the app's default response class, as including the router in the
+            # app would, unless the route sets its own
+            if isinstance(route.response_class, DefaultPlaceholder):
+                route = copy.copy(route)
+                route.response_class = default_response_class
+                route.app = request_response(route.get_route_handler())
+            self._route = route
+        return self._route
+
+    async def endpoint(self, request: Request) -> Response:
+        response_class = request.app.router.default_response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        # The path parameters were already matched against the same path
+        return _DelegatedResponse(self.route(response_class).app)
+
+
+def include_routers(router: APIRouter, mode: str):
+    """
+    Adds the endpoint routes to `router`, which is expected to be included
+    in the app at `API_PATH` (public routes are recorded with that prefix).
+    """
+
+    manifest = load_manifest() if mode != "discover" else None
+    if manifest is None:
+        if mode != "discover":
+            logging.warning("[endpoints] no route manifest found, discovering endpoints instead")
+    elif Config.Application.is_debug_environment and is_stale(manifest):
+        logging.warning(
+            "[endpoints] the route manifest is out of date, discovering endpoints instead. "
+            "Run `python -m commands.build_route_manifest` to update it."
+        )
+        manifest = None
+
+    if manifest is None:
+        for module_path, prefix in discover_modules():
+            _include_module(router, module_path, prefix)
+        return
+
+    if mode == "lazy":
+        for module_path, prefix, path, methods, public in manifest:
+            lazy_route = LazyRoute(module_path, path, methods)
+            router.add_api_route(
+                f"{prefix}{path}",
+                lazy_route.endpoint,
+                methods=list(methods),
+                include_in_schema=False,
             )
+            if public:
+                public_routes.add(f"{Config.Application.api_path}{prefix}{path}", methods)
+        return
+
+    for module_path, prefix in dict.fromkeys((entry[0], entry[1]) for entry in manifest):
+        _include_module(router, module_path, prefix)
+
 
-# @endpoints_base.get("/")
-# async def root() -> dict:
-#     """
-#     This endpoint is used to check if the API is running.
-#     """
-#     return {"message": "OUH Eureka IPC API, Digital Engineering"}
+def _include_module(router: APIRouter, module_path: str, prefix: str):
+    # Import the module dynamically
+    module = importlib.import_module(module_path)
+
+    # Check if the module has a 'router' attribute
+    if hasattr(module, "router"):
+        logging.info(f"[endpoints] adding router from {module_path} to {prefix}")
+        router.include_router(module.router, prefix=prefix)
+        public_routes.add_routes(module.router.routes, f"{Config.Application.api_path}{prefix}")
+
+
+endpoints_base = APIRouter()
+include_routers(endpoints_base, Config.Application.route_loading)
@@ -0,0 +1,14 @@
+"""
+The routes registered by `endpoints`.
+
+Generated by `python -m commands.build_route_manifest`, do not edit by hand.
+"""
+
+ROUTES: list[tuple[str, str, str, tuple[str, ...], bool]] = [
+    ("endpoints.auth.login", "/auth", "/login/", ("POST",), True),
+    ("endpoints.auth.logout", "/auth", "/logout/", ("POST",), False),
+    ("endpoints.auth.me", "/auth", "/me/", ("GET",), False),
+    ("endpoints.auth.register", "/auth", "/register/", ("POST",), True),
+    ("endpoints.auth.resend_verify_email", "/auth", "/verify-resend/", ("POST",), False),
+    ("endpoints.auth.verify", "/auth", "/verify/{user_id}/", ("POST",), True),
+]
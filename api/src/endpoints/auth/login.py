@@ -1,9 +1,13 @@
 from email_validator import EmailNotValidError, validate_email
 from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
-from models import Session, User
+from authentication.public_routes import public
+from authentication.rate_limit import rate_limiter
+from common.responses import FastJSONResponse
+from models import Session
+from models._replicas import replica_first
+from models.fast_queries import user_by_email
 
 
 class LoginRequest(BaseModel):
@@ -15,7 +19,11 @@ router = APIRouter()
 
 
 @router.post("/login/")
+@public
 async def login(request: Request, data: LoginRequest):
+    # Turn away repeated attempts before doing any database or hashing work
+    await rate_limiter.check("login", request, data.email_address)
+
     if not data.email_address or not data.password:
         raise HTTPException(status_code=400, detail="Username and password are required")
 
@@ -26,19 +34,21 @@ async def login(request: Request, data: LoginRequest):
         raise HTTPException(status_code=401, detail="Invalid credentials") from err
 
     # Check the user exists and has valid credentials
-    user = await User.objects.get_or_none(email_address=checked_email.normalized)
-    if not user:
+    record = await replica_first(lambda: user_by_email(checked_email.normalized))
+    if not record:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    user = record.to_user()
+
     if not await user.check_password(data.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # auth successful
     _, session_key = await Session.create_session(user)
 
-    response = JSONResponse(
+    response = FastJSONResponse(
         content={
-            "id": str(user.id),
+            "id": user.id,
             "first_name": user.first_name,
             "last_name": user.last_name,
             "email_address": user.email_address,
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Request
+from starlette.authentication import requires
+
+from authentication.scope import Scope
+from models import Session
+
+router = APIRouter()
+
+
+@router.post("/logout/")
+@requires(Scope.AUTHENTICATED.value, 401)
+async def logout(request: Request):
+    """
+    Log out the currently authenticated user.
+
+    The user's session is revoked, which also removes it from the session
+    cache and the revocation set, so neither the session token nor any
+    signed session claims can be used again. The session cookie is cleared.
+
+    Params:
+        - request: Request - The HTTP request object, which must contain an
+            authenticated user.
+
+    Returns:
+        - JSON response confirming the user has been logged out.
+    """
+
+    session_token = request.session.pop("session_token", None)
+    session = await Session.get_by_token(session_token) if session_token else None
+    if session:
+        await session.revoke()
+
+    request.session.clear()
+
+    return {"message": "Logged out successfully"}
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, HTTPException, Request
+from starlette.authentication import requires
+
+from authentication.scope import Scope
+from common.conditional import conditional_response, row_validators
+from models import User
+
+router = APIRouter()
+
+PROFILE_FIELDS = [
+    "id",
+    "first_name",
+    "last_name",
+    "email_address",
+    "is_verified",
+    "is_cso",
+    "organisation",
+    "job_role",
+]
+
+
+@router.get("/me/")
+@requires(Scope.AUTHENTICATED.value, 401)
+async def me(request: Request):
+    """
+    Get the profile of the currently authenticated user.
+
+    The response has `ETag` and `Last-Modified` headers. Requests with a
+    matching `If-None-Match` or `If-Modified-Since` header get an empty 304
+    response, without the profile being loaded.
+
+    Params:
+        - request: Request - The HTTP request object, which must contain an
+            authenticated user.
+
+    Returns:
+        - JSON response with the user's profile, or 304 Not Modified.
+    """
+
+    validators = await row_validators(User, request.user.id)
+    if validators is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+
+    async def profile():
+        [row] = await User.objects.filter(id=request.user.id).values(PROFILE_FIELDS)
+        return row
+
+    return await conditional_response(request, validators, profile)
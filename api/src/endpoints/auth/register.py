@@ -1,11 +1,14 @@
 from uuid import uuid4
 
-from argon2 import PasswordHasher
 from email_validator import EmailNotValidError, validate_email
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
+from authentication.public_routes import public
+from authentication.rate_limit import rate_limiter
+from common.email_deliverability import deliverability_checker
 from common.verify_email import handle_verification_email
+from config import Config
 from models import User
 
 router = APIRouter()
@@ -19,7 +22,11 @@ class RegisterRequest(BaseModel):
 
 
 @router.post("/register/")
-async def register(request: Request, body: RegisterRequest, background_tasks: BackgroundTasks):
+@public
+async def register(request: Request, body: RegisterRequest):
+    # Turn away repeated attempts before doing any database or hashing work
+    await rate_limiter.check("register", request)
+
     # Check if user already exists
     existing_user = await User.objects.get_or_none(email_address=body.email)
     if existing_user:
@@ -27,12 +34,18 @@ async def register(request: Request, body: RegisterRequest, background_tasks: Ba
 
     # Validate email format
     try:
-        checked_email = validate_email(body.email, check_deliverability=True)
+        checked_email = validate_email(body.email, check_deliverability=False)
     except EmailNotValidError as err:
         raise HTTPException(status_code=400, detail="Invalid email format") from err
 
+    # Check the domain can receive email, without blocking on DNS
+    if Config.EmailDeliverability.enabled and not await deliverability_checker.is_deliverable(
+        checked_email.ascii_domain
+    ):
+        raise HTTPException(status_code=400, detail="Invalid email format")
+
     # Hash the password
-    hashed_password = PasswordHasher().hash(body.password)
+    hashed_password = await User.generate_password_hash(body.password)
 
     # Create new user
     new_user = await User.objects.create(
@@ -45,6 +58,6 @@ async def register(request: Request, body: RegisterRequest, background_tasks: Ba
     )
 
     # Send verification email
-    background_tasks.add_task(handle_verification_email, new_user)
+    await handle_verification_email(new_user)
 
     return {"message": "User registered successfully", "id": new_user.id}
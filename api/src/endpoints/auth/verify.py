@@ -3,6 +3,7 @@ from uuid import UUID
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
+from authentication.public_routes import public
 from models import User
 
 router = APIRouter()
@@ -13,6 +14,7 @@ class VerifyRequest(BaseModel):
 
 
 @router.post("/verify/{user_id}/")
+@public
 async def verify_email(request: Request, body: VerifyRequest, user_id: str):
     """
     Verify a user's email address using a token.
@@ -33,6 +35,7 @@ async def verify_email(request: Request, body: VerifyRequest, user_id: str):
             the token is invalid, or the token has expired.
     """
 
+    # Read from the primary, as a replica may not have a token that was just re-sent
     user = await User.objects.get_or_none(id=UUID(user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -50,6 +53,6 @@ async def verify_email(request: Request, body: VerifyRequest, user_id: str):
             detail="Invalid verification token, please login and request a new email",
         )
 
-    await user.update(is_verified=True)
+    await user.update(_columns=["is_verified", "updated_date"], is_verified=True)
 
     return {"message": "Email verified successfully"}
@@ -1,2 +1,14 @@
+import datetime
+
+import ormar
+
+from .email_outbox import OutboxEmail as OutboxEmail
 from .session import Session as Session
 from .user import User as User
+
+
+@ormar.pre_update([OutboxEmail, Session, User])
+async def _set_updated_date(sender, instance, **kwargs):
+    # ormar 0.23 does not support `on_update`. Updates that pass `_columns`
+    # must list "updated_date" for it to be written.
+    instance.updated_date = datetime.datetime.now()
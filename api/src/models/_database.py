@@ -2,9 +2,10 @@ import datetime
 
 import ormar
 import sqlalchemy
-from sqlalchemy.ext.asyncio import create_async_engine
 
 from config import Config
+from models._pool import InstrumentedPool
+from models._replicas import Replica, ReplicaSet, RoutingDatabaseConnection
 
 is_testing_environment = Config.Application.is_testing_environment
 
@@ -21,16 +22,37 @@ def get_database_url() -> str:
     return (
         f"{base_database_url}/{Config.Database.database}"
         f"?options=-csearch_path={Config.Database.schema}"
+        f"&prepared_statement_cache_size={Config.Database.statement_cache_size}"
     )
 
 
 DATABASE_URL = get_database_url()
 
-conn_args = {}
+# The ORM and raw queries (`database.connection()`, `database.engine`) share
+# the one engine and pool that is created when the database connects
+conn_args = {
+    "poolclass": InstrumentedPool,
+    "pool_size": Config.Database.pool_size,
+    "max_overflow": Config.Database.max_overflow,
+    "pool_timeout": Config.Database.pool_timeout,
+    "pool_recycle": Config.Database.pool_recycle,
+    "pool_pre_ping": Config.Database.pool_pre_ping,
+}
 if DATABASE_URL.startswith("postgresql"):
-    conn_args = {"connect_args": {"server_settings": {"search_path": Config.Database.schema}}}
+    conn_args["connect_args"] = {
+        "server_settings": {"search_path": Config.Database.schema},
+        "statement_cache_size": Config.Database.statement_cache_size,
+    }
+
+# Replicas get their own pools, which are left out of `pool_metrics`
+replica_conn_args = {key: value for key, value in conn_args.items() if key != "poolclass"}
+replicas = ReplicaSet(
+    [Replica(url, **replica_conn_args) for url in Config.Database.replica_urls],
+    max_lag=Config.Database.replica_max_lag,
+    check_interval=Config.Database.replica_check_interval,
+)
 
-database = ormar.DatabaseConnection(DATABASE_URL, **conn_args)
+database = RoutingDatabaseConnection(DATABASE_URL, replicas, **conn_args)
 
 metadata = sqlalchemy.MetaData()
 
@@ -39,11 +61,9 @@ ormar_config = ormar.OrmarConfig(
     metadata=metadata,
 )
 
-engine = create_async_engine(DATABASE_URL)
-
 
 class DateFieldsMixins:
     created_date: datetime.datetime = ormar.DateTime(default=datetime.datetime.now)
-    updated_date: datetime.datetime = ormar.DateTime(
-        default=datetime.datetime.now, onupdate=datetime.datetime.now
-    )
+    # Set on updates through the models by `models._set_updated_date`, not by raw SQL
+    # or `QuerySet.update()`
+    updated_date: datetime.datetime = ormar.DateTime(default=datetime.datetime.now)
@@ -0,0 +1,37 @@
+import uuid
+from typing import Any
+
+import ormar
+from ormar.fields import sqlalchemy_uuid
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Dialect
+
+
+class NativeUUIDType(sqlalchemy_uuid.UUID):
+    """
+    Stores UUIDs in Postgres's native 16-byte `uuid` type, rather than as
+    the 32-character hex string ormar uses. Other databases (SQLite, in the
+    tests) keep ormar's CHAR(32) storage.
+    """
+
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Dialect) -> Any:
+        if dialect.name == "postgresql":
+            # Returns `uuid.UUID` values, as `as_uuid` defaults to true
+            return dialect.type_descriptor(postgresql.UUID)
+        return super().load_dialect_impl(dialect)
+
+    def process_bind_param(self, value: Any, dialect: Dialect) -> Any:
+        if value is not None and dialect.name == "postgresql":
+            return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+        return super().process_bind_param(value, dialect)
+
+
+# ormar's stubs declare `UUID` as a function, but it is a class
+class NativeUUID(ormar.UUID):  # type: ignore
+    """An `ormar.UUID` field stored as a native `uuid` on Postgres."""
+
+    @classmethod
+    def get_column_type(cls, **kwargs: Any) -> Any:
+        return NativeUUIDType(uuid_format=kwargs.get("uuid_format", "hex"))
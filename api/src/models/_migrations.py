@@ -0,0 +1,147 @@
+"""
+Running migrations on startup, and helpers for migrations that must not block
+writes.
+
+With `MIGRATE_ON_STARTUP` set, every process runs `alembic upgrade head` in
+its lifespan before it serves requests. A Postgres advisory lock makes sure
+only one process migrates at a time; the others wait for the lock, then find
+the schema already up to date. On other databases nothing is run, as the tests
+create their tables directly.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Sequence
+
+import ormar
+import sqlalchemy
+from alembic.config import Config as AlembicConfig
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.future import Connection
+
+from alembic import command, op
+
+ALEMBIC_INI = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini"
+)
+
+# An arbitrary key that identifies the migration lock among advisory locks
+MIGRATION_LOCK_KEY = 7_301_219_466
+
+
+async def migrate(database: ormar.DatabaseConnection, wait_timeout: float, lock_timeout: float):
+    """
+    Upgrades the database to the latest revision, waiting up to `wait_timeout`
+    seconds for any other process that is already migrating.
+
+    Each statement waits at most `lock_timeout` seconds for the table locks
+    it needs, so a migration fails rather than holding up every other query
+    on a table behind a long running transaction.
+    """
+    if database.dialect.name != "postgresql":
+        return
+
+    async with database.engine.connect() as conn:
+        await _acquire_lock(conn, wait_timeout)
+        try:
+            # The lock belongs to the session, so it outlives this transaction
+            await conn.commit()
+            started_at = time.monotonic()
+            await conn.run_sync(_upgrade, lock_timeout)
+            logging.info(f"[migrations] up to date after {time.monotonic() - started_at:.1f}s")
+        finally:
+            await conn.execute(
+                sqlalchemy.text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY}
+            )
+            await conn.commit()
+
+
+async def _acquire_lock(conn: AsyncConnection, wait_timeout: float):
+    deadline = time.monotonic() + wait_timeout
+    waiting = False
+    while True:
+        result = await conn.execute(
+            sqlalchemy.text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+        )
+        if result.scalar():
+            return
+
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Another process was still migrating after {wait_timeout}s")
+        if not waiting:
+            logging.info("[migrations] waiting for another process to finish migrating")
+            waiting = True
+        await asyncio.sleep(1)
+
+
+def _upgrade(connection: Connection, lock_timeout: float):
+    # Set for the session rather than the transaction, as indexes built
+    # concurrently commit part way through a migration
+    connection.execute(sqlalchemy.text(f"SET lock_timeout = '{int(lock_timeout * 1000)}ms'"))
+    connection.commit()
+
+    try:
+        config = AlembicConfig(ALEMBIC_INI)
+        # Used by alembic/env.py instead of opening its own connection
+        config.attributes["connection"] = connection
+        config.attributes["configure_logger"] = False
+        command.upgrade(config, "head")
+    finally:
+        # The connection goes back to the app's pool, so must not keep the short timeout
+        connection.rollback()
+        connection.execute(sqlalchemy.text("RESET lock_timeout"))
+        connection.commit()
+
+
+def create_index_concurrently(index_name: str, table_name: str, columns: Sequence[str], **kwargs):
+    """
+    Creates an index in a migration without blocking writes to the table.
+
+    On Postgres the index is built with CREATE INDEX CONCURRENTLY, outside
+    of the migration's transaction. If an earlier build failed part way, it
+    left an invalid index behind, which is dropped and built again. Other
+    databases build the index normally.
+    """
+    context = op.get_context()
+    if context.dialect.name != "postgresql":
+        op.create_index(index_name, table_name, columns, **kwargs)
+        return
+
+    with context.autocommit_block():
+        if not context.as_sql and _is_invalid_index(index_name):
+            op.drop_index(
+                index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True
+            )
+        op.create_index(
+            index_name,
+            table_name,
+            columns,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            **kwargs,
+        )
+
+
+def drop_index_concurrently(index_name: str, table_name: str):
+    """Drops an index in a migration without blocking writes to the table."""
+    context = op.get_context()
+    if context.dialect.name != "postgresql":
+        op.drop_index(index_name, table_name=table_name)
+        return
+
+    with context.autocommit_block():
+        op.drop_index(
+            index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True
+        )
+
+
+def _is_invalid_index(index_name: str) -> bool:
+    result = op.get_bind().execute(
+        sqlalchemy.text(
+            "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+        ),
+        {"name": index_name},
+    )
+    return bool(result.scalar())
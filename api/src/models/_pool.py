@@ -0,0 +1,108 @@
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    """
+    Counters for the database connection pool of this worker process.
+
+    `stats()` reports how long requests waited for a connection, how often
+    the pool was full, and how many connections were opened and closed, for
+    sizing `DB_POOL_SIZE` and `DB_MAX_OVERFLOW`.
+    """
+
+    def __init__(self):
+        self.pool: InstrumentedPool | None = None
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        # Checkouts that found every connection, including overflow, in use
+        self.saturated_checkouts = 0
+        self.timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.connects = 0
+        self.disconnects = 0
+
+    def record_checkout(self, wait: float, saturated: bool):
+        self.checkouts += 1
+        self.checkout_wait_total += wait
+        self.checkout_wait_max = max(self.checkout_wait_max, wait)
+        if saturated:
+            self.saturated_checkouts += 1
+
+    def record_connect(self):
+        self.connects += 1
+
+    def record_disconnect(self):
+        self.disconnects += 1
+
+    def stats(self) -> dict[str, Any]:
+        pool = self.pool
+        return {
+            "size": pool.size() if pool else 0,
+            "capacity": pool.capacity if pool else 0,
+            "checked_out": pool.checkedout() if pool else 0,
+            "idle": pool.checkedin() if pool else 0,
+            "overflow": max(pool.overflow(), 0) if pool else 0,
+            "checkouts": self.checkouts,
+            "saturated_checkouts": self.saturated_checkouts,
+            "timeouts": self.timeouts,
+            "checkout_wait_total": self.checkout_wait_total,
+            "checkout_wait_max": self.checkout_wait_max,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+def _on_connect(dbapi_connection: Any, connection_record: Any):
+    pool_metrics.record_connect()
+
+
+def _on_close(dbapi_connection: Any, connection_record: Any):
+    pool_metrics.record_disconnect()
+
+
+def _on_close_detached(dbapi_connection: Any):
+    pool_metrics.record_disconnect()
+
+
+# Pool events can only be listened for on pool instances, not on the class
+_LISTENERS = {"connect": _on_connect, "close": _on_close, "close_detached": _on_close_detached}
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """The default pool for async engines, recording its use in `pool_metrics`."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # QueuePool keeps its own copy private, defaulting to 10
+        self.max_overflow: int = kwargs.get("max_overflow", 10)
+        # Disposing of the engine replaces the pool, so always report the newest one
+        pool_metrics.pool = self
+        # A replacement pool copies the listeners of the one it replaces
+        for identifier, listener in _LISTENERS.items():
+            if not event.contains(self, identifier, listener):
+                event.listen(self, identifier, listener)
+
+    @property
+    def capacity(self) -> int:
+        return self.size() + max(self.max_overflow, 0)
+
+    def connect(self):
+        saturated = self.checkedout() >= self.capacity
+        started_at = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - started_at, saturated)
+        return connection
@@ -0,0 +1,67 @@
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """The number and duration of the database queries made while it is being tracked."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: str | None = None
+        # Statements are parameterised, so identical text means an identical shape
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.total += duration
+        self.statements[statement] += 1
+        if duration >= self.slowest:
+            self.slowest = duration
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """The statements that ran at least `threshold` times, most repeated first."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("_current_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Records every query made inside the block, on any engine."""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+# Listened for on the Engine class, so the primary, replicas and any other
+# engine are all included
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any):
+    stats = _current_stats.get()
+    started_at = conn.info.get("query_started_at")
+    if stats is not None and started_at:
+        stats.record(statement, time.perf_counter() - started_at.pop())
@@ -0,0 +1,248 @@
+"""
+Routing of read-only queries to read replicas.
+
+Queries only go to a replica inside `read_from_replica()`, and only while
+the replica keeps up with the primary:
+
+    with read_from_replica():
+        user = await User.objects.get_or_none(email_address=email_address)
+
+Everything else (writes, transactions, and reads outside of the block) goes to
+the primary. Once a block writes, its later reads go to the primary too, so
+they see the write. A replica is taken out of rotation when its replication
+lag goes over `DB_REPLICA_MAX_LAG` seconds, or when it cannot be reached, and
+put back once a lag check succeeds again.
+"""
+
+import asyncio
+import itertools
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Mapping, Sequence
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+import ormar
+import sqlalchemy
+from ormar.databases.query_executor import QueryExecutor
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from common.periodic import PeriodicTask
+
+T = TypeVar("T")
+
+# Errors from a replica that mean it cannot be used, rather than that the query is wrong
+REPLICA_ERRORS = (sqlalchemy.exc.OperationalError, sqlalchemy.exc.InterfaceError, OSError)
+
+# The time since the last replayed transaction, or 0 when there is nothing left to replay
+LAG_QUERY = sqlalchemy.text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class _ReplicaReads:
+    def __init__(self):
+        self.wrote = False
+
+
+_replica_reads: ContextVar[_ReplicaReads | None] = ContextVar("_replica_reads", default=None)
+
+
+@contextmanager
+def read_from_replica() -> Iterator[None]:
+    """Sends the read-only queries made inside the block to a replica, if one is available."""
+    token = _replica_reads.set(_ReplicaReads())
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+async def replica_first(fetch: Callable[[], Awaitable[T | None]]) -> T | None:
+    """
+    Fetches from a replica, then from the primary if the replica has nothing.
+
+    For rows that may only just have been written, such as the session
+    created by a login, which a lagging replica may not have yet.
+    """
+    with read_from_replica():
+        result = await fetch()
+    if result is None:
+        result = await fetch()
+    return result
+
+
+class Replica:
+    def __init__(self, url: str, **options: Any):
+        self.database = ormar.DatabaseConnection(url, **options)
+        self.name = sqlalchemy.engine.make_url(url).render_as_string(hide_password=True)
+        self.lag: float | None = None
+        self.available = True
+        self.autocommit_engine: AsyncEngine | None = None
+
+    async def connect(self):
+        await self.database.connect()
+        # Reads run outside of a transaction, as they do on the primary
+        self.autocommit_engine = self.database.engine.execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+
+    async def disconnect(self):
+        await self.database.disconnect()
+        self.autocommit_engine = None
+
+    async def measure_lag(self) -> float:
+        if self.database.dialect.name != "postgresql":
+            return 0.0
+        async with self.database.connection() as conn:
+            lag = (await conn.execute(LAG_QUERY)).scalar()
+        return float(lag or 0)
+
+
+class ReplicaSet(PeriodicTask):
+    """
+    The read replicas, checking their replication lag every `check_interval`
+    seconds in the background.
+    """
+
+    error_message = "[replicas] failed to check replication lag"
+
+    def __init__(self, replicas: Sequence[Replica], max_lag: float, check_interval: float):
+        super().__init__(check_interval)
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self._next = itertools.count()
+
+    def choose(self) -> Replica | None:
+        """Returns the next available replica in turn, or None if there are none."""
+        available = [replica for replica in self.replicas if replica.available]
+        if not available:
+            return None
+        return available[next(self._next) % len(available)]
+
+    def mark_unavailable(self, replica: Replica, reason: str):
+        if replica.available:
+            logging.warning(f"[replicas] {replica.name} unavailable: {reason}")
+        replica.available = False
+
+    async def check(self):
+        for replica in self.replicas:
+            try:
+                replica.lag = await asyncio.wait_for(replica.measure_lag(), self.interval)
+            except (*REPLICA_ERRORS, TimeoutError) as err:
+                replica.lag = None
+                self.mark_unavailable(replica, f"lag check failed ({err!r})")
+                continue
+
+            if replica.lag > self.max_lag:
+                self.mark_unavailable(replica, f"{replica.lag:.1f}s behind the primary")
+            elif not replica.available:
+                logging.info(f"[replicas] {replica.name} available again")
+                replica.available = True
+
+    async def connect(self):
+        for replica in self.replicas:
+            await replica.connect()
+
+    async def disconnect(self):
+        for replica in self.replicas:
+            await replica.disconnect()
+
+    async def tick(self):
+        await self.check()
+
+    def start(self):
+        if self.replicas:
+            super().start()
+
+
+class ReplicaQueryExecutor(QueryExecutor):
+    """
+    Runs reads on a replica connection, and writes on the primary. If the
+    replica fails, the read is retried on the primary.
+    """
+
+    def __init__(
+        self,
+        connection: AsyncConnection,
+        replica: Replica,
+        database: "RoutingDatabaseConnection",
+        reads: _ReplicaReads,
+    ):
+        super().__init__(connection)
+        self.replica = replica
+        self.database = database
+        self.reads = reads
+
+    async def fetch_all(self, query: Any) -> list[Any]:
+        return await self._read("fetch_all", query)
+
+    async def fetch_one(self, query: Any) -> Any:
+        return await self._read("fetch_one", query)
+
+    async def fetch_val(self, query: Any, column: int = 0) -> Any:
+        return await self._read("fetch_val", query, column)
+
+    async def execute(self, query: Any) -> Any:
+        self.reads.wrote = True
+        async with self.database.primary_query_executor() as executor:
+            return await executor.execute(query)
+
+    async def execute_many(self, query: Any, values: Sequence[Mapping[str, Any]]):
+        self.reads.wrote = True
+        async with self.database.primary_query_executor() as executor:
+            await executor.execute_many(query, values)
+
+    async def _read(self, method: str, *args: Any) -> Any:
+        try:
+            return await getattr(super(), method)(*args)
+        except REPLICA_ERRORS as err:
+            self.database.replicas.mark_unavailable(self.replica, f"query failed ({err!r})")
+        async with self.database.primary_query_executor() as executor:
+            return await getattr(executor, method)(*args)
+
+
+class RoutingDatabaseConnection(ormar.DatabaseConnection):
+    """The primary database, sending reads inside `read_from_replica()` to a replica."""
+
+    def __init__(self, url: str, replicas: ReplicaSet, **options: Any):
+        super().__init__(url, **options)
+        self.replicas = replicas
+
+    async def connect(self):
+        await super().connect()
+        await self.replicas.connect()
+
+    async def disconnect(self):
+        await self.replicas.disconnect()
+        await super().disconnect()
+
+    def primary_query_executor(self, *, transactional: bool = False):
+        return super().get_query_executor(transactional=transactional)
+
+    @asynccontextmanager
+    async def get_query_executor(self, *, transactional: bool = False) -> AsyncIterator[Any]:
+        reads = _replica_reads.get()
+        if (
+            reads is not None
+            and not reads.wrote
+            and not transactional
+            and self.get_transaction_connection() is None
+        ):
+            replica = self.replicas.choose()
+            # Replicas only have an engine while the app is connected
+            if replica is not None and replica.autocommit_engine is not None:
+                try:
+                    connection = await replica.autocommit_engine.connect()
+                except REPLICA_ERRORS as err:
+                    self.replicas.mark_unavailable(replica, f"connection failed ({err!r})")
+                else:
+                    try:
+                        yield ReplicaQueryExecutor(connection, replica, self, reads)
+                    finally:
+                        await connection.close()
+                    return
+
+        async with self.primary_query_executor(transactional=transactional) as executor:
+            yield executor
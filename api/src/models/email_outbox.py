@@ -0,0 +1,29 @@
+from datetime import datetime
+from uuid import UUID
+
+import ormar
+
+from ._database import DateFieldsMixins, ormar_config
+from ._fields import NativeUUID
+
+
+class OutboxEmail(ormar.Model, DateFieldsMixins):
+    """
+    An email waiting to be sent (or already sent) by the email outbox
+    worker, see `common.email_outbox`.
+
+    While an email is being sent, `next_attempt_at` acts as a lease: if the
+    worker dies mid-send, the email becomes due again once it passes.
+    """
+
+    ormar_config = ormar_config.copy(tablename="tbl_email_outbox")  # type: ignore
+
+    id: UUID = NativeUUID(primary_key=True, nullable=False)
+    to_address: str = ormar.String(max_length=100)
+    subject: str = ormar.String(max_length=255)
+    body: str = ormar.Text()
+    status: str = ormar.String(max_length=20, default="pending")
+    attempts: int = ormar.Integer(default=0)
+    next_attempt_at: datetime = ormar.DateTime(timezone=True, index=True)
+    last_error: str | None = ormar.Text(nullable=True)
+    sent_at: datetime | None = ormar.DateTime(timezone=True, nullable=True)
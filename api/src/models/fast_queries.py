@@ -0,0 +1,135 @@
+"""
+Hand-written queries for the busiest paths: authenticating a request from its
+session token, and looking up a user to log in.
+
+The ORM builds its query again on every call and turns each row into a
+validated model. These statements are built once, when this module is
+imported, so SQLAlchemy only compiles each of them once, and asyncpg prepares
+them once per connection (up to `DB_STATEMENT_CACHE_SIZE` statements). Rows
+are returned as plain records, without validation.
+
+They run through `database` like any other query, so they are sent to a read
+replica inside `read_from_replica()`. Writes still go through the models, so
+that their signals keep the session cache and revocation set up to date. The
+other hot write, extending session expiry, is batched by
+`models.session_expiry` with a prepared statement.
+
+Compare with the ORM with `python -m benchmarks.fast_queries`.
+"""
+
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from uuid import UUID
+
+import sqlalchemy
+from starlette.authentication import BaseUser
+
+from ._database import database
+from .session import Session, SessionLifetimeMixin
+from .user import User
+
+_session = Session.ormar_config.table
+_user = User.ormar_config.table
+
+_USER_COLUMNS = (
+    _user.c.id,
+    _user.c.first_name,
+    _user.c.last_name,
+    _user.c.email_address,
+    _user.c.is_verified,
+    _user.c.is_active,
+    _user.c.is_cso,
+)
+
+SESSION_BY_TOKEN_HASH = (
+    sqlalchemy.select(
+        _session.c.id,
+        _session.c.expires_at,
+        _session.c.is_active,
+        *(column.label(f"user_{column.name}") for column in _USER_COLUMNS),
+    )
+    .join_from(_session, _user, _session.c.user == _user.c.id)
+    .where(_session.c.token_hash == sqlalchemy.bindparam("token_hash"))
+)
+
+USER_BY_EMAIL = sqlalchemy.select(*_USER_COLUMNS, _user.c.password).where(
+    _user.c.email_address == sqlalchemy.bindparam("email_address")
+)
+
+
+@dataclass(frozen=True, slots=True)
+class UserRecord(BaseUser):
+    """
+    A user, as attached to authenticated requests. The password hash is only
+    loaded for logging in.
+    """
+
+    id: UUID
+    first_name: str
+    last_name: str
+    email_address: str
+    is_verified: bool
+    is_active: bool
+    is_cso: bool
+    password: str | None = None
+
+    @property
+    def is_authenticated(self) -> bool:
+        return True
+
+    @property
+    def display_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+    @property
+    def identity(self) -> str:
+        return str(self.id)
+
+    def to_user(self) -> User:
+        """Builds a `User` from the record, without validating it again."""
+        return User.model_construct(**asdict(self))
+
+
+@dataclass(slots=True)
+class SessionRecord(SessionLifetimeMixin):
+    id: UUID
+    token_hash: bytes
+    expires_at: datetime
+    is_active: bool
+    user: UserRecord
+
+    @classmethod
+    def from_session(cls, session: Session) -> "SessionRecord":
+        """Builds a record from a `Session` loaded with its user."""
+        return cls(
+            id=session.id,
+            token_hash=session.token_hash,
+            expires_at=session.expires_at,
+            is_active=session.is_active,
+            user=UserRecord(*(getattr(session.user, column.name) for column in _USER_COLUMNS)),
+        )
+
+
+async def session_by_token_hash(token_hash: bytes) -> SessionRecord | None:
+    """Looks up a session and its user by the hash of the session token."""
+    async with database.get_query_executor() as executor:
+        row = await executor.fetch_one(SESSION_BY_TOKEN_HASH.params(token_hash=token_hash))
+    if row is None:
+        return None
+
+    return SessionRecord(
+        id=row["id"],
+        token_hash=token_hash,
+        expires_at=row["expires_at"],
+        is_active=row["is_active"],
+        user=UserRecord(*(row[f"user_{column.name}"] for column in _USER_COLUMNS)),
+    )
+
+
+async def user_by_email(email_address: str) -> UserRecord | None:
+    """Looks up a user, with their password hash, by their normalised email address."""
+    async with database.get_query_executor() as executor:
+        row = await executor.fetch_one(USER_BY_EMAIL.params(email_address=email_address))
+    if row is None:
+        return None
+    return UserRecord(**row)
@@ -1,5 +1,7 @@
+import hashlib
 from datetime import UTC, datetime, timedelta
 from secrets import token_hex
+from typing import Protocol
 from uuid import UUID, uuid4
 
 import ormar
@@ -7,20 +9,66 @@ import ormar
 from config import Config
 
 from ._database import DateFieldsMixins, ormar_config
+from ._fields import NativeUUID
+from .session_expiry import SessionExpiryWriter
+from .session_reaper import SessionReaper
 from .user import User
 
 
-class Session(ormar.Model, DateFieldsMixins):
-    ormar_config = ormar_config.copy(tablename="tbl_session")  # type: ignore
+class _HasLifetime(Protocol):
+    id: UUID
+    expires_at: datetime
 
-    id: UUID = ormar.UUID(
-        primary_key=True,
-        unique=True,
-        nullable=False,
+
+class SessionLifetimeMixin:
+    """
+    Sliding expiry, for both `Session` and the `SessionRecord`s from
+    `models.fast_queries`. Expects `id` and `expires_at` attributes.
+    """
+
+    __slots__ = ()
+
+    async def extend_session(self: _HasLifetime):
+        """
+        Extends the session to a full `SESSION_COOKIE_LIFETIME` from now.
+
+        The new expiry is set on this instance straight away, but is written
+        to the database in the background by `session_expiry_writer`.
+        """
+        self.expires_at = datetime.now(UTC) + timedelta(
+            seconds=Config.Application.session_cookie_lifetime
+        )
+        session_expiry_writer.schedule(self.id, self.expires_at)
+
+    def needs_extension(self: _HasLifetime) -> bool:
+        """
+        Whether the remaining lifetime of the session has dropped below
+        `SESSION_REFRESH_THRESHOLD` (a fraction of `SESSION_COOKIE_LIFETIME`).
+        """
+        remaining = self.expires_at.replace(tzinfo=UTC) - datetime.now(UTC)
+        return remaining < timedelta(
+            seconds=Config.Application.session_cookie_lifetime
+            * Config.Application.session_refresh_threshold
+        )
+
+    def is_expired(self: _HasLifetime) -> bool:
+        return datetime.now(UTC) >= self.expires_at.replace(tzinfo=UTC)
+
+
+class Session(ormar.Model, DateFieldsMixins, SessionLifetimeMixin):
+    ormar_config = ormar_config.copy(  # type: ignore
+        tablename="tbl_session",
+        # For `authentication.invalidation`. ormar's stubs do not know it is a constraint
+        constraints=[ormar.IndexColumns("updated_date", name="ix_tbl_session_updated_date")],  # type: ignore[list-item]
     )
-    user: User = ormar.ForeignKey(User, related_name="sessions")
-    token: str = ormar.String(max_length=255, unique=True)
-    expires_at: datetime = ormar.DateTime(timezone=True)
+
+    id: UUID = NativeUUID(primary_key=True, nullable=False)
+    user: User = ormar.ForeignKey(User, related_name="sessions", index=True)
+    # The SHA-256 digest of the session token; the token itself is only held by the client
+    token_hash: bytes = ormar.LargeBinary(max_length=32, unique=True, nullable=True)
+    # Plaintext tokens from before they were hashed, cleared by `commands.hash_session_tokens`
+    token: str | None = ormar.String(max_length=255, unique=True, nullable=True)
+    expires_at: datetime = ormar.DateTime(timezone=True, index=True)
     is_active: bool = ormar.Boolean(default=True)
 
     @classmethod
@@ -31,15 +79,74 @@ class Session(ormar.Model, DateFieldsMixins):
         )
 
         session = await cls.objects.create(
-            id=uuid4(), user=user, token=session_token, expires_at=expires_at
+            id=uuid4(),
+            user=user,
+            token_hash=cls.hash_token(session_token),
+            expires_at=expires_at,
         )
         return session, session_token
 
-    async def extend_session(self):
-        await self.update(
-            expires_at=datetime.now(UTC)
-            + timedelta(seconds=Config.Application.session_cookie_lifetime)
-        )
+    @staticmethod
+    def hash_token(token: str) -> bytes:
+        """
+        Session tokens are 256 random bits, so a plain SHA-256 digest is
+        enough to stop them being recovered from the database.
+        """
+        return hashlib.sha256(token.encode("utf-8")).digest()
 
-    def is_expired(self) -> bool:
-        return datetime.now(UTC) >= self.expires_at.replace(tzinfo=UTC)
+    @classmethod
+    async def get_by_token(cls, token: str) -> "Session | None":
+        """
+        Looks up the session (with its user) for a session token.
+
+        While `LEGACY_SESSION_TOKENS` is on, sessions created before tokens
+        were hashed are found by their plaintext token instead.
+        """
+        token_hash = cls.hash_token(token)
+        session = await cls.objects.select_related("user").get_or_none(token_hash=token_hash)
+        if session is None and Config.Application.legacy_session_tokens:
+            session = await cls.hash_legacy_token(token)
+        return session
+
+    @classmethod
+    async def hash_legacy_token(cls, token: str) -> "Session | None":
+        """
+        Looks up a session (with its user) created before tokens were hashed
+        by its plaintext token, and hashes the token.
+        """
+        session = await cls.objects.select_related("user").get_or_none(token=token)
+        if session is not None:
+            await session.update(
+                _columns=["token_hash", "token", "updated_date"],
+                token_hash=cls.hash_token(token),
+                token=None,
+            )
+        return session
+
+    async def revoke(self):
+        """
+        Marks the session as inactive so it can no longer be used.
+
+        In "signed" session token mode the row is kept until any session
+        claims issued for it have gone stale, as it is the record that they
+        are revoked; `session_reaper` deletes it after that.
+        """
+        await self.update(is_active=False)
+
+
+session_expiry_writer = SessionExpiryWriter(
+    Session.ormar_config.table,
+    flush_interval=Config.Application.session_expiry_flush_interval,
+)
+
+session_reaper = SessionReaper(
+    Session.ormar_config.table,
+    interval=Config.Application.session_reap_interval,
+    batch_size=Config.Application.session_reap_batch_size,
+    # Claims issued before a session was revoked are accepted for at most this long
+    revoked_retention=(
+        Config.Application.signed_session_ttl
+        if Config.Application.session_token_mode == "signed"
+        else 0
+    ),
+)
@@ -0,0 +1,82 @@
+from datetime import datetime
+from uuid import UUID
+
+import sqlalchemy
+
+from common.periodic import PeriodicTask
+
+from ._database import database
+
+
+class SessionExpiryWriter(PeriodicTask):
+    """
+    Buffers session expiry extensions and writes them to the database
+    in batches from a background task, rather than issuing an UPDATE
+    on every request.
+
+    Extensions for the same session are coalesced, so only the latest
+    expiry for each session is written. Each batch is written by running
+    one prepared UPDATE for all of its sessions at once (executemany).
+
+    Pending extensions are flushed when the writer is stopped. If the
+    process dies before a flush, the affected sessions keep their
+    previous (earlier) expiry.
+    """
+
+    def __init__(self, table: sqlalchemy.Table, flush_interval: float, batch_size: int = 500):
+        super().__init__(flush_interval)
+        self.table = table
+        self.batch_size = batch_size
+        self._pending: dict[UUID, datetime] = {}
+        # Built once, so it is only compiled once and prepared once per connection
+        self._query = (
+            table.update()
+            .where(table.c.id == sqlalchemy.bindparam("session_id"))
+            .values(expires_at=sqlalchemy.bindparam("new_expires_at"))
+        )
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def schedule(self, session_id: UUID, expires_at: datetime):
+        self._pending[session_id] = expires_at
+
+    async def flush(self) -> int:
+        """
+        Writes all pending extensions to the database.
+
+        Returns:
+            int: The number of sessions written.
+        """
+        pending, self._pending = self._pending, {}
+        items = list(pending.items())
+
+        for start in range(0, len(items), self.batch_size):
+            batch = items[start : start + self.batch_size]
+            try:
+                async with database.transaction():
+                    async with database.connection() as conn:
+                        await conn.execute(
+                            self._query,
+                            [
+                                {"session_id": session_id, "new_expires_at": value}
+                                for session_id, value in batch
+                            ],
+                        )
+            except Exception:
+                # Re-queue what was not written, without overwriting newer extensions
+                for session_id, value in items[start:]:
+                    self._pending.setdefault(session_id, value)
+                raise
+
+        return len(items)
+
+    error_message = "[sessions] failed to flush session expiry extensions"
+
+    async def tick(self):
+        await self.flush()
+
+    async def stop(self):
+        await super().stop()
+        await self.flush()
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+from typing import cast
+
+import sqlalchemy
+from sqlalchemy.engine import CursorResult
+
+from common.periodic import PeriodicTask
+
+from ._database import database
+
+
+class SessionReaper(PeriodicTask):
+    """
+    Periodically deletes expired and inactive sessions.
+
+    Without this, sessions are only deleted when their token is presented
+    again after expiry, so the session table (and its token index) would
+    keep growing as users log in. Inactive (revoked) sessions are kept for
+    `revoked_retention` seconds after they were revoked, as until then they
+    are the record that session claims issued for them are revoked (see
+    `authentication.revocation`). Rows are deleted in batches of
+    `batch_size` so that each DELETE stays short and does not hold locks on
+    a large part of the table.
+    """
+
+    def __init__(
+        self,
+        table: sqlalchemy.Table,
+        interval: float,
+        batch_size: int = 1000,
+        revoked_retention: float = 0,
+    ):
+        super().__init__(interval)
+        self.table = table
+        self.batch_size = batch_size
+        self.revoked_retention = revoked_retention
+
+    async def reap(self) -> int:
+        """
+        Deletes all expired sessions, and inactive sessions revoked more
+        than `revoked_retention` seconds ago, one batch at a time.
+
+        Returns:
+            int: The number of sessions deleted.
+        """
+        deleted = 0
+        while True:
+            # `updated_date` is naive local time, and is last set when the session is revoked
+            revoked_before = datetime.now() - timedelta(seconds=self.revoked_retention)
+            stale_ids = (
+                sqlalchemy.select(self.table.c.id)
+                .where(
+                    sqlalchemy.or_(
+                        self.table.c.expires_at <= datetime.now(UTC),
+                        sqlalchemy.and_(
+                            self.table.c.is_active.is_(False),
+                            self.table.c.updated_date <= revoked_before,
+                        ),
+                    )
+                )
+                .limit(self.batch_size)
+                .scalar_subquery()
+            )
+            query = self.table.delete().where(self.table.c.id.in_(stale_ids))
+
+            async with database.transaction():
+                async with database.connection() as conn:
+                    # A DELETE has a cursor result, which counts the rows it affected
+                    result = cast(CursorResult, await conn.execute(query))
+
+            deleted += result.rowcount
+            if result.rowcount < self.batch_size:
+                return deleted
+
+            # Give other tasks a chance to run between batches
+            await asyncio.sleep(0)
+
+    error_message = "[sessions] failed to reap expired sessions"
+
+    async def tick(self):
+        deleted = await self.reap()
+        logging.info(f"[sessions] reaped {deleted} expired and inactive sessions")
@@ -1,23 +1,29 @@
+import asyncio
+import logging
 import secrets
 from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
 import ormar
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
 from starlette.authentication import BaseUser
 
+from authentication.password_hasher import password_hasher
+
 from ._database import DateFieldsMixins, ormar_config
+from ._fields import NativeUUID
 
+# Keeps references to background rehashes, so they are not garbage collected
+_rehash_tasks: set[asyncio.Task] = set()
 
-class User(ormar.Model, DateFieldsMixins, BaseUser):
-    ormar_config = ormar_config.copy(tablename="tbl_user")  # type: ignore
 
-    id: UUID = ormar.UUID(
-        primary_key=True,
-        unique=True,
-        nullable=False,
+class User(ormar.Model, DateFieldsMixins, BaseUser):
+    ormar_config = ormar_config.copy(  # type: ignore
+        tablename="tbl_user",
+        # For `authentication.invalidation`. ormar's stubs do not know it is a constraint
+        constraints=[ormar.IndexColumns("updated_date", name="ix_tbl_user_updated_date")],  # type: ignore[list-item]
     )
+
+    id: UUID = NativeUUID(primary_key=True, nullable=False)
     first_name: str = ormar.String(max_length=50)
     last_name: str = ormar.String(max_length=50)
     password: str = ormar.Text(nullable=False)
@@ -32,16 +38,28 @@ class User(ormar.Model, DateFieldsMixins, BaseUser):
 
     @classmethod
     async def generate_password_hash(cls, password: str):
-        ph = PasswordHasher()
-        return ph.hash(password)
+        # Hashing runs in a worker process, see authentication.password_hasher
+        return await password_hasher.hash(password)
 
     async def check_password(self, password: str):
-        ph = PasswordHasher()
-        try:
-            return ph.verify(self.password, password)
-        except VerifyMismatchError:
+        if not await password_hasher.verify(self.password, password):
             return False
 
+        # Upgrade hashes made with old Argon2 parameters, without delaying the login
+        if password_hasher.needs_rehash(self.password):
+            task = asyncio.create_task(self._rehash_password(password))
+            _rehash_tasks.add(task)
+            task.add_done_callback(_rehash_tasks.discard)
+
+        return True
+
+    async def _rehash_password(self, password: str):
+        try:
+            password_hash = await password_hasher.hash(password)
+            await self.update(_columns=["password", "updated_date"], password=password_hash)
+        except Exception:
+            logging.exception(f"[users] failed to rehash the password for user {self.id}")
+
     async def get_verification_token(self) -> str:
         """
         Returns the user's email verification token.
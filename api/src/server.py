@@ -0,0 +1,65 @@
+"""
+Runs the API in production, with `Config.Server.workers` worker processes.
+
+Each worker runs its own event loop and database pool, so one container can
+use every core. uvloop and httptools are used when they are installed (they
+are with `uvicorn[standard]`), falling back to asyncio and h11.
+
+On SIGTERM each worker stops accepting connections, gives in-flight requests
+up to `SERVER_GRACEFUL_SHUTDOWN_TIMEOUT` seconds to finish, then runs the
+app's lifespan shutdown, which flushes pending writes and closes its
+database pools.
+
+For development, run `uvicorn app:app --reload` instead.
+
+Usage:
+    python -m server [--workers N]
+"""
+
+import argparse
+import importlib.util
+from typing import Any
+
+import uvicorn
+
+from common.metrics import clear_directory
+from config import Config
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def uvicorn_options(workers: int | None = None) -> dict[str, Any]:
+    """The options `uvicorn.run` is called with."""
+    return {
+        "host": Config.Server.host,
+        "port": Config.Server.port,
+        "workers": workers or Config.Server.workers,
+        "loop": "uvloop" if _installed("uvloop") else "asyncio",
+        "http": "httptools" if _installed("httptools") else "h11",
+        "backlog": Config.Server.backlog,
+        "timeout_keep_alive": Config.Server.keep_alive,
+        "timeout_graceful_shutdown": Config.Server.graceful_shutdown_timeout,
+        # So rate limits and logs see the client's address rather than the proxy's
+        "proxy_headers": True,
+        "forwarded_allow_ips": Config.Server.forwarded_allow_ips,
+        "access_log": Config.Server.access_log,
+        # Fail to start rather than serve without a database
+        "lifespan": "on",
+    }
+
+
+def main(workers: int | None = None):
+    # Counters from a previous run would otherwise be added to this run's
+    if Config.Metrics.directory:
+        clear_directory(Config.Metrics.directory)
+    uvicorn.run("app:app", **uvicorn_options(workers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    main(args.workers)
@@ -7,16 +7,31 @@ os.environ["TESTING"] = "true"
 load_dotenv("../.env.test")
 
 import asyncio
+import base64
+import json
+from unittest.mock import AsyncMock
+from uuid import uuid4
 
 import email_validator
+import pytest
 import pytest_asyncio
 from asgi_lifespan import LifespanManager
 from httpx import ASGITransport, AsyncClient
+from itsdangerous import TimestampSigner
 from sqlalchemy.ext.asyncio import create_async_engine
 
 from app import app
 from async_database_utils import create_database, database_exists, drop_database
-from models._database import DATABASE_URL, metadata
+from authentication.rate_limit import rate_limiter
+from authentication.revocation import revocation_set
+from common.email_deliverability import deliverability_checker
+from common.email_outbox import email_outbox
+from config import Config
+from models import Session, User
+from models._database import DATABASE_URL, database, metadata
+from tests.replica_stand_in import ReplicaStandIn
+from tests.resolver_stand_in import ResolverStandIn
+from tests.smtp_stand_in import SMTPStandIn
 
 email_validator.TEST_ENVIRONMENT = True
 
@@ -70,3 +85,105 @@ async def test_client(db):
             base_url="http://testserver",
         ) as client:
             yield client
+
+
+# Rate limits would otherwise carry over between tests made from the same client address
+@pytest_asyncio.fixture(autouse=True)
+async def _reset_rate_limits():
+    await rate_limiter.store.clear()
+
+
+# Emails are sent to a local stand-in SMTP server rather than the configured one
+@pytest_asyncio.fixture(autouse=True)
+async def smtp_server(monkeypatch):
+    server = SMTPStandIn()
+    await server.start()
+    monkeypatch.setattr(Config.SMTP, "host", "127.0.0.1")
+    monkeypatch.setattr(Config.SMTP, "port", server.port)
+    monkeypatch.setattr(Config.SMTP, "use_tls", False)
+    monkeypatch.setattr(Config.SMTP, "user", None)
+    yield server
+    await email_outbox.stop()
+    await server.stop()
+
+
+# Email domains are checked against an offline resolver rather than DNS
+@pytest_asyncio.fixture(autouse=True)
+async def resolver(monkeypatch):
+    resolver = ResolverStandIn()
+    monkeypatch.setattr(deliverability_checker, "resolver", resolver)
+    deliverability_checker.clear()
+    yield resolver
+    deliverability_checker.clear()
+
+
+# A second local database stands in for a read replica of the test database
+@pytest_asyncio.fixture
+async def replica(tmp_path):
+    stand_in = ReplicaStandIn(tmp_path / "replica.sqlite")
+    await stand_in.connect()
+    await stand_in.create_tables()
+    database.replicas.replicas.append(stand_in)
+    yield stand_in
+    database.replicas.replicas.remove(stand_in)
+    await stand_in.disconnect()
+
+
+# Creates users, with made-up values for the fields a test does not set
+@pytest.fixture
+def create_user():
+    async def create(**fields) -> User:
+        user_id = fields.pop("id", None) or uuid4()
+        return await User.objects.create(
+            id=user_id,
+            **{
+                "first_name": "Test",
+                "last_name": "User",
+                "email_address": f"{user_id}@example.com",
+                "password": "not-a-real-hash",
+                **fields,
+            },
+        )
+
+    return create
+
+
+# Logs the test client in with a session token, in a cookie signed as the session middleware does
+@pytest.fixture
+def set_session_cookie(test_client):
+    def set_cookie(session_token: str):
+        signer = TimestampSigner(Config.Application.secret_key)
+        data = base64.b64encode(json.dumps({"session_token": session_token}).encode("utf-8"))
+        test_client.cookies.set(
+            Config.Application.session_cookie_name, signer.sign(data).decode("utf-8")
+        )
+
+    return set_cookie
+
+
+# Creates a user with a session, and logs the test client in with it
+@pytest.fixture
+def log_in(create_user, set_session_cookie):
+    async def create_logged_in_user(**fields) -> User:
+        user = await create_user(**fields)
+        _, session_token = await Session.create_session(user)
+        set_session_cookie(session_token)
+        return user
+
+    return create_logged_in_user
+
+
+# Verification emails are recorded rather than sent
+@pytest.fixture
+def mock_sender(monkeypatch):
+    sender = AsyncMock()
+    monkeypatch.setattr("endpoints.auth.resend_verify_email.handle_verification_email", sender)
+    return sender
+
+
+# Authenticates with signed session claims, starting from an empty revocation set
+@pytest.fixture
+def signed_mode(monkeypatch):
+    monkeypatch.setattr(Config.Application, "session_token_mode", "signed")
+    revocation_set.sessions.clear()
+    revocation_set.users.clear()
@@ -1,13 +1,18 @@
+import asyncio
 import base64
 import json
 from datetime import UTC, datetime
+from unittest.mock import AsyncMock
 
 import httpx
 import pytest
+from argon2 import PasswordHasher
 from itsdangerous import TimestampSigner
 
+from authentication.password_hasher import password_hasher
 from config import Config
 from models import User
+from models.user import _rehash_tasks
 
 
 @pytest.mark.asyncio
@@ -47,6 +52,10 @@ async def test_successful_login(test_client: httpx.AsyncClient):
     session_data = json.loads(base64.b64decode(signer.unsign(cookie_value)))
     assert "session_token" in session_data
 
+    # The user lookup and session creation are reported in the Server-Timing header
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="0 queries"' not in response.headers["Server-Timing"]
+
 
 @pytest.mark.asyncio
 async def test_login_invalid_credentials(test_client: httpx.AsyncClient):
@@ -109,3 +118,86 @@ async def test_login_bad_email_format(test_client: httpx.AsyncClient):
     assert response.status_code == 401
     assert response.json()["detail"] == "Invalid credentials"
     assert Config.Application.session_cookie_name not in response.cookies
+
+
+@pytest.mark.asyncio
+async def test_login_when_hashing_saturated_returns_503(
+    test_client: httpx.AsyncClient, monkeypatch
+):
+    password = "AnotherSecurePassword!"
+    await User.objects.create(
+        id="123e4567-e89b-12d3-a456-426614174000",
+        first_name="John",
+        last_name="Doe",
+        email_address="john.doe@example.com",
+        password=await User.generate_password_hash(password),
+    )
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+
+    response = await test_client.post(
+        "/auth/login/",
+        json={"email_address": "john.doe@example.com", "password": password},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert Config.Application.session_cookie_name not in response.cookies
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_outdated_password_hash(test_client: httpx.AsyncClient):
+    password = "AnotherSecurePassword!"
+    outdated_hash = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1).hash(password)
+    user = await User.objects.create(
+        id="123e4567-e89b-12d3-a456-426614174000",
+        first_name="John",
+        last_name="Doe",
+        email_address="john.doe@example.com",
+        password=outdated_hash,
+    )
+
+    response = await test_client.post(
+        "/auth/login/",
+        json={"email_address": user.email_address, "password": password},
+    )
+    assert response.status_code == 200
+
+    # The rehash happens in the background after the login has returned
+    await asyncio.gather(*_rehash_tasks)
+
+    refreshed = await User.objects.get(id=user.id)
+    assert refreshed.password != outdated_hash
+    assert not password_hasher.needs_rehash(refreshed.password)
+    assert await refreshed.check_password(password)
+
+
+@pytest.mark.asyncio
+async def test_login_rate_limited_per_email_returns_429(
+    test_client: httpx.AsyncClient, monkeypatch
+):
+    check_password = AsyncMock(return_value=False)
+    monkeypatch.setattr(User, "check_password", check_password)
+    await User.objects.create(
+        id="123e4567-e89b-12d3-a456-426614174000",
+        first_name="John",
+        last_name="Doe",
+        email_address="john.doe@example.com",
+        password="not-a-real-hash",
+    )
+
+    for _ in range(Config.RateLimit.login_per_email):
+        response = await test_client.post(
+            "/auth/login/",
+            json={"email_address": "john.doe@example.com", "password": "WrongPassword!"},
+        )
+        assert response.status_code == 401
+
+    # Differently cased addresses count towards the same limit
+    response = await test_client.post(
+        "/auth/login/",
+        json={"email_address": " John.Doe@Example.com", "password": "WrongPassword!"},
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    # The rejected attempt never reached password verification
+    assert check_password.await_count == Config.RateLimit.login_per_email
@@ -0,0 +1,70 @@
+from uuid import UUID
+
+import httpx
+import pytest
+
+from authentication.session_cache import session_cache
+from config import Config
+from models import Session
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_session_and_cached_session(
+    test_client: httpx.AsyncClient, mock_sender, log_in
+):
+    user = await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-777777777777"))
+    session_cookie = test_client.cookies[Config.Application.session_cookie_name]
+
+    # Authenticate once so the session is cached
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    res = await test_client.post("/auth/logout/")
+    assert res.status_code == 200
+    assert res.json()["message"] == "Logged out successfully"
+    session = await Session.objects.get(user=user.id)
+    assert session.is_active is False
+
+    # Replaying the old cookie must not authenticate from the cache
+    test_client.cookies.set(Config.Application.session_cookie_name, session_cookie)
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_requires_login_returns_401(test_client: httpx.AsyncClient):
+    res = await test_client.post("/auth/logout/")
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_cached_session_is_served_without_lookup(
+    test_client: httpx.AsyncClient, mock_sender, log_in
+):
+    await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-888888888888"))
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+    hits = session_cache.hits
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+    assert session_cache.hits == hits + 1
+    # The session is unchanged, so the cookie is not sent again
+    assert "set-cookie" not in res.headers
+
+
+@pytest.mark.asyncio
+async def test_deactivating_user_revokes_cached_session(
+    test_client: httpx.AsyncClient, mock_sender, log_in
+):
+    user = await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-999999999999"))
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    await user.update(is_active=False)
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 401
+    assert await Session.objects.filter(user=user.id).count() == 0
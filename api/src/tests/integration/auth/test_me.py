@@ -0,0 +1,85 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+import httpx
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_me_returns_profile_with_validators(test_client: httpx.AsyncClient, log_in):
+    user = await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-000000000101"))
+
+    res = await test_client.get("/auth/me/")
+
+    assert res.status_code == 200
+    assert res.json()["id"] == str(user.id)
+    assert res.json()["email_address"] == user.email_address
+    assert "password" not in res.json()
+    assert res.headers["ETag"].startswith('W/"')
+    assert res.headers["Last-Modified"].endswith("GMT")
+    assert res.headers["Cache-Control"] == "private, no-cache"
+
+
+@pytest.mark.asyncio
+async def test_me_answers_matching_etag_with_not_modified(test_client: httpx.AsyncClient, log_in):
+    await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-000000000102"))
+    etag = (await test_client.get("/auth/me/")).headers["ETag"]
+
+    res = await test_client.get("/auth/me/", headers={"If-None-Match": etag})
+
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["ETag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_me_answers_if_modified_since_with_not_modified(
+    test_client: httpx.AsyncClient, log_in
+):
+    await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-000000000103"))
+    last_modified = (await test_client.get("/auth/me/")).headers["Last-Modified"]
+
+    res = await test_client.get("/auth/me/", headers={"If-Modified-Since": last_modified})
+
+    assert res.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_me_changes_etag_when_user_is_updated(test_client: httpx.AsyncClient, log_in):
+    user = await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-000000000104"))
+    etag = (await test_client.get("/auth/me/")).headers["ETag"]
+
+    await user.update(first_name="Renamed")
+    res = await test_client.get("/auth/me/", headers={"If-None-Match": etag})
+
+    assert res.status_code == 200
+    assert res.json()["first_name"] == "Renamed"
+    assert res.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_me_changes_etag_when_only_some_columns_are_updated(
+    test_client: httpx.AsyncClient, log_in
+):
+    user = await log_in(
+        id=UUID("aaaaaaaa-bbbb-cccc-dddd-000000000105"),
+        verification_token="token-105",
+        verification_token_created_at=datetime.now(UTC),
+    )
+    etag = (await test_client.get("/auth/me/")).headers["ETag"]
+
+    # Verifying updates `is_verified` alone
+    res = await test_client.post(f"/auth/verify/{user.id}/", json={"token": "token-105"})
+    assert res.status_code == 200
+    res = await test_client.get("/auth/me/", headers={"If-None-Match": etag})
+
+    assert res.status_code == 200
+    assert res.json()["is_verified"] is True
+    assert res.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_me_requires_authentication(test_client: httpx.AsyncClient):
+    res = await test_client.get("/auth/me/")
+
+    assert res.status_code == 401
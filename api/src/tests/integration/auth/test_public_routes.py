@@ -0,0 +1,69 @@
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import httpx
+import pytest
+
+from authentication.middleware import TurvaAuthenticationBackend
+from config import Config
+
+
+@pytest.fixture
+def spy_authenticate(monkeypatch):
+    authenticate = AsyncMock(wraps=TurvaAuthenticationBackend().authenticate)
+    monkeypatch.setattr(TurvaAuthenticationBackend, "authenticate", authenticate)
+    return authenticate
+
+
+@pytest.mark.asyncio
+async def test_public_routes_skip_the_session_lookup(
+    test_client: httpx.AsyncClient, spy_authenticate, monkeypatch, log_in
+):
+    await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-121212121212"))
+    lookup = AsyncMock()
+    monkeypatch.setattr("authentication.middleware.session_cache.get", lookup)
+
+    res = await test_client.get("/")
+    assert res.status_code == 200
+
+    res = await test_client.post(f"/auth/verify/{uuid4()}/", json={"token": "abcd"})
+    assert res.status_code == 404
+
+    res = await test_client.post(
+        "/auth/login/", json={"email_address": "nobody@example.com", "password": "Password123!"}
+    )
+    assert res.status_code == 401
+
+    assert spy_authenticate.await_count == 3
+    lookup.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_protected_routes_still_authenticate(test_client: httpx.AsyncClient, log_in):
+    res = await test_client.post("/auth/logout/")
+    assert res.status_code == 401
+
+    await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-131313131313"))
+    res = await test_client.post("/auth/logout/")
+    assert res.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_preflight_is_answered_before_authentication(
+    test_client: httpx.AsyncClient, spy_authenticate, log_in
+):
+    await log_in(id=UUID("aaaaaaaa-bbbb-cccc-dddd-141414141414"))
+
+    res = await test_client.options(
+        "/auth/logout/",
+        headers={
+            "Origin": "http://localhost:5173",
+            "Access-Control-Request-Method": "POST",
+        },
+    )
+
+    assert res.status_code == 200
+    assert res.headers["access-control-allow-origin"] == "http://localhost:5173"
+    assert res.headers["access-control-max-age"] == str(Config.Application.cors_max_age)
+    assert "set-cookie" not in res.headers
+    spy_authenticate.assert_not_called()
@@ -1,4 +1,3 @@
-import asyncio
 from datetime import UTC, datetime
 from uuid import UUID
 
@@ -6,27 +5,17 @@ import httpx
 import pytest
 from argon2 import PasswordHasher
 
-from models import User
-
-
-# Mock smtplib.SMTP used in common.verify_email with a simple MagicMock
-@pytest.fixture(autouse=True)
-def mock_smtp(monkeypatch):
-    from unittest.mock import MagicMock
-
-    smtp_mock = MagicMock(name="SMTP")
-    smtp_instance = MagicMock(name="SMTPInstance")
-    # Support context manager: with smtplib.SMTP(...) as server:
-    smtp_mock.return_value.__enter__.return_value = smtp_instance
-    smtp_mock.return_value.__exit__.return_value = False
-    monkeypatch.setattr("common.verify_email.smtplib.SMTP", smtp_mock)
-    return smtp_mock
+from common.email_outbox import email_outbox
+from config import Config
+from models import OutboxEmail, User
+from tests.resolver_stand_in import ResolverStandIn
+from tests.smtp_stand_in import SMTPStandIn
 
 
 @pytest.mark.asyncio
 async def test_successful_register_creates_user_and_returns_id(
     test_client: httpx.AsyncClient,
-    mock_smtp,
+    smtp_server: SMTPStandIn,
 ):
     payload = {
         "first_name": "Jane",
@@ -41,9 +30,6 @@ async def test_successful_register_creates_user_and_returns_id(
     assert data["message"] == "User registered successfully"
     assert "id" in data and data["id"]
 
-    # Allow background task to run
-    await asyncio.sleep(0)
-
     # Verify user persisted
     user = await User.objects.get_or_none(id=UUID(data["id"]))
     assert user is not None
@@ -55,16 +41,18 @@ async def test_successful_register_creates_user_and_returns_id(
     assert user.verification_token is not None
     assert user.verification_token_created_at is not None
 
-    # SMTP called and a single message sent
-    assert mock_smtp.called
-    smtp_instance = mock_smtp.return_value.__enter__.return_value
-    smtp_instance.send_message.assert_called_once()
+    # A single verification email queued and sent
+    assert await OutboxEmail.objects.count() == 1
+    await email_outbox.drain()
+    assert len(smtp_server.messages) == 1
+    assert smtp_server.messages[0]["To"] == "jane.doe@example.test"
+    assert smtp_server.messages[0]["Subject"] == "Verify your email"
 
 
 @pytest.mark.asyncio
 async def test_register_with_existing_email_returns_400(
     test_client: httpx.AsyncClient,
-    mock_smtp,
+    smtp_server: SMTPStandIn,
 ):
     existing_email = "existing.user@example.com"
     hashed = PasswordHasher().hash("SomePassword123!")
@@ -91,13 +79,14 @@ async def test_register_with_existing_email_returns_400(
     assert response.status_code == 400
     assert response.json()["detail"] == "A user with this email already exists."
     # No email should be attempted
-    assert not mock_smtp.called
+    assert await OutboxEmail.objects.count() == 0
+    assert smtp_server.messages == []
 
 
 @pytest.mark.asyncio
 async def test_register_with_invalid_email_returns_400(
     test_client: httpx.AsyncClient,
-    mock_smtp,
+    smtp_server: SMTPStandIn,
 ):
     response = await test_client.post(
         "/auth/register/",
@@ -112,4 +101,59 @@ async def test_register_with_invalid_email_returns_400(
     assert response.status_code == 400
     assert response.json()["detail"] == "Invalid email format"
     # No email should be attempted
-    assert not mock_smtp.called
+    assert await OutboxEmail.objects.count() == 0
+    assert smtp_server.messages == []
+
+
+@pytest.mark.asyncio
+async def test_register_with_undeliverable_domain_returns_400(
+    test_client: httpx.AsyncClient,
+    resolver: ResolverStandIn,
+    smtp_server: SMTPStandIn,
+):
+    resolver.undeliverable.add("nowhere.example.com")
+
+    response = await test_client.post(
+        "/auth/register/",
+        json={
+            "first_name": "No",
+            "last_name": "Where",
+            "email": "no.where@nowhere.example.com",
+            "password": "Password123!",
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid email format"
+    assert resolver.lookups == ["nowhere.example.com"]
+    assert await User.objects.count() == 0
+
+
+@pytest.mark.asyncio
+async def test_register_rate_limited_per_ip_returns_429(
+    test_client: httpx.AsyncClient,
+    smtp_server: SMTPStandIn,
+):
+    for attempt in range(Config.RateLimit.register_per_ip):
+        response = await test_client.post(
+            "/auth/register/",
+            json={
+                "first_name": "Bad",
+                "last_name": "Email",
+                "email": f"not-an-email-{attempt}",
+                "password": "Password123!",
+            },
+        )
+        assert response.status_code == 400
+
+    response = await test_client.post(
+        "/auth/register/",
+        json={
+            "first_name": "Jane",
+            "last_name": "Doe",
+            "email": "jane.doe@example.test",
+            "password": "SecurePassword123!",
+        },
+    )
+    assert response.status_code == 429
+    assert await User.objects.count() == 0
@@ -1,35 +1,14 @@
-import base64
-import json
 from datetime import UTC, datetime
-from unittest.mock import AsyncMock
 from uuid import UUID
 
 import httpx
 import pytest
-from itsdangerous import TimestampSigner
 
-from config import Config
 from models import Session, User
 
 
-def create_signed_session_cookie(session_data: dict) -> str:
-    """Create a signed session cookie matching Starlette SessionMiddleware format."""
-    signer = TimestampSigner(Config.Application.secret_key)
-    data = base64.b64encode(json.dumps(session_data).encode("utf-8"))
-    return signer.sign(data).decode("utf-8")
-
-
-def set_session_cookie(test_client: httpx.AsyncClient, session_key: str):
-    """Helper to set a signed session cookie on the test client."""
-    cookie_value = create_signed_session_cookie({"session_token": session_key})
-    test_client.cookies.set(Config.Application.session_cookie_name, cookie_value)
-
-
 @pytest.mark.asyncio
-async def test_resend_requires_login_returns_401(test_client: httpx.AsyncClient, monkeypatch):
-    mock_sender = AsyncMock()
-    monkeypatch.setattr("endpoints.auth.resend_verify_email.handle_verification_email", mock_sender)
-
+async def test_resend_requires_login_returns_401(test_client: httpx.AsyncClient, mock_sender):
     await User.objects.create(
         id=UUID("aaaaaaaa-bbbb-cccc-dddd-333333333333"),
         first_name="Bob",
@@ -48,11 +27,8 @@ async def test_resend_requires_login_returns_401(test_client: httpx.AsyncClient,
 
 @pytest.mark.asyncio
 async def test_resend_when_logged_in_succeeds_and_sends_email(
-    test_client: httpx.AsyncClient, monkeypatch
+    test_client: httpx.AsyncClient, mock_sender, set_session_cookie
 ):
-    mock_sender = AsyncMock()
-    monkeypatch.setattr("endpoints.auth.resend_verify_email.handle_verification_email", mock_sender)
-
     password = "Password123!"
     hashed = await User.generate_password_hash(password)
     user = await User.objects.create(
@@ -67,7 +43,7 @@ async def test_resend_when_logged_in_succeeds_and_sends_email(
     )
 
     session, session_key = await Session.create_session(user)
-    set_session_cookie(test_client, session_key)
+    set_session_cookie(session_key)
 
     res = await test_client.post("/auth/verify-resend/")
     assert res.status_code == 200
@@ -76,7 +52,7 @@ async def test_resend_when_logged_in_succeeds_and_sends_email(
 
 
 @pytest.mark.asyncio
-async def test_resend_rate_limited_returns_400(test_client: httpx.AsyncClient):
+async def test_resend_rate_limited_returns_400(test_client: httpx.AsyncClient, set_session_cookie):
     password = "Password123!"
     hashed = await User.generate_password_hash(password)
     user = await User.objects.create(
@@ -91,10 +67,7 @@ async def test_resend_rate_limited_returns_400(test_client: httpx.AsyncClient):
     )
 
     session, session_key = await Session.create_session(user)
-    test_client.cookies.set(
-        Config.Application.session_cookie_name,
-        create_signed_session_cookie({"session_token": session_key}),
-    )
+    set_session_cookie(session_key)
 
     res = await test_client.post("/auth/verify-resend/")
     assert res.status_code == 400
@@ -105,7 +78,9 @@ async def test_resend_rate_limited_returns_400(test_client: httpx.AsyncClient):
 
 
 @pytest.mark.asyncio
-async def test_resend_already_verified_returns_message(test_client: httpx.AsyncClient):
+async def test_resend_already_verified_returns_message(
+    test_client: httpx.AsyncClient, set_session_cookie
+):
     password = "Password123!"
     hashed = await User.generate_password_hash(password)
     user = await User.objects.create(
@@ -118,10 +93,7 @@ async def test_resend_already_verified_returns_message(test_client: httpx.AsyncC
     )
 
     session, session_key = await Session.create_session(user)
-    test_client.cookies.set(
-        Config.Application.session_cookie_name,
-        create_signed_session_cookie({"session_token": session_key}),
-    )
+    set_session_cookie(session_key)
 
     res = await test_client.post("/auth/verify-resend/")
     assert res.status_code == 400
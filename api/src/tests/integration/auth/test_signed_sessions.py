@@ -0,0 +1,118 @@
+import base64
+import json
+from uuid import UUID
+
+import httpx
+import pytest
+from itsdangerous import TimestampSigner
+
+from authentication.revocation import revocation_set
+from config import Config
+from models import Session, User
+
+
+def read_session_cookie(test_client: httpx.AsyncClient) -> dict:
+    signer = TimestampSigner(Config.Application.secret_key)
+    cookie_value = test_client.cookies[Config.Application.session_cookie_name]
+    return json.loads(base64.b64decode(signer.unsign(cookie_value)))
+
+
+async def login(test_client: httpx.AsyncClient, user_id: str) -> User:
+    password = "Password123!"
+    user = await User.objects.create(
+        id=UUID(user_id),
+        first_name="Signed",
+        last_name="Session",
+        email_address=f"{user_id}@example.com",
+        password=await User.generate_password_hash(password),
+        is_verified=False,
+    )
+    res = await test_client.post(
+        "/auth/login/", json={"email_address": user.email_address, "password": password}
+    )
+    assert res.status_code == 200
+    return user
+
+
+@pytest.mark.asyncio
+async def test_fresh_claims_authenticate_without_database(
+    test_client: httpx.AsyncClient, signed_mode, mock_sender, monkeypatch
+):
+    user = await login(test_client, "bbbbbbbb-bbbb-cccc-dddd-000000000001")
+
+    # The first request looks the session up and issues claims
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+    claims = read_session_cookie(test_client)["session_claims"]
+    assert claims["uid"] == user.id.hex
+    assert claims["scp"] == ["authenticated"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the session should not be looked up")
+
+    monkeypatch.setattr(Session.objects, "select_related", fail)
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_claims(test_client: httpx.AsyncClient, signed_mode, mock_sender):
+    await login(test_client, "bbbbbbbb-bbbb-cccc-dddd-000000000002")
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+    session_cookie = test_client.cookies[Config.Application.session_cookie_name]
+
+    res = await test_client.post("/auth/logout/")
+    assert res.status_code == 200
+
+    # Replaying the cookie with still-fresh claims must not authenticate
+    test_client.cookies.set(Config.Application.session_cookie_name, session_cookie)
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_deactivation_revokes_claims(
+    test_client: httpx.AsyncClient, signed_mode, mock_sender
+):
+    user = await login(test_client, "bbbbbbbb-bbbb-cccc-dddd-000000000003")
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    await user.update(is_active=False)
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_stale_claims_are_refreshed_from_database(
+    test_client: httpx.AsyncClient, signed_mode, mock_sender, freezer
+):
+    freezer.move_to("2024-06-01T10:00:00Z")
+    user = await login(test_client, "bbbbbbbb-bbbb-cccc-dddd-000000000004")
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    await user.update(is_verified=True)
+    freezer.tick(Config.Application.signed_session_ttl + 1)
+
+    # Stale claims are replaced with claims carrying the new scopes
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 400
+    claims = read_session_cookie(test_client)["session_claims"]
+    assert claims["scp"] == ["authenticated", "verified"]
+
+
+@pytest.mark.asyncio
+async def test_revocation_set_loads_from_database(test_client: httpx.AsyncClient, signed_mode):
+    user = await login(test_client, "bbbbbbbb-bbbb-cccc-dddd-000000000005")
+    session = await Session.objects.get(user=user.id)
+    await Session.objects.filter(id=session.id).update(is_active=False)
+    await User.objects.filter(id=user.id).update(is_active=False)
+
+    await revocation_set.load()
+
+    assert revocation_set.sessions == {session.id}
+    assert revocation_set.users == {user.id}
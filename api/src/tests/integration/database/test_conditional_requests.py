@@ -0,0 +1,34 @@
+import httpx
+import pytest
+
+from common.conditional import collection_validators
+from models import User
+
+users = User.ormar_config.table
+
+
+@pytest.mark.asyncio
+async def test_collection_validators_change_with_rows(test_client: httpx.AsyncClient, create_user):
+    first = await create_user(organisation="Acme")
+    second = await create_user(organisation="Acme")
+    await create_user(organisation="Other")
+
+    initial = await collection_validators(User, users.c.organisation == "Acme")
+    assert initial == await collection_validators(User, users.c.organisation == "Acme")
+    assert initial.last_modified is not None
+
+    await first.update(first_name="Changed")
+    updated = await collection_validators(User, users.c.organisation == "Acme")
+    assert updated.etag != initial.etag
+
+    await second.delete()
+    deleted = await collection_validators(User, users.c.organisation == "Acme")
+    assert deleted.etag != updated.etag
+
+
+@pytest.mark.asyncio
+async def test_collection_validators_of_empty_collection(test_client: httpx.AsyncClient):
+    validators = await collection_validators(User, users.c.organisation == "Nobody")
+
+    assert validators.last_modified is None
+    assert "Last-Modified" not in validators.headers
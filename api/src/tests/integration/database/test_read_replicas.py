@@ -0,0 +1,150 @@
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from authentication.session_cache import session_cache
+from models import Session, User
+from models._database import database
+from models._replicas import read_from_replica, replica_first
+from tests.replica_stand_in import ReplicaStandIn
+
+
+@pytest.mark.asyncio
+async def test_reads_inside_block_go_to_replica(test_client, replica, create_user):
+    user = await create_user()
+
+    with read_from_replica():
+        assert await User.objects.get_or_none(id=user.id) is None
+    assert await User.objects.get_or_none(id=user.id) is not None
+
+
+@pytest.mark.asyncio
+async def test_replica_first_falls_back_to_primary_on_miss(test_client, replica, create_user):
+    user = await create_user()
+
+    found = await replica_first(lambda: User.objects.get_or_none(id=user.id))
+
+    assert found is not None and found.id == user.id
+
+
+@pytest.mark.asyncio
+async def test_reads_after_a_write_stay_on_primary(test_client, replica, create_user):
+    with read_from_replica():
+        user = await create_user()
+        assert await User.objects.get_or_none(id=user.id) is not None
+
+    # The write went to the primary only
+    with read_from_replica():
+        assert await User.objects.get_or_none(id=user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_transactions_stay_on_primary(test_client, replica, create_user):
+    user = await create_user()
+
+    with read_from_replica():
+        async with database.transaction():
+            assert await User.objects.get_or_none(id=user.id) is not None
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_is_not_read_from(test_client, replica, create_user):
+    user = await create_user()
+
+    replica.reported_lag = database.replicas.max_lag + 1
+    await database.replicas.check()
+    assert not replica.available
+    with read_from_replica():
+        assert await User.objects.get_or_none(id=user.id) is not None
+
+    replica.reported_lag = 0
+    await database.replicas.check()
+    assert replica.available
+    with read_from_replica():
+        assert await User.objects.get_or_none(id=user.id) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_lag_check_takes_replica_out_of_rotation(test_client, replica):
+    replica.failing = True
+    await database.replicas.check()
+
+    assert not replica.available
+    assert replica.lag is None
+
+
+@pytest.mark.asyncio
+async def test_unreachable_replica_falls_back_to_primary(test_client, tmp_path, create_user):
+    unreachable = ReplicaStandIn(tmp_path / "missing" / "replica.sqlite")
+    await unreachable.connect()
+    database.replicas.replicas.append(unreachable)
+    try:
+        user = await create_user()
+        with read_from_replica():
+            assert await User.objects.get_or_none(id=user.id) is not None
+        assert not unreachable.available
+    finally:
+        database.replicas.replicas.remove(unreachable)
+        await unreachable.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_login_and_session_lookup_with_lagging_replica(
+    test_client: httpx.AsyncClient, replica
+):
+    email_address = f"{uuid4().hex}@example.com"
+    await User.objects.create(
+        id=uuid4(),
+        first_name="Rep",
+        last_name="Lica",
+        email_address=email_address,
+        password=await User.generate_password_hash("Password123!"),
+        is_verified=True,
+    )
+
+    response = await test_client.post(
+        "/auth/login/", json={"email_address": email_address, "password": "Password123!"}
+    )
+    assert response.status_code == 200
+
+    # The new session is only on the primary, which sessions are read from
+    response = await test_client.post("/auth/logout/")
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_revoked_session_is_not_read_from_lagging_replica(
+    test_client: httpx.AsyncClient, replica
+):
+    email_address = f"{uuid4().hex}@example.com"
+    user = await User.objects.create(
+        id=uuid4(),
+        first_name="Rep",
+        last_name="Lica",
+        email_address=email_address,
+        password=await User.generate_password_hash("Password123!"),
+        is_verified=True,
+    )
+    response = await test_client.post(
+        "/auth/login/", json={"email_address": email_address, "password": "Password123!"}
+    )
+    assert response.status_code == 200
+
+    # The replica has the session while it was still active
+    for table, where in (
+        (User.ormar_config.table, User.ormar_config.table.c.id == user.id),
+        (Session.ormar_config.table, Session.ormar_config.table.c.user == user.id),
+    ):
+        async with database.engine.connect() as conn:
+            rows = (await conn.execute(table.select().where(where))).mappings().all()
+        async with replica.database.engine.begin() as conn:
+            await conn.execute(table.insert(), [dict(row) for row in rows])
+
+    # Revoked by another worker, so not dropped from this worker's cache
+    session = await Session.objects.get(user=user.id)
+    await session.revoke()
+    session_cache.clear()
+
+    response = await test_client.get("/auth/me/")
+    assert response.status_code == 401
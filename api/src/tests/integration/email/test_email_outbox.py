@@ -0,0 +1,101 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from common.email_outbox import email_outbox
+from config import Config
+from models import OutboxEmail
+from tests.smtp_stand_in import SMTPStandIn
+
+
+@pytest.mark.asyncio
+async def test_outbox_sends_queued_emails_over_one_connection(
+    test_client, smtp_server: SMTPStandIn
+):
+    for i in range(3):
+        await email_outbox.enqueue(f"user{i}@example.test", "Hello", "<p>Hi</p>")
+
+    await email_outbox.drain()
+
+    assert sorted(message["To"] for message in smtp_server.messages) == [
+        "user0@example.test",
+        "user1@example.test",
+        "user2@example.test",
+    ]
+    assert await OutboxEmail.objects.filter(status="sent").count() == 3
+
+    # The connection is kept open and reused for later emails
+    await email_outbox.enqueue("user3@example.test", "Hello", "<p>Hi</p>")
+    await email_outbox.drain()
+    assert len(smtp_server.messages) == 4
+    assert smtp_server.connections <= Config.SMTP.pool_size
+
+
+@pytest.mark.asyncio
+async def test_outbox_retries_failed_email_with_backoff(
+    test_client, smtp_server: SMTPStandIn, freezer
+):
+    smtp_server.fail_next = 1
+    outbox_email = await email_outbox.enqueue("user@example.test", "Hello", "<p>Hi</p>")
+
+    await email_outbox.drain()
+
+    await outbox_email.load()
+    assert outbox_email.status == "pending"
+    assert outbox_email.attempts == 1
+    assert "451" in outbox_email.last_error
+    assert smtp_server.messages == []
+
+    # Not retried until the backoff has passed
+    assert await email_outbox.drain() == 0
+
+    freezer.tick(timedelta(seconds=Config.EmailOutbox.retry_backoff + 1))
+    await email_outbox.drain()
+
+    await outbox_email.load()
+    assert outbox_email.status == "sent"
+    assert outbox_email.attempts == 2
+    assert len(smtp_server.messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_outbox_gives_up_after_max_attempts(
+    test_client, smtp_server: SMTPStandIn, monkeypatch
+):
+    monkeypatch.setattr(Config.EmailOutbox, "max_attempts", 2)
+    smtp_server.fail_next = 2
+    outbox_email = await email_outbox.enqueue("user@example.test", "Hello", "<p>Hi</p>")
+
+    await email_outbox.drain()
+    # Make the retry due straight away
+    await OutboxEmail.objects.filter(id=outbox_email.id).update(
+        next_attempt_at=datetime.now(UTC) - timedelta(seconds=1)
+    )
+    await email_outbox.drain()
+
+    await outbox_email.load()
+    assert outbox_email.status == "failed"
+    assert outbox_email.attempts == 2
+    assert await email_outbox.drain() == 0
+    assert smtp_server.messages == []
+
+
+@pytest.mark.asyncio
+async def test_outbox_purges_finished_emails_after_retention(
+    test_client, smtp_server: SMTPStandIn, freezer
+):
+    await email_outbox.enqueue("sent@example.test", "Hello", "<p>Hi</p>")
+    await email_outbox.drain()
+
+    # Kept until the retention period has passed
+    assert await email_outbox.purge() == 0
+
+    # A sent email is dated by the end of its send timeout
+    freezer.tick(
+        timedelta(days=Config.EmailOutbox.retention_days, seconds=Config.EmailOutbox.send_timeout)
+    )
+    freezer.tick(timedelta(seconds=1))
+    pending = await email_outbox.enqueue("pending@example.test", "Hello", "<p>Hi</p>")
+
+    assert await email_outbox.purge() == 1
+    assert [email.id for email in await OutboxEmail.objects.all()] == [pending.id]
@@ -0,0 +1,39 @@
+import httpx
+import pytest
+
+from config import Config
+
+
+def metrics_auth() -> dict[str, str]:
+    return {"Authorization": f"Bearer {Config.Metrics.token}"}
+
+
+@pytest.mark.asyncio
+async def test_metrics_reports_requests(test_client: httpx.AsyncClient):
+    await test_client.get("/")
+    await test_client.post("/auth/logout/")
+
+    res = await test_client.get("/metrics", headers=metrics_auth())
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'turva_http_requests_total{method="GET",route="/",status="200"}' in res.text
+    assert 'turva_http_requests_total{method="POST",route="/auth/logout/",status="401"}' in res.text
+    assert 'turva_session_auth_total{outcome="missing"}' in res.text
+    assert "turva_http_requests_in_flight 1" in res.text
+    assert "turva_db_pool_checkouts_total" in res.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_requires_token(test_client: httpx.AsyncClient):
+    assert (await test_client.get("/metrics")).status_code == 401
+    res = await test_client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_refused_without_a_token(test_client: httpx.AsyncClient, monkeypatch):
+    monkeypatch.setattr(Config.Metrics, "token", None)
+
+    res = await test_client.get("/metrics", headers={"Authorization": "Bearer None"})
+    assert res.status_code == 401
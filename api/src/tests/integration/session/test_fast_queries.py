@@ -0,0 +1,59 @@
+import pytest
+
+from models import Session, User
+from models.fast_queries import UserRecord, session_by_token_hash, user_by_email
+
+
+@pytest.mark.asyncio
+async def test_session_by_token_hash_returns_session_with_user(test_client, create_user):
+    user = await create_user(first_name="Fast", last_name="Path", is_verified=True)
+    session, token = await Session.create_session(user)
+
+    record = await session_by_token_hash(Session.hash_token(token))
+
+    assert record.id == session.id
+    assert record.is_active is True
+    assert record.expires_at.replace(tzinfo=None) == session.expires_at.replace(tzinfo=None)
+    assert not record.is_expired()
+    assert record.user.id == user.id
+    assert record.user.email_address == user.email_address
+    assert record.user.is_verified is True
+    assert record.user.is_authenticated
+    # The password hash is not needed to authenticate requests
+    assert record.user.password is None
+
+
+@pytest.mark.asyncio
+async def test_session_by_token_hash_misses_unknown_token(test_client):
+    assert await session_by_token_hash(Session.hash_token("unknown")) is None
+
+
+@pytest.mark.asyncio
+async def test_user_by_email_includes_password_hash(test_client, create_user):
+    user = await create_user(first_name="Fast", last_name="Path", is_verified=True)
+
+    record = await user_by_email(user.email_address)
+
+    assert record == UserRecord(
+        id=user.id,
+        first_name="Fast",
+        last_name="Path",
+        email_address=user.email_address,
+        is_verified=True,
+        is_active=True,
+        is_cso=False,
+        password="not-a-real-hash",
+    )
+    assert await user_by_email("nobody@example.com") is None
+
+
+@pytest.mark.asyncio
+async def test_user_record_converts_to_user(test_client, create_user):
+    user = await create_user(first_name="Fast", last_name="Path", is_verified=True)
+
+    converted = (await user_by_email(user.email_address)).to_user()
+
+    assert isinstance(converted, User)
+    assert converted.id == user.id
+    await converted.update(_columns=["first_name"], first_name="Updated")
+    assert (await User.objects.get(id=user.id)).first_name == "Updated"
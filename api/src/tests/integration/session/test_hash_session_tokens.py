@@ -0,0 +1,90 @@
+from datetime import UTC, datetime, timedelta
+from secrets import token_hex
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+
+from commands.hash_session_tokens import hash_tokens
+from config import Config
+from models import Session, User
+from models.fast_queries import session_by_token_hash
+
+
+async def create_legacy_session(user: User) -> tuple[Session, str]:
+    """Creates a session the way it was stored before tokens were hashed."""
+    token = token_hex(32)
+    session = await Session.objects.create(
+        id=uuid4(),
+        user=user,
+        token=token,
+        expires_at=datetime.now(UTC) + timedelta(hours=1),
+    )
+    return session, token
+
+
+@pytest.mark.asyncio
+async def test_legacy_session_is_hashed_when_used(test_client, create_user, set_session_cookie):
+    user = await create_user()
+    session, token = await create_legacy_session(user)
+    set_session_cookie(token)
+
+    res = await test_client.post("/auth/logout/")
+    assert res.status_code == 200
+
+    await session.load()
+    assert session.token is None
+    assert session.token_hash == Session.hash_token(token)
+    assert session.is_active is False
+
+
+@pytest.mark.asyncio
+async def test_legacy_session_authenticates_from_the_row_it_is_found_by(
+    test_client, create_user, set_session_cookie, mock_sender, monkeypatch
+):
+    user = await create_user()
+    session, token = await create_legacy_session(user)
+    set_session_cookie(token)
+    lookup = AsyncMock(wraps=session_by_token_hash)
+    monkeypatch.setattr("authentication.middleware.session_by_token_hash", lookup)
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    # Only the lookup by hash that missed, before the session was found by its plaintext token
+    lookup.assert_awaited_once()
+    await session.load()
+    assert session.token is None
+
+
+@pytest.mark.asyncio
+async def test_legacy_sessions_are_not_looked_up_when_turned_off(
+    test_client, create_user, set_session_cookie, mock_sender, monkeypatch
+):
+    monkeypatch.setattr(Config.Application, "legacy_session_tokens", False)
+    user = await create_user()
+    session, token = await create_legacy_session(user)
+    set_session_cookie(token)
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 401
+
+    await session.load()
+    assert session.token == token
+    assert await Session.get_by_token(token) is None
+
+
+@pytest.mark.asyncio
+async def test_hash_tokens_clears_plaintext_tokens_in_batches(test_client, create_user):
+    user = await create_user()
+    legacy = [await create_legacy_session(user) for _ in range(5)]
+    await Session.create_session(user)
+
+    assert await hash_tokens(batch_size=2) == 5
+
+    for session, token in legacy:
+        await session.load()
+        assert session.token is None
+        assert session.token_hash == Session.hash_token(token)
+        assert await Session.get_by_token(token) is not None
+    assert await Session.objects.filter(token__isnull=False).count() == 0
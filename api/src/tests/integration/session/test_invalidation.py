@@ -0,0 +1,94 @@
+from datetime import datetime
+
+import pytest
+
+from authentication.invalidation import invalidation_feed
+from authentication.revocation import revocation_set
+from models import Session, User
+from models._database import database
+
+
+async def update_elsewhere(model, id, **values):
+    """Updates a row without the model signals, as another worker process would look."""
+    table = model.ormar_config.table
+    async with database.transaction():
+        async with database.connection() as conn:
+            await conn.execute(
+                table.update().where(table.c.id == id).values(**values, updated_date=datetime.now())
+            )
+
+
+@pytest.mark.asyncio
+async def test_session_revoked_by_another_worker_is_dropped_from_cache(
+    test_client, log_in, mock_sender
+):
+    user = await log_in()
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    session = await Session.objects.get(user=user.id)
+    await update_elsewhere(Session, session.id, is_active=False)
+
+    # Still cached until the change is picked up
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    await invalidation_feed.check()
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_user_deactivated_by_another_worker_is_dropped_from_cache(
+    test_client, log_in, mock_sender
+):
+    user = await log_in()
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    await update_elsewhere(User, user.id, is_active=False)
+    await invalidation_feed.check()
+
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_claims_revoked_by_another_worker_are_rejected(
+    test_client, log_in, mock_sender, signed_mode
+):
+    user = await log_in()
+    # Issues claims, which later requests are authenticated from
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    session = await Session.objects.get(user=user.id)
+    await update_elsewhere(Session, session.id, is_active=False)
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    await invalidation_feed.check()
+
+    assert revocation_set.sessions == {session.id}
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_users_reactivated_by_another_worker_are_restored(
+    test_client, log_in, mock_sender, signed_mode
+):
+    user = await log_in()
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 200
+
+    await update_elsewhere(User, user.id, is_active=False)
+    await invalidation_feed.check()
+    assert revocation_set.users == {user.id}
+    res = await test_client.post("/auth/verify-resend/")
+    assert res.status_code == 401
+
+    await update_elsewhere(User, user.id, is_active=True)
+    await invalidation_feed.check()
+    assert revocation_set.users == set()
@@ -5,6 +5,7 @@ import pytest
 
 from config import Config
 from models import Session, User
+from models.session import session_expiry_writer
 
 
 @pytest.mark.asyncio
@@ -24,9 +25,10 @@ async def test_create_session_returns_session_and_token(test_client):
     assert session.id is not None
     assert session.user.id == user.id
 
-    # Token returned and stored on session
+    # Token returned, and only its hash stored on session
     assert isinstance(token, str) and len(token) == 64  # token_hex(32)
-    assert session.token == token
+    assert session.token_hash == Session.hash_token(token)
+    assert session.token is None
 
     # Activity flag default and expiry near configured lifetime
     assert session.is_active is True
@@ -53,6 +55,7 @@ async def test_extend_session_extends_expiry(test_client, freezer):
 
     freezer.move_to("2024-06-01T11:00:00Z")
     await session.extend_session()
+    await session_expiry_writer.flush()
     # Reload to ensure persisted value is checked
     refreshed = await Session.objects.get(id=session.id)
 
@@ -96,3 +99,57 @@ async def test_is_expired_true_when_past(test_client):
     refreshed = await Session.objects.get(id=session.id)
 
     assert refreshed.is_expired() is True
+
+
+@pytest.mark.asyncio
+async def test_extend_session_is_written_in_one_batch(test_client):
+    user = await User.objects.create(
+        id=uuid4(),
+        first_name="Batch",
+        last_name="User",
+        email_address="batch.user@example.com",
+        password=await User.generate_password_hash("Password123!"),
+        is_verified=True,
+    )
+    first, _ = await Session.create_session(user)
+    second, _ = await Session.create_session(user)
+    soon = datetime.now(UTC) + timedelta(seconds=10)
+    await first.update(expires_at=soon)
+    await second.update(expires_at=soon)
+
+    await first.extend_session()
+    await second.extend_session()
+    # Extending the same session again is coalesced
+    await first.extend_session()
+    assert session_expiry_writer.pending == 2
+
+    # Nothing is written until the buffer is flushed
+    assert (await Session.objects.get(id=first.id)).expires_at.replace(tzinfo=UTC) == soon
+
+    assert await session_expiry_writer.flush() == 2
+    assert session_expiry_writer.pending == 0
+    for session in (first, second):
+        refreshed = await Session.objects.get(id=session.id)
+        assert refreshed.expires_at.replace(tzinfo=UTC) == session.expires_at
+
+
+@pytest.mark.asyncio
+async def test_needs_extension_uses_refresh_threshold(test_client, freezer):
+    user = await User.objects.create(
+        id=uuid4(),
+        first_name="Slide",
+        last_name="User",
+        email_address="slide.user@example.com",
+        password=await User.generate_password_hash("Password123!"),
+        is_verified=True,
+    )
+    freezer.move_to("2024-06-01T10:00:00Z")
+    session, _ = await Session.create_session(user)
+    lifetime = Config.Application.session_cookie_lifetime
+    threshold = Config.Application.session_refresh_threshold
+
+    freezer.tick(lifetime * (1 - threshold) - 1)
+    assert session.needs_extension() is False
+
+    freezer.tick(2)
+    assert session.needs_extension() is True
@@ -0,0 +1,69 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from models import Session
+from models._database import database
+from models.session import session_reaper
+
+
+@pytest.mark.asyncio
+async def test_reap_deletes_expired_sessions(test_client, create_user):
+    user = await create_user()
+    live, _ = await Session.create_session(user)
+    expired, _ = await Session.create_session(user)
+    await expired.update(expires_at=datetime.now(UTC) - timedelta(seconds=1))
+
+    assert await session_reaper.reap() == 1
+
+    remaining = await Session.objects.all()
+    assert [session.id for session in remaining] == [live.id]
+
+
+@pytest.mark.asyncio
+async def test_reap_deletes_revoked_sessions(test_client, create_user):
+    user = await create_user()
+    live, _ = await Session.create_session(user)
+    revoked, _ = await Session.create_session(user)
+    await revoked.revoke()
+
+    assert await session_reaper.reap() == 1
+
+    remaining = await Session.objects.all()
+    assert [session.id for session in remaining] == [live.id]
+
+
+@pytest.mark.asyncio
+async def test_reap_keeps_revoked_sessions_for_retention_period(
+    test_client, monkeypatch, create_user
+):
+    monkeypatch.setattr(session_reaper, "revoked_retention", 300)
+    user = await create_user()
+    revoked, _ = await Session.create_session(user)
+    await revoked.revoke()
+
+    assert await session_reaper.reap() == 0
+
+    # Revoked longer ago than the retention period
+    sessions = Session.ormar_config.table
+    async with database.transaction():
+        async with database.connection() as conn:
+            await conn.execute(
+                sessions.update()
+                .where(sessions.c.id == revoked.id)
+                .values(updated_date=datetime.now() - timedelta(seconds=301))
+            )
+    assert await session_reaper.reap() == 1
+
+
+@pytest.mark.asyncio
+async def test_reap_deletes_in_batches(test_client, monkeypatch, create_user):
+    user = await create_user()
+    for _ in range(5):
+        session, _ = await Session.create_session(user)
+        await session.update(expires_at=datetime.now(UTC) - timedelta(seconds=1))
+
+    monkeypatch.setattr(session_reaper, "batch_size", 2)
+
+    assert await session_reaper.reap() == 5
+    assert await Session.objects.count() == 0
@@ -0,0 +1,28 @@
+from pathlib import Path
+
+from models._database import metadata
+from models._replicas import Replica
+
+
+class ReplicaStandIn(Replica):
+    """
+    A read replica for tests: a second local SQLite database with the same
+    tables. Nothing is replicated to it, so it behaves like a replica that
+    has not caught up with the primary yet.
+
+    Lag checks report `reported_lag` seconds, and fail while `failing` is set.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(f"sqlite+aiosqlite:///{path}")
+        self.reported_lag = 0.0
+        self.failing = False
+
+    async def create_tables(self):
+        async with self.database.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+    async def measure_lag(self) -> float:
+        if self.failing:
+            raise OSError("replica unreachable")
+        return self.reported_lag
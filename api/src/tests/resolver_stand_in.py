@@ -0,0 +1,29 @@
+import asyncio
+
+import dns.exception
+
+from common.email_deliverability import DomainResolver
+
+
+class ResolverStandIn(DomainResolver):
+    """
+    An offline resolver for tests. Every domain receives email except
+    those in `undeliverable`, and domains in `failing` time out.
+
+    `lookups` records every domain looked up, and each lookup takes
+    `delay` seconds.
+    """
+
+    def __init__(self, ttl: float = 3600):
+        self.ttl = ttl
+        self.delay = 0.0
+        self.undeliverable: set[str] = set()
+        self.failing: set[str] = set()
+        self.lookups: list[str] = []
+
+    async def lookup(self, domain: str) -> tuple[bool, float]:
+        self.lookups.append(domain)
+        await asyncio.sleep(self.delay)
+        if domain in self.failing:
+            raise dns.exception.Timeout()
+        return domain not in self.undeliverable, self.ttl
@@ -0,0 +1,66 @@
+import asyncio
+import email
+import email.message
+import email.policy
+
+
+class SMTPStandIn:
+    """
+    A minimal local SMTP server for tests, which accepts every message
+    and keeps it in `messages`.
+
+    `connections` counts the connections made to it, and
+    `fail_next` makes it reject that many messages with a 451 error.
+    """
+
+    def __init__(self):
+        self.messages: list[email.message.EmailMessage] = []
+        self.connections = 0
+        self.fail_next = 0
+        self.port = 0
+        self._server: asyncio.Server | None = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        writer.write(b"220 localhost SMTP stand-in\r\n")
+
+        try:
+            while line := await reader.readline():
+                command = line.decode().strip().split(" ", 1)[0].upper()
+
+                if command in ("EHLO", "HELO"):
+                    writer.write(b"250 localhost\r\n")
+                elif command == "DATA":
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    await writer.drain()
+                    data = await reader.readuntil(b"\r\n.\r\n")
+                    if self.fail_next:
+                        self.fail_next -= 1
+                        writer.write(b"451 Try again later\r\n")
+                    else:
+                        self.messages.append(
+                            email.message_from_bytes(data[:-5], policy=email.policy.default)
+                        )
+                        writer.write(b"250 OK\r\n")
+                elif command == "QUIT":
+                    writer.write(b"221 Bye\r\n")
+                    await writer.drain()
+                    break
+                else:
+                    # MAIL, RCPT, RSET and NOOP
+                    writer.write(b"250 OK\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+
+from authentication.exceptions import PasswordHashingUnavailableException
+from authentication.password_hasher import PasswordHashingService
+
+
+@pytest.fixture
+def service():
+    service = PasswordHashingService(workers=1, max_pending=1)
+    yield service
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_in_worker_process(service):
+    password_hash = await service.hash("SecurePassword123!")
+
+    assert password_hash.startswith("$argon2")
+    assert await service.verify(password_hash, "SecurePassword123!") is True
+    assert await service.verify(password_hash, "WrongPassword!") is False
+
+    stats = service.stats()
+    assert stats["operations"] == 3
+    assert stats["queue_depth"] == 0
+    assert stats["seconds_total"] >= stats["seconds_max"] > 0
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full(service):
+    results = await asyncio.gather(
+        service.hash("first"), service.hash("second"), return_exceptions=True
+    )
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], PasswordHashingUnavailableException)
+    assert results[1].status_code == 503
+    assert service.stats()["rejections"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_operation_is_pending_until_it_finishes(service):
+    task = asyncio.create_task(service._run("hash", time.sleep, 1))
+    # Let the pool start, and hand the job to its worker
+    await asyncio.sleep(0.2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The worker is still busy, so there is no room for another operation
+    assert service.stats()["queue_depth"] == 1
+    with pytest.raises(PasswordHashingUnavailableException):
+        await service.hash("next")
+
+    while service.stats()["queue_depth"]:
+        await asyncio.sleep(0.05)
+    assert service.stats()["operations"] == 1
+    assert service.stats()["seconds_max"] >= 1
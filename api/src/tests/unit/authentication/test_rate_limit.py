@@ -0,0 +1,58 @@
+import pytest
+
+from authentication.rate_limit import InMemoryRateLimitStore
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_capacity_then_rejects():
+    store = InMemoryRateLimitStore()
+
+    for _ in range(3):
+        assert await store.consume([("key", 3)], period=60) == 0
+
+    # One token refills every 20 seconds
+    assert await store.consume([("key", 3)], period=60) == pytest.approx(20, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time(freezer):
+    freezer.move_to("2024-06-01T10:00:00Z")
+    store = InMemoryRateLimitStore()
+    for _ in range(3):
+        await store.consume([("key", 3)], period=60)
+
+    freezer.tick(20)
+
+    assert await store.consume([("key", 3)], period=60) == 0
+    assert await store.consume([("key", 3)], period=60) > 0
+
+
+@pytest.mark.asyncio
+async def test_buckets_are_independent_per_key():
+    store = InMemoryRateLimitStore()
+
+    assert await store.consume([("first", 1)], period=60) == 0
+    assert await store.consume([("second", 1)], period=60) == 0
+    assert await store.consume([("first", 1)], period=60) > 0
+
+
+@pytest.mark.asyncio
+async def test_idle_buckets_are_swept(freezer):
+    freezer.move_to("2024-06-01T10:00:00Z")
+    store = InMemoryRateLimitStore(shards=1, sweep_every=2)
+    await store.consume([("idle", 1)], period=60)
+
+    freezer.tick(61)
+    await store.consume([("active", 1)], period=60)
+
+    assert len(store) == 1
+
+
+@pytest.mark.asyncio
+async def test_rejected_request_takes_no_tokens():
+    store = InMemoryRateLimitStore()
+    assert await store.consume([("email", 1)], period=60) == 0
+
+    # The email bucket is empty, so the IP bucket keeps its token
+    assert await store.consume([("ip", 1), ("email", 1)], period=60) > 0
+    assert await store.consume([("ip", 1)], period=60) == 0
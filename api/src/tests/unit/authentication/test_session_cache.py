@@ -0,0 +1,88 @@
+from datetime import UTC, datetime, timedelta
+from uuid import UUID, uuid4
+
+from authentication.session_cache import SessionCache
+from models import Session, User
+
+
+def make_session(user_id: UUID | None = None) -> Session:
+    user = User(
+        id=user_id or uuid4(),
+        first_name="Cache",
+        last_name="User",
+        email_address="cache.user@example.com",
+        password="not-a-real-hash",
+    )
+    return Session(
+        id=uuid4(),
+        user=user,
+        token_hash=Session.hash_token(uuid4().hex),
+        expires_at=datetime.now(UTC) + timedelta(hours=1),
+    )
+
+
+def test_get_miss_then_hit():
+    cache = SessionCache(max_size=10, ttl=60)
+    session = make_session()
+
+    assert cache.get(session.token_hash) is None
+    cache.set(session.token_hash, session)
+    assert cache.get(session.token_hash) is session
+
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SessionCache(max_size=2, ttl=60)
+    first, second, third = make_session(), make_session(), make_session()
+
+    cache.set(first.token_hash, first)
+    cache.set(second.token_hash, second)
+    # Touch the first entry so the second becomes least recently used
+    assert cache.get(first.token_hash) is first
+    cache.set(third.token_hash, third)
+
+    assert cache.get(second.token_hash) is None
+    assert cache.get(first.token_hash) is first
+    assert cache.get(third.token_hash) is third
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl(freezer):
+    freezer.move_to("2024-06-01T10:00:00Z")
+    cache = SessionCache(max_size=10, ttl=30)
+    session = make_session()
+    cache.set(session.token_hash, session)
+
+    freezer.move_to("2024-06-01T10:00:31Z")
+
+    assert cache.get(session.token_hash) is None
+    assert cache.evictions == 1
+    assert len(cache) == 0
+
+
+def test_invalidate_user_removes_all_their_sessions():
+    cache = SessionCache(max_size=10, ttl=60)
+    user_id = uuid4()
+    first, second = make_session(user_id), make_session(user_id)
+    other = make_session()
+    for session in (first, second, other):
+        cache.set(session.token_hash, session)
+
+    cache.invalidate_user(user_id)
+
+    assert cache.get(first.token_hash) is None
+    assert cache.get(second.token_hash) is None
+    assert cache.get(other.token_hash) is other
+
+
+def test_invalidate_token():
+    cache = SessionCache(max_size=10, ttl=60)
+    session = make_session()
+    cache.set(session.token_hash, session)
+
+    cache.invalidate_token(session.token_hash)
+
+    assert cache.get(session.token_hash) is None
+    assert len(cache) == 0
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from authentication.session_middleware import TrackedSession, TurvaSessionMiddleware
+
+MAX_AGE = 3600
+
+
+async def read(request: Request) -> JSONResponse:
+    return JSONResponse(dict(request.session))
+
+
+async def write(request: Request) -> JSONResponse:
+    request.session["value"] = request.query_params["value"]
+    return JSONResponse(dict(request.session))
+
+
+async def clear(request: Request) -> JSONResponse:
+    request.session.clear()
+    return JSONResponse({})
+
+
+def make_client() -> httpx.AsyncClient:
+    app = Starlette(
+        routes=[Route("/read", read), Route("/write", write), Route("/clear", clear)],
+    )
+    app.add_middleware(
+        TurvaSessionMiddleware, secret_key="secret", max_age=MAX_AGE, refresh_threshold=0.5
+    )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://testserver")
+
+
+def test_tracked_session_records_changes():
+    session = TrackedSession({"a": 1})
+    assert session.modified is False
+
+    session["a"] = 1
+    session.pop("missing", None)
+    session.update(a=1)
+    assert session.modified is False
+
+    session["a"] = 2
+    assert session.modified is True
+
+
+@pytest.mark.asyncio
+async def test_cookie_is_only_sent_when_session_changes():
+    async with make_client() as client:
+        res = await client.get("/write", params={"value": "1"})
+        assert "set-cookie" in res.headers
+
+        res = await client.get("/read")
+        assert res.json() == {"value": "1"}
+        assert "set-cookie" not in res.headers
+
+        # Writing the same value is not a change
+        res = await client.get("/write", params={"value": "1"})
+        assert "set-cookie" not in res.headers
+
+        res = await client.get("/write", params={"value": "2"})
+        assert "set-cookie" in res.headers
+
+
+@pytest.mark.asyncio
+async def test_cookie_is_refreshed_close_to_expiry(freezer):
+    async with make_client() as client:
+        await client.get("/write", params={"value": "1"})
+
+        freezer.tick(timedelta(seconds=MAX_AGE * 0.4))
+        res = await client.get("/read")
+        assert "set-cookie" not in res.headers
+
+        freezer.tick(timedelta(seconds=MAX_AGE * 0.2))
+        res = await client.get("/read")
+        assert "set-cookie" in res.headers
+        assert f"Max-Age={MAX_AGE}" in res.headers["set-cookie"]
+
+        # The refreshed cookie is good for another full lifetime
+        freezer.tick(timedelta(seconds=MAX_AGE * 0.9))
+        res = await client.get("/read")
+        assert res.json() == {"value": "1"}
+
+
+@pytest.mark.asyncio
+async def test_clearing_the_session_removes_the_cookie():
+    async with make_client() as client:
+        await client.get("/write", params={"value": "1"})
+
+        res = await client.get("/clear")
+        assert "expires=Thu, 01 Jan 1970" in res.headers["set-cookie"]
+
+        res = await client.get("/clear")
+        assert "set-cookie" not in res.headers
+
+
+@pytest.mark.asyncio
+async def test_tampered_cookie_is_ignored():
+    async with make_client() as client:
+        client.cookies.set("session", "not-signed")
+
+        res = await client.get("/read")
+
+        assert res.json() == {}
+        assert "set-cookie" not in res.headers
@@ -0,0 +1,27 @@
+from commands.calibrate_argon2 import MIN_MEMORY_COST, calibrate
+
+
+def fake_measure(time_cost: int, memory_cost: int, parallelism: int) -> float:
+    # 1ms per MiB per pass
+    return time_cost * memory_cost / 1024 / 1000
+
+
+def test_calibrate_adds_passes_within_budget():
+    time_cost, memory_cost = calibrate(0.25, 64 * 1024, 4, measure=fake_measure)
+
+    assert memory_cost == 64 * 1024
+    assert time_cost == 3  # 192ms; a fourth pass would take 256ms
+
+
+def test_calibrate_reduces_memory_before_passes():
+    time_cost, memory_cost = calibrate(0.1, 256 * 1024, 4, measure=fake_measure)
+
+    assert memory_cost == 64 * 1024
+    assert time_cost == 1
+
+
+def test_calibrate_does_not_go_below_minimum_memory():
+    time_cost, memory_cost = calibrate(0.001, 256 * 1024, 4, measure=fake_measure)
+
+    assert memory_cost == MIN_MEMORY_COST
+    assert time_cost == 1
@@ -0,0 +1,124 @@
+import zlib
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from common.compression import CompressionMiddleware, negotiate, uncompressed
+
+BODY = "hazard log entry\n" * 200
+
+
+async def large(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(BODY)
+
+
+async def small(request: Request) -> PlainTextResponse:
+    return PlainTextResponse("ok")
+
+
+@uncompressed
+async def opted_out(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(BODY)
+
+
+async def chunks():
+    for line in BODY.splitlines(keepends=True)[:3]:
+        yield line
+
+
+async def stream(request: Request) -> StreamingResponse:
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+app = Starlette(
+    routes=[
+        Route("/large", large),
+        Route("/small", small),
+        Route("/opted-out", opted_out),
+        Route("/stream", stream),
+    ]
+)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+
+def make_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://testserver")
+
+
+@pytest.mark.parametrize(
+    "accept_encoding,expected",
+    [
+        ("gzip, deflate, br", "br"),
+        ("gzip;q=1.0, br;q=0.5", "gzip"),
+        ("br;q=0, gzip", "gzip"),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding, ["br", "gzip"]) == expected
+
+
+@pytest.mark.asyncio
+async def test_compresses_large_responses():
+    async with make_client() as client:
+        response = await client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) < len(BODY)
+    assert response.text == BODY
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/small", "/opted-out"])
+async def test_leaves_small_and_opted_out_responses(path):
+    async with make_client() as client:
+        response = await client.get(path, headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_leaves_responses_when_client_does_not_accept_compression():
+    async with make_client() as client:
+        response = await client.get("/large", headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in response.headers
+    assert response.text == BODY
+
+
+@pytest.mark.asyncio
+async def test_compresses_streams_a_chunk_at_a_time():
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        # Streams without also listening for the client disconnecting
+        "asgi": {"spec_version": "2.4"},
+        "method": "GET",
+        "path": "/stream",
+        "headers": [(b"accept-encoding", b"gzip")],
+        "query_string": b"",
+    }
+    await app(scope, receive, send)
+
+    start, *bodies = messages
+    assert (b"content-encoding", b"gzip") in start["headers"]
+
+    # Each chunk can be decompressed as soon as it arrives
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    lines = BODY.splitlines(keepends=True)
+    for line, body in zip(lines[:3], bodies[:3], strict=True):
+        assert decompressor.decompress(body["body"]) == line.encode()
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from common.email_deliverability import DeliverabilityChecker
+from config import Config
+from tests.resolver_stand_in import ResolverStandIn
+
+
+@pytest.mark.asyncio
+async def test_answers_are_cached_per_domain():
+    resolver = ResolverStandIn()
+    checker = DeliverabilityChecker(resolver, max_size=10)
+
+    assert await checker.is_deliverable("nhs.net") is True
+    assert await checker.is_deliverable("NHS.net") is True
+
+    assert resolver.lookups == ["nhs.net"]
+    assert checker.stats() == {"size": 1, "hits": 1, "misses": 1, "failures": 0}
+
+
+@pytest.mark.asyncio
+async def test_undeliverable_domains_are_cached():
+    resolver = ResolverStandIn()
+    resolver.undeliverable.add("nowhere.example")
+    checker = DeliverabilityChecker(resolver, max_size=10)
+
+    assert await checker.is_deliverable("nowhere.example") is False
+    assert await checker.is_deliverable("nowhere.example") is False
+    assert resolver.lookups == ["nowhere.example"]
+
+
+@pytest.mark.asyncio
+async def test_expired_answer_is_used_while_it_is_refreshed():
+    resolver = ResolverStandIn(ttl=0)
+    checker = DeliverabilityChecker(resolver, max_size=10)
+    await checker.is_deliverable("nhs.net")
+
+    resolver.undeliverable.add("nhs.net")
+    # The expired answer is returned straight away, and a lookup is started
+    assert await checker.is_deliverable("nhs.net") is True
+    await asyncio.sleep(0.01)
+
+    assert resolver.lookups == ["nhs.net", "nhs.net"]
+    assert await checker.is_deliverable("nhs.net") is False
+
+
+@pytest.mark.asyncio
+async def test_concurrent_checks_share_one_lookup():
+    resolver = ResolverStandIn()
+    resolver.delay = 0.01
+    checker = DeliverabilityChecker(resolver, max_size=10)
+
+    results = await asyncio.gather(*(checker.is_deliverable("nhs.net") for _ in range(5)))
+
+    assert results == [True] * 5
+    assert resolver.lookups == ["nhs.net"]
+
+
+@pytest.mark.asyncio
+async def test_failed_lookups_allow_the_domain_and_are_not_cached():
+    resolver = ResolverStandIn()
+    resolver.failing.add("flaky.example")
+    checker = DeliverabilityChecker(resolver, max_size=10)
+
+    assert await checker.is_deliverable("flaky.example") is True
+    assert await checker.is_deliverable("flaky.example") is True
+
+    assert resolver.lookups == ["flaky.example", "flaky.example"]
+    assert checker.stats()["failures"] == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_lookups_time_out(monkeypatch):
+    monkeypatch.setattr(Config.EmailDeliverability, "timeout", 0.01)
+    resolver = ResolverStandIn()
+    resolver.undeliverable.add("slow.example")
+    resolver.delay = 1
+    checker = DeliverabilityChecker(resolver, max_size=10)
+
+    assert await checker.is_deliverable("slow.example") is True
+    assert checker.stats()["failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_domain_is_evicted():
+    resolver = ResolverStandIn()
+    checker = DeliverabilityChecker(resolver, max_size=2)
+
+    for domain in ("a.example", "b.example", "a.example", "c.example", "a.example"):
+        await checker.is_deliverable(domain)
+
+    assert resolver.lookups == ["a.example", "b.example", "c.example"]
+    assert checker.stats()["size"] == 2
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from common.loop_monitor import LoopMonitor
+
+
+def hash_passwords_on_the_loop():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_records_scheduling_lag():
+    monitor = LoopMonitor(interval=0.01, detect_blocking=False, blocking_threshold=0.1)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+
+    assert monitor.lag_seconds_max >= 0.05
+    assert monitor.blocking_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_logs_stack_of_blocking_call(caplog):
+    monitor = LoopMonitor(interval=0.01, detect_blocking=True, blocking_threshold=0.05)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    with caplog.at_level(logging.WARNING):
+        hash_passwords_on_the_loop()
+        await asyncio.sleep(0.02)
+    await monitor.stop()
+
+    assert monitor.blocking_calls == 1
+    assert "event loop has been blocked" in caplog.text
+    assert "hash_passwords_on_the_loop" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_does_not_report_an_idle_loop(caplog):
+    monitor = LoopMonitor(interval=0.01, detect_blocking=True, blocking_threshold=0.1)
+    monitor.start()
+    with caplog.at_level(logging.WARNING):
+        await asyncio.sleep(0.2)
+    await monitor.stop()
+
+    assert monitor.blocking_calls == 0
+    assert caplog.text == ""
@@ -0,0 +1,70 @@
+import json
+import os
+
+import pytest
+
+from common.metrics import MetricsRegistry, MetricsWriter, merge, render
+
+
+def test_renders_histograms_cumulatively():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ["route"], buckets=[0.1, 1.0])
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value, "/a")
+
+    text = render(merge([registry.snapshot()], running=lambda pid: True))
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/a"} 4' in text
+    assert 'latency_seconds_sum{route="/a"} 6.05' in text
+    assert "# TYPE latency_seconds histogram" in text
+
+
+def test_merges_workers_and_drops_gauges_of_exited_workers():
+    snapshots = []
+    for pid in (1, 2):
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests", ["status"]).inc("200", amount=pid)
+        registry.gauge("in_flight", "In flight").set(pid)
+        registry.histogram("latency_seconds", "Latency", buckets=[1.0]).observe(0.5)
+        snapshot = registry.snapshot()
+        snapshot["pid"] = pid
+        snapshots.append(snapshot)
+
+    text = render(merge(snapshots, running=lambda pid: pid == 1))
+
+    assert 'requests_total{status="200"} 3' in text
+    assert "in_flight 1" in text
+    assert "latency_seconds_count 2" in text
+
+
+def test_collects_component_stats():
+    registry = MetricsRegistry()
+    registry.collect(
+        "cache", "Cache", lambda: {"size": 3, "hits": 5, "wait_max": 1.0}, gauges={"size"}
+    )
+
+    text = render(merge([registry.snapshot()], running=lambda pid: True))
+
+    assert "# TYPE cache_size gauge\ncache_size 3" in text
+    assert "# TYPE cache_hits_total counter\ncache_hits_total 5" in text
+    assert "wait_max" not in text
+
+
+@pytest.mark.asyncio
+async def test_writer_adds_up_other_workers(tmp_path):
+    other = MetricsRegistry()
+    other.counter("requests_total", "Requests").inc(amount=2)
+    snapshot = other.snapshot()
+    snapshot["pid"] = os.getpid() + 1_000_000
+    (tmp_path / "other.json").write_text(json.dumps(snapshot))
+
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests").inc()
+    writer = MetricsWriter(registry, directory=str(tmp_path), interval=60)
+    await writer.write()
+
+    assert (tmp_path / f"{os.getpid()}.json").exists()
+    assert "requests_total 3" in render(await writer.read())
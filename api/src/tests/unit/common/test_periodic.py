@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+import pytest
+
+from common.periodic import PeriodicTask
+
+
+class FlakyTask(PeriodicTask):
+    error_message = "[test] tick failed"
+
+    def __init__(self, interval: float):
+        super().__init__(interval)
+        self.ticks = 0
+
+    async def tick(self):
+        self.ticks += 1
+        if self.ticks == 1:
+            raise RuntimeError("first tick fails")
+
+
+@pytest.mark.asyncio
+async def test_keeps_ticking_after_an_error(caplog):
+    task = FlakyTask(interval=0.01)
+    with caplog.at_level(logging.ERROR):
+        task.start()
+        await asyncio.sleep(0.05)
+        await task.stop()
+
+    assert task.ticks > 1
+    assert "[test] tick failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_stop_ends_the_task_and_allows_starting_again():
+    task = FlakyTask(interval=0.01)
+    task.start()
+    task.start()
+    first = task._task
+    await task.stop()
+
+    assert first is not None and first.cancelled()
+    assert task._task is None
+    await task.stop()
+
+    task.start()
+    assert task._task is not None
+    await task.stop()
@@ -0,0 +1,83 @@
+import logging
+import re
+
+import httpx
+import pytest
+import sqlalchemy
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from common.query_timing import QueryTimingMiddleware
+
+engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+
+
+async def queries(request: Request) -> JSONResponse:
+    async with engine.connect() as conn:
+        for value in range(int(request.query_params["count"])):
+            await conn.execute(sqlalchemy.text("SELECT :value"), {"value": value})
+    return JSONResponse({})
+
+
+def make_client(
+    server_timing: bool = True, repeated_query_threshold: int | None = None
+) -> httpx.AsyncClient:
+    app = Starlette(routes=[Route("/queries", queries)])
+    app.add_middleware(
+        QueryTimingMiddleware,
+        server_timing=server_timing,
+        repeated_query_threshold=repeated_query_threshold,
+    )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://testserver")
+
+
+@pytest.mark.asyncio
+async def test_server_timing_reports_queries(caplog):
+    caplog.set_level(logging.INFO)
+    async with make_client() as client:
+        response = await client.get("/queries", params={"count": 3})
+
+    header = response.headers["Server-Timing"]
+    assert re.fullmatch(r'db;dur=[\d.]+;desc="3 queries", db-slowest;dur=[\d.]+', header)
+
+    [record] = [record for record in caplog.records if record.message.startswith("[db]")]
+    assert record.db_queries == 3
+    assert record.db_slowest_statement == "SELECT ?"
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header_can_be_turned_off(caplog):
+    caplog.set_level(logging.INFO)
+    async with make_client(server_timing=False) as client:
+        response = await client.get("/queries", params={"count": 3})
+
+    assert "Server-Timing" not in response.headers
+    # Still logged
+    [record] = [record for record in caplog.records if record.message.startswith("[db]")]
+    assert record.db_queries == 3
+
+
+@pytest.mark.asyncio
+async def test_requests_without_queries_are_not_logged(caplog):
+    caplog.set_level(logging.INFO)
+    async with make_client() as client:
+        response = await client.get("/queries", params={"count": 0})
+
+    assert response.headers["Server-Timing"] == 'db;dur=0.0;desc="0 queries"'
+    assert not [record for record in caplog.records if record.message.startswith("[db]")]
+
+
+@pytest.mark.asyncio
+async def test_repeated_statements_are_flagged(caplog):
+    async with make_client(repeated_query_threshold=5) as client:
+        await client.get("/queries", params={"count": 4})
+        assert not [record for record in caplog.records if record.levelno == logging.WARNING]
+
+        await client.get("/queries", params={"count": 5})
+
+    [warning] = [record for record in caplog.records if record.levelno == logging.WARNING]
+    assert "possible N+1 queries in GET /queries" in warning.message
+    assert "ran 5 times: SELECT ?" in warning.message
@@ -0,0 +1,45 @@
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from common.responses import FastJSONResponse
+
+
+@dataclass
+class Row:
+    id: object
+    created_at: datetime
+
+
+def test_matches_the_default_encoding():
+    content = {
+        "id": uuid4(),
+        "created_at": datetime(2025, 1, 2, 3, 4, 5, 678, tzinfo=UTC),
+        "tags": ["a", "b"],
+        "count": 3,
+        "ratio": 0.5,
+        "missing": None,
+    }
+
+    expected = json.loads(JSONResponse(jsonable_encoder(content)).body)
+    assert json.loads(FastJSONResponse(content).body) == expected
+
+
+def test_serializes_dataclasses_natively():
+    row = Row(id=uuid4(), created_at=datetime(2025, 1, 2, tzinfo=UTC))
+
+    assert json.loads(FastJSONResponse([row]).body) == [
+        {"id": str(row.id), "created_at": "2025-01-02T00:00:00+00:00"}
+    ]
+
+
+def test_falls_back_to_jsonable_encoder():
+    assert json.loads(FastJSONResponse({"amount": Decimal("1.5"), "ids": {1}}).body) == {
+        "amount": 1.5,
+        "ids": [1],
+    }
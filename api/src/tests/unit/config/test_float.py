@@ -0,0 +1,62 @@
+import os
+from importlib import reload
+
+import pytest
+
+import config
+
+
+class EnvironmentContextManager:
+    def __init__(self):
+        self._env = None
+
+    def __enter__(self):
+        reload(config)
+        self._env = os.environ.copy()
+        return self
+
+    def __exit__(self, *args):
+        os.environ.clear()
+        os.environ.update(self._env)
+
+
+def test_config_float_required_pass():
+    envvar_name = "TEST_FLOAT_REQUIRED"
+    envvar_value = 4.2
+
+    with EnvironmentContextManager():
+        os.environ[envvar_name] = str(envvar_value)
+        assert config.parseFloat(envvar_name, True) == envvar_value
+
+
+def test_config_float_required_fail_no_value():
+    envvar_name = "TEST_FLOAT_REQUIRED"
+
+    with EnvironmentContextManager():
+        with pytest.raises(config.ConfigurationError, match=envvar_name):
+            config.parseFloat(envvar_name, True)
+
+
+def test_config_float_required_fail_not_float():
+    envvar_name = "TEST_FLOAT_REQUIRED"
+    envvar_value = "not a float"
+    with EnvironmentContextManager():
+        os.environ[envvar_name] = envvar_value
+        with pytest.raises(config.ConfigurationError, match=envvar_name):
+            config.parseFloat(envvar_name, True)
+
+
+def test_config_float_optional_pass():
+    envvar_name = "TEST_FLOAT_OPTIONAL"
+
+    with EnvironmentContextManager():
+        assert config.parseFloat(envvar_name, False) is None
+
+
+def test_config_float_optional_pass_with_value():
+    envvar_name = "TEST_FLOAT_OPTIONAL"
+    envvar_value = 4.2
+
+    with EnvironmentContextManager():
+        os.environ[envvar_name] = str(envvar_value)
+        assert config.parseFloat(envvar_name, False) == envvar_value
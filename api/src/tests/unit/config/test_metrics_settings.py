@@ -0,0 +1,37 @@
+import os
+from importlib import reload
+
+import pytest
+
+import config
+
+
+class EnvironmentContextManager:
+    def __init__(self):
+        self._env = None
+
+    def __enter__(self):
+        self._env = os.environ.copy()
+        return self
+
+    def __exit__(self, *args):
+        os.environ.clear()
+        os.environ.update(self._env)
+
+
+def test_metrics_token_is_required_when_metrics_are_enabled():
+    with EnvironmentContextManager():
+        os.environ.pop("METRICS_ENABLED", None)
+        os.environ.pop("METRICS_TOKEN", None)
+
+        # Reloading defines a new ConfigurationError, so match the message instead
+        with pytest.raises(Exception, match="METRICS_TOKEN"):
+            reload(config)
+
+
+def test_metrics_token_is_not_required_when_metrics_are_disabled():
+    with EnvironmentContextManager():
+        os.environ["METRICS_ENABLED"] = "false"
+        os.environ.pop("METRICS_TOKEN", None)
+
+        assert reload(config).Config.Metrics.token is None
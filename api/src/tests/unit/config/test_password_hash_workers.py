@@ -0,0 +1,38 @@
+import os
+from importlib import reload
+
+import config
+
+
+class EnvironmentContextManager:
+    def __init__(self):
+        self._env = None
+
+    def __enter__(self):
+        self._env = os.environ.copy()
+        return self
+
+    def __exit__(self, *args):
+        os.environ.clear()
+        os.environ.update(self._env)
+
+
+def test_password_hash_workers_split_cores_between_server_workers(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    with EnvironmentContextManager():
+        os.environ.pop("PASSWORD_HASH_WORKERS", None)
+        os.environ["SERVER_WORKERS"] = "4"
+
+        assert reload(config).Config.PasswordHashing.workers == 2
+
+        os.environ.pop("SERVER_WORKERS")
+        assert reload(config).Config.PasswordHashing.workers == 1
+
+
+def test_password_hash_workers_can_be_set(monkeypatch):
+    monkeypatch.setattr(os, "cpu_count", lambda: 8)
+    with EnvironmentContextManager():
+        os.environ["SERVER_WORKERS"] = "8"
+        os.environ["PASSWORD_HASH_WORKERS"] = "3"
+
+        assert reload(config).Config.PasswordHashing.workers == 3
@@ -0,0 +1,37 @@
+import os
+from importlib import reload
+
+import config
+
+
+class EnvironmentContextManager:
+    def __init__(self):
+        self._env = None
+
+    def __enter__(self):
+        self._env = os.environ.copy()
+        return self
+
+    def __exit__(self, *args):
+        os.environ.clear()
+        os.environ.update(self._env)
+
+
+def test_session_settings_can_be_zero():
+    with EnvironmentContextManager():
+        os.environ["SESSION_CACHE_SIZE"] = "0"
+        os.environ["SESSION_REFRESH_THRESHOLD"] = "0"
+
+        application = reload(config).Config.Application
+        assert application.session_cache_size == 0
+        assert application.session_refresh_threshold == 0
+
+
+def test_session_settings_default_when_missing():
+    with EnvironmentContextManager():
+        os.environ.pop("SESSION_CACHE_SIZE", None)
+        os.environ.pop("SESSION_REFRESH_THRESHOLD", None)
+
+        application = reload(config).Config.Application
+        assert application.session_cache_size == 10_000
+        assert application.session_refresh_threshold == 0.5
@@ -0,0 +1,97 @@
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+import endpoints
+from common.responses import FastJSONResponse
+from config import Config
+from endpoints import build_manifest, discover_modules, include_routers, load_manifest
+
+
+def test_manifest_is_up_to_date():
+    # If this fails, run `python -m commands.build_route_manifest`
+    assert load_manifest() == build_manifest()
+
+
+def test_discovery_does_not_depend_on_working_directory(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+
+    modules = discover_modules()
+
+    assert ("endpoints.auth.login", "/auth") in modules
+    assert all(not module_path.split(".")[-1].startswith("_") for module_path, _ in modules)
+
+
+def test_manifest_and_discovery_register_the_same_routes():
+    schemas = []
+    for mode in ("discover", "manifest"):
+        app = FastAPI()
+        include_routers(app.router, mode)
+        schemas.append(app.openapi()["paths"])
+
+    assert schemas[0] == schemas[1]
+    assert "/auth/verify/{user_id}/" in schemas[0]
+
+
+@pytest.mark.asyncio
+async def test_lazy_routes_import_their_module_on_first_request():
+    router = APIRouter()
+    include_routers(router, "lazy")
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+
+    lazy_routes = {route.path: route.endpoint.__self__ for route in router.routes}
+    verify_route = lazy_routes["/auth/verify/{user_id}/"]
+    assert verify_route._route is None
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app), base_url="http://testserver"
+    ) as client:
+        # Validated by the real endpoint, which needs a token in the body
+        response = await client.post("/api/auth/verify/not-a-uuid/", json={})
+
+    assert response.status_code == 422
+    assert verify_route._route is not None
+    assert lazy_routes["/auth/login/"]._route is None
+
+
+def test_stale_manifest_falls_back_to_discovery_in_debug(monkeypatch):
+    monkeypatch.setattr(Config.Application, "is_debug_environment", True)
+    # As if endpoints.auth.me was added after the manifest was generated
+    stale = [entry for entry in load_manifest() if entry[0] != "endpoints.auth.me"]
+    monkeypatch.setattr(endpoints, "load_manifest", lambda: stale)
+
+    app = FastAPI()
+    include_routers(app.router, "manifest")
+
+    assert "/auth/me/" in app.openapi()["paths"]
+
+
+def test_manifest_is_trusted_outside_debug(monkeypatch):
+    monkeypatch.setattr(Config.Application, "is_debug_environment", False)
+
+    def fail():
+        raise AssertionError("the endpoints folder should not be walked")
+
+    monkeypatch.setattr(endpoints, "discover_modules", fail)
+
+    app = FastAPI()
+    include_routers(app.router, "manifest")
+
+    assert "/auth/me/" in app.openapi()["paths"]
+
+
+@pytest.mark.asyncio
+async def test_lazy_routes_use_the_app_default_response_class():
+    router = APIRouter()
+    include_routers(router, "lazy")
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.include_router(router)
+
+    lazy_routes = {route.path: route.endpoint.__self__ for route in router.routes}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app), base_url="http://testserver"
+    ) as client:
+        await client.post("/auth/verify/not-a-uuid/", json={})
+
+    assert lazy_routes["/auth/verify/{user_id}/"]._route.response_class is FastJSONResponse
@@ -0,0 +1,66 @@
+import pytest
+import sqlalchemy
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+
+from models import _migrations
+from models._database import database
+from models._migrations import create_index_concurrently, drop_index_concurrently, migrate
+
+
+def index_names(connection: sqlalchemy.Connection) -> set[str]:
+    return {index["name"] for index in sqlalchemy.inspect(connection).get_indexes("tbl_example")}
+
+
+def test_index_helpers_build_plain_indexes_off_postgres():
+    engine = sqlalchemy.create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(sqlalchemy.text("CREATE TABLE tbl_example (id INTEGER, name TEXT)"))
+
+        with Operations.context(MigrationContext.configure(connection)):
+            create_index_concurrently("ix_tbl_example_name", "tbl_example", ["name"], unique=True)
+            assert index_names(connection) == {"ix_tbl_example_name"}
+
+            drop_index_concurrently("ix_tbl_example_name", "tbl_example")
+            assert index_names(connection) == set()
+
+
+@pytest.mark.asyncio
+async def test_migrate_does_nothing_off_postgres(test_client):
+    # The tests create their tables directly, so there is no version table to find
+    await migrate(database, wait_timeout=1, lock_timeout=1)
+
+    async with database.connection() as conn:
+        tables = await conn.run_sync(lambda sync: sqlalchemy.inspect(sync).get_table_names())
+    assert "alembic_version" not in tables
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(str(statement))
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        self.statements.append("ROLLBACK")
+
+
+def test_upgrade_resets_lock_timeout_when_migration_fails(monkeypatch):
+    def failing_upgrade(config, revision):
+        raise RuntimeError("migration failed")
+
+    monkeypatch.setattr(_migrations.command, "upgrade", failing_upgrade)
+    connection = RecordingConnection()
+
+    with pytest.raises(RuntimeError):
+        _migrations._upgrade(connection, lock_timeout=5)
+
+    assert connection.statements == [
+        "SET lock_timeout = '5000ms'",
+        "ROLLBACK",
+        "RESET lock_timeout",
+    ]
@@ -0,0 +1,36 @@
+from uuid import uuid4
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import Session, User
+from models._fields import NativeUUIDType
+
+
+def test_native_uuid_on_postgres_and_char_elsewhere():
+    uuid_type = NativeUUIDType()
+
+    for dialect, expected in ((postgresql.dialect(), "UUID"), (sqlite.dialect(), "CHAR(32)")):
+        assert uuid_type.load_dialect_impl(dialect).compile(dialect=dialect) == expected
+
+
+def test_bind_param_accepts_uuids_and_hex_strings():
+    uuid_type = NativeUUIDType()
+    value = uuid4()
+
+    assert uuid_type.process_bind_param(value, postgresql.dialect()) == value
+    assert uuid_type.process_bind_param(value.hex, postgresql.dialect()) == value
+    assert uuid_type.process_bind_param(value, sqlite.dialect()) == value.hex
+
+
+def test_keys_use_native_uuid_without_duplicate_unique_constraints():
+    for table in (User.ormar_config.table, Session.ormar_config.table):
+        assert isinstance(table.c.id.type, NativeUUIDType)
+        assert not [
+            constraint
+            for constraint in table.constraints
+            if isinstance(constraint, UniqueConstraint)
+            and [column.name for column in constraint.columns] == ["id"]
+        ]
+
+    assert isinstance(Session.ormar_config.table.c.user.type, NativeUUIDType)
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from models._database import database
+from models._pool import InstrumentedPool, pool_metrics
+
+
+@pytest.fixture
+def metrics():
+    pool = pool_metrics.pool
+    pool_metrics.reset()
+    yield pool_metrics
+    pool_metrics.pool = pool
+    pool_metrics.reset()
+
+
+def create_engine(tmp_path, **options):
+    return create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.sqlite'}",
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=0,
+        **options,
+    )
+
+
+@pytest.mark.asyncio
+async def test_records_checkouts_and_connections(tmp_path, metrics):
+    engine = create_engine(tmp_path)
+    for _ in range(3):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    stats = metrics.stats()
+    assert stats["checkouts"] == 3
+    assert stats["connects"] == 1
+    assert stats["saturated_checkouts"] == 0
+    assert stats["capacity"] == 1
+    assert stats["idle"] == 1
+
+    await engine.dispose()
+    assert metrics.stats()["disconnects"] == 1
+
+
+@pytest.mark.asyncio
+async def test_records_waits_and_timeouts_when_saturated(tmp_path, metrics):
+    engine = create_engine(tmp_path, pool_timeout=0.05)
+
+    async with engine.connect():
+        assert metrics.stats()["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            async with engine.connect():
+                pass
+
+    assert metrics.timeouts == 1
+
+    held = asyncio.Event()
+
+    async def hold_connection():
+        async with engine.connect():
+            held.set()
+            await asyncio.sleep(0.02)
+
+    holder = asyncio.create_task(hold_connection())
+    await held.wait()
+    async with engine.connect():
+        pass
+    await holder
+
+    assert metrics.saturated_checkouts == 1
+    assert metrics.checkout_wait_max > 0
+    await engine.dispose()
+
+
+def test_database_uses_instrumented_pool():
+    assert database._options["poolclass"] is InstrumentedPool
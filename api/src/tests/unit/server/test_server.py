@@ -0,0 +1,35 @@
+import uvicorn
+
+import server
+from config import Config
+
+
+def test_options_are_accepted_by_uvicorn():
+    config = uvicorn.Config("app:app", **server.uvicorn_options())
+
+    assert config.workers == Config.Server.workers
+    assert config.backlog == Config.Server.backlog
+    assert config.timeout_keep_alive == Config.Server.keep_alive
+    assert config.timeout_graceful_shutdown == Config.Server.graceful_shutdown_timeout
+
+
+def test_workers_can_be_overridden():
+    assert server.uvicorn_options(workers=3)["workers"] == 3
+
+
+def test_falls_back_without_uvloop_and_httptools(monkeypatch):
+    monkeypatch.setattr(server, "_installed", lambda module: False)
+
+    options = server.uvicorn_options()
+
+    assert options["loop"] == "asyncio"
+    assert options["http"] == "h11"
+
+
+def test_uses_uvloop_and_httptools_when_installed(monkeypatch):
+    monkeypatch.setattr(server, "_installed", lambda module: True)
+
+    options = server.uvicorn_options()
+
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"